@@ -10,7 +10,7 @@ from kivy.uix.textinput import TextInput
 from kivy.clock import Clock
 from datetime import datetime
 import os
-from config.alerts_log import get_alerts, mark_alert_as_read, mark_all_alerts_as_read
+from config.alerts_log import get_alerts, mark_alert_as_read, mark_all_alerts_as_read, subscribe_alerts
 from config.settings import get_setting
 
 class AlertsScreen(BaseScreen):
@@ -57,8 +57,8 @@ class AlertsScreen(BaseScreen):
         clear_button.bind(on_release=self.mark_all_read)
         footer.add_widget(clear_button)
         
-        # Naplánuj automatické obnovovanie
-        Clock.schedule_interval(self.refresh_alerts, 30)  # Obnovenie každých 30 sekúnd
+        # Obnovenie pri novom alebo prečítanom upozornení namiesto pravidelného čítania denníka
+        subscribe_alerts(self.on_main_thread(self.refresh_alerts), name="alerts-screen", **self.CHANGE_BATCH)
         
     def on_enter(self):
         """Volaná pri vstupe na obrazovku"""
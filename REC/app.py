@@ -1,6 +1,6 @@
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager
-from config.settings import load_settings
+from config.settings import load_settings, flush_settings, migrate_runtime_state
 from main_screen import MainScreen
 from login_screen import LoginScreen
 from settings_screen import SettingsScreen
@@ -32,6 +32,8 @@ class MainApp(App):
         
         # Načítanie nastavení aplikácie
         settings = load_settings()
+        # Zariadenia a stavy senzorov zo staršieho súboru nastavení patria do state.db
+        migrate_runtime_state()
         print("DEBUG: Aplikácia sa spúšťa s načítanými nastaveniami")
         
         # Spustenie sieťových poslucháčov pomocou NetworkManager
@@ -79,5 +81,8 @@ class MainApp(App):
         if hasattr(self, 'web_app'):
             self.web_app.stop()
         
+        # Zápis zmien nastavení, ktoré ešte čakajú v odloženom zápise
+        flush_settings()
+        
 if __name__ == '__main__':
     MainApp().run()
\ No newline at end of file
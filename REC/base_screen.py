@@ -6,11 +6,15 @@ from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
+from kivy.clock import Clock
 from theme_helper import COLORS, FONT_SIZES
 
 class BaseScreen(Screen):
     """Základná trieda pre všetky obrazovky aplikácie poskytujúca štandardné rozloženie a funkcie"""
     
+    # Zmeny v rýchlom slede sa zlúčia do jednej dávky a obrazovka sa obnoví raz
+    CHANGE_BATCH = {"batch_size": 100, "batch_interval": 0.1}
+    
     def __init__(self, **kwargs):
         """Inicializácia základnej obrazovky s štandardným rozložením"""
         super(BaseScreen, self).__init__(**kwargs)
@@ -62,6 +66,23 @@ class BaseScreen(Screen):
         self.layout.add_widget(self.footer)
         return self.footer
     
+    def on_main_thread(self, callback):
+        """Obalenie handlera odberu zmien - callback(udalosti) sa zavolá v hlavnom vlákne Kivy
+        
+        Odber doručuje zmeny vo vlákne zbernice udalostí, widgety sa však smú
+        meniť iba v hlavnom vlákne. Kým obrazovka nie je zobrazená, zmeny sa
+        zahodia - pri vstupe na obrazovku sa obnoví celá (on_enter).
+        """
+        def deliver(events):
+            Clock.schedule_once(lambda dt: self._deliver_changes(callback, events))
+        return deliver
+    
+    def _deliver_changes(self, callback, events):
+        """Odovzdanie dávky zmien zobrazenej obrazovke"""
+        if self.manager is not None and self.manager.current != self.name:
+            return
+        callback(events)
+    
     def go_to_screen(self, screen_name):
         """Prechod na inú obrazovku"""
         if self.manager:
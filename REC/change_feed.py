@@ -0,0 +1,113 @@
+"""
+Modul pre odber zmien webovým rozhraním (long polling).
+
+Stránky sa namiesto pravidelného obnovovania pýtajú na /api/changes s
+poslednou známou verziou. Požiadavka čaká, kým nastane zmena na cestách,
+ktoré stránka zobrazuje, a vráti zoznam zmenených ciest - stránka potom
+načíta iba to, čo sa zmenilo. Zmeny sa zbierajú zo zbernice udalostí:
+
+  <cesta nastavenia>      SettingChanged (napr. 'system_active', 'sensor_status.<id>')
+  alert_log.<akcia>       AlertLogChanged ('alert_log.added', 'alert_log.read', ...)
+  presence.<id>           PresenceChanged (zariadenie online/offline)
+
+Pamätá sa obmedzený počet posledných zmien. Klient, ktorého verzia je
+staršia (alebo novšia - prijímač sa reštartoval), dostane reset a načíta
+všetko znova.
+"""
+import threading
+import time
+from collections import deque
+from event_bus import event_bus, SettingChanged, AlertLogChanged, PresenceChanged
+from config.settings import path_matches
+
+
+class ChangeFeed:
+    """Číslovaný záznam posledných zmien s čakaním na novú zmenu"""
+
+    def __init__(self, history=1024):
+        """Inicializácia záznamu zmien
+
+        Args:
+            history (int): Počet posledných zmien v pamäti
+        """
+        self.version = 0
+        self._changes = deque(maxlen=history)
+        self._condition = threading.Condition()
+        self._subscriptions = []
+
+    def start(self):
+        """Prihlásenie odberu zmien na zbernici udalostí"""
+        if self._subscriptions:
+            return
+        # Zmeny v rýchlom slede sa zapíšu naraz a čakajúci klienti sa zobudia raz
+        for event_type in (SettingChanged, AlertLogChanged, PresenceChanged):
+            self._subscriptions.append(event_bus.subscribe(
+                event_type, self._record, name=f"change-feed-{event_type.__name__}",
+                batch_size=100, batch_interval=0.05))
+
+    def stop(self):
+        """Zrušenie odberu a uvoľnenie čakajúcich požiadaviek"""
+        for subscription in self._subscriptions:
+            event_bus.unsubscribe(subscription)
+        self._subscriptions = []
+        with self._condition:
+            self._condition.notify_all()
+
+    def wait(self, since, patterns=None, timeout=25.0):
+        """Čakanie na zmenu novšiu ako verzia since
+
+        Args:
+            since (int): Posledná verzia, ktorú klient pozná
+            patterns (list, optional): Vzory ciest, ktoré klienta zaujímajú (None = všetky)
+            timeout (float): Najdlhšie čakanie v sekundách
+
+        Returns:
+            dict: version (aktuálna verzia), reset (klient má načítať všetko znova)
+                  a changes (zmeny s verziou, cestou a časom)
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                oldest = self._changes[0][0] if self._changes else self.version + 1
+                reset = since > self.version or since < oldest - 1
+                changes = [change for change in self._changes
+                           if change[0] > since and self._matches(change[1], patterns)]
+                remaining = deadline - time.monotonic()
+                if reset or changes or remaining <= 0 or not self._subscriptions:
+                    break
+                # Zmeny mimo vzorov klienta ho nezobudia
+                since = self.version
+                self._condition.wait(remaining)
+
+            return {
+                "version": self.version,
+                "reset": reset,
+                "changes": [{"version": version, "path": path, "time": changed_at}
+                            for version, path, changed_at in changes]
+            }
+
+    @staticmethod
+    def _matches(path, patterns):
+        """Kontrola, či cesta zodpovedá niektorému zo vzorov"""
+        return patterns is None or any(path_matches(pattern, path) for pattern in patterns)
+
+    @staticmethod
+    def _path(event):
+        """Cesta zmeny pre udalosť zbernice"""
+        if isinstance(event, AlertLogChanged):
+            return f"alert_log.{event.action}"
+        if isinstance(event, PresenceChanged):
+            return f"presence.{event.device_id}"
+        return event.path
+
+    def _record(self, events):
+        """Zapísanie dávky zmien a zobudenie čakajúcich požiadaviek"""
+        with self._condition:
+            for event in events:
+                self.version += 1
+                self._changes.append((self.version, self._path(event), event.received_at))
+            self._condition.notify_all()
+
+
+# Globálna inštancia záznamu zmien
+change_feed = ChangeFeed()
@@ -6,6 +6,9 @@ from datetime import datetime, timedelta
 # Fix the relative import issue
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.atomic_file import atomic_write, read_with_recovery
+from config.frozen import freeze
+from event_bus import event_bus, AlertLogChanged
 
 class AlertsLogManager:
     """Správca pre manipuláciu so súborom denníka upozornení"""
@@ -76,7 +79,10 @@ class AlertsLogManager:
         alerts = [a for a in alerts if a.get("timestamp", 0) > cutoff_time]
         
         # Uloženie aktualizovaných upozornení
-        return self._write_log(alerts)
+        if not self._write_log(alerts):
+            return False
+        self._publish("added", alert)
+        return True
     
     def mark_alert_as_read(self, alert_index):
         """Označenie upozornenia ako prečítané
@@ -97,7 +103,10 @@ class AlertsLogManager:
         if 0 <= alert_index < len(alerts):
             alerts[alert_index]["read"] = True
             alerts[alert_index]["read_timestamp"] = time.time()
-            return self._write_log(alerts)
+            if not self._write_log(alerts):
+                return False
+            self._publish("read", alerts[alert_index])
+            return True
         
         return False
 
@@ -118,7 +127,33 @@ class AlertsLogManager:
                 alert["read"] = True
                 alert["read_timestamp"] = current_time
                 
-        return self._write_log(alerts)
+        if not self._write_log(alerts):
+            return False
+        self._publish("read_all")
+        return True
+    
+    def subscribe(self, handler, **options):
+        """Odber zmien denníka (nové upozornenie, označenie ako prečítané)
+        
+        Args:
+            handler (callable): handler(AlertLogChanged), pri dávkovaní handler(zoznam udalostí) -
+                                volá sa vo vlákne odberateľa
+            **options: name, queue_size, batch_size, batch_interval, match (pozri event_bus.Subscription)
+        
+        Returns:
+            Subscription: Odber, ktorý sa dá zrušiť cez unsubscribe
+        """
+        options.setdefault("name", "alerts")
+        return event_bus.subscribe(AlertLogChanged, handler, **options)
+    
+    def unsubscribe(self, subscription):
+        """Zrušenie odberu zmien denníka"""
+        event_bus.unsubscribe(subscription)
+    
+    def _publish(self, action, alert=None):
+        """Zverejnenie zmeny denníka na zbernici udalostí"""
+        if event_bus.has_subscribers(AlertLogChanged):
+            event_bus.publish(AlertLogChanged(action, freeze(alert) if alert is not None else None))
     
     def _read_log(self):
         """Čítanie upozornení zo súboru denníka
@@ -128,12 +163,17 @@ class AlertsLogManager:
         """
         try:
             if os.path.exists(self.log_file):
-                with open(self.log_file, 'r') as f:
-                    alerts = json.load(f)
-                    return alerts if isinstance(alerts, list) else []
+                # Poškodený denník (napr. po výpadku napájania) sa obnoví z poslednej zálohy
+                alerts = read_with_recovery(self.log_file, json.load)
+                return alerts if isinstance(alerts, list) else []
             return []
         except Exception as e:
             print(f"CHYBA: Zlyhalo čítanie denníka upozornení: {e}")
+            # Poškodený denník bez platnej zálohy sa odloží, aby ho ďalší zápis neprepísal
+            try:
+                os.replace(self.log_file, self.log_file + ".corrupt")
+            except OSError:
+                pass
             return []
     
     def _write_log(self, alerts):
@@ -146,9 +186,7 @@ class AlertsLogManager:
             bool: True v prípade úspechu
         """
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
-            with open(self.log_file, 'w') as f:
-                json.dump(alerts, f, indent=4)
+            atomic_write(self.log_file, json.dumps(alerts, indent=4))
             return True
         except Exception as e:
             print(f"CHYBA: Zlyhalo zapisovanie denníka upozornení: {e}")
@@ -184,4 +222,12 @@ def mark_alert_as_read(alert_index):
 
 def mark_all_alerts_as_read():
     """Označenie všetkých upozornení ako prečítané"""
-    return alerts_log_manager.mark_all_as_read()
\ No newline at end of file
+    return alerts_log_manager.mark_all_as_read()
+
+def subscribe_alerts(handler, **options):
+    """Odber zmien denníka upozornení"""
+    return alerts_log_manager.subscribe(handler, **options)
+
+def unsubscribe_alerts(subscription):
+    """Zrušenie odberu zmien denníka upozornení"""
+    return alerts_log_manager.unsubscribe(subscription)
\ No newline at end of file
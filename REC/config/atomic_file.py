@@ -0,0 +1,126 @@
+"""
+Modul pre atomický zápis konfiguračných súborov odolný voči výpadku napájania.
+
+Súbor sa nikdy neprepisuje na mieste. Nový obsah sa zapíše do dočasného
+súboru v tom istom adresári, po fsync sa premenuje na cieľové meno
+(os.replace je atomické) a zapíše sa aj adresár. Pri výpadku počas zápisu
+tak na disku zostane buď starý, alebo nový celý súbor.
+
+Pred premenovaním sa doterajší súbor zachová ako záloha posledného
+platného obsahu ({súbor}.bak) - iba pevným odkazom, bez kopírovania dát.
+Ak sa súbor pri načítaní nedá prečítať (napr. ho poškodil starší
+neatomický zápis), read_with_recovery použije zálohu a súbor z nej obnoví.
+"""
+import os
+import shutil
+import tempfile
+
+BACKUP_SUFFIX = ".bak"
+
+
+def backup_path(path):
+    """Cesta k zálohe posledného platného obsahu súboru"""
+    return path + BACKUP_SUFFIX
+
+
+def atomic_write(path, data, backup=True):
+    """Atomický zápis textu do súboru
+
+    Args:
+        path (str): Cieľový súbor
+        data (str): Nový obsah
+        backup (bool): Zachovať doterajší obsah ako zálohu {súbor}.bak
+
+    Raises:
+        OSError: Ak sa zápis nepodaril (cieľový súbor zostane nezmenený)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if backup and os.path.exists(path):
+            _keep_backup(path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def read_with_recovery(path, parse):
+    """Načítanie súboru so záchranou z poslednej platnej zálohy
+
+    Args:
+        path (str): Súbor na načítanie
+        parse (callable): parse(otvorený súbor) -> obsah, pri neplatnom obsahu vyhodí výnimku
+
+    Returns:
+        Obsah súboru alebo zálohy
+
+    Raises:
+        Exception: Ak sa nedá načítať súbor ani záloha (výnimka pôvodného súboru)
+    """
+    try:
+        return _read(path, parse)
+    except Exception as error:
+        backup = backup_path(path)
+        if not os.path.exists(backup):
+            raise
+        try:
+            content = _read(backup, parse)
+        except Exception:
+            raise error
+        print(f"WARNING: Súbor {path} je poškodený ({error}), obnovujem ho zo zálohy {backup}")
+        # Poškodený súbor sa nahradí zálohou, záloha zostane nezmenená
+        try:
+            with open(backup, "r", encoding="utf-8") as f:
+                atomic_write(path, f.read(), backup=False)
+        except OSError as e:
+            print(f"ERROR: Obnovenie súboru {path} zo zálohy zlyhalo: {e}")
+        return content
+
+
+def _read(path, parse):
+    """Načítanie a rozparsovanie súboru, prázdny súbor je neplatný"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = parse(f)
+    if content is None:
+        raise ValueError("Súbor je prázdny")
+    return content
+
+
+def _keep_backup(path):
+    """Zachovanie doterajšieho súboru ako zálohy (pevný odkaz, inak kópia)"""
+    backup = backup_path(path)
+    temp_backup = backup + ".tmp"
+    try:
+        if os.path.exists(temp_backup):
+            os.remove(temp_backup)
+        os.link(path, temp_backup)
+    except (OSError, AttributeError):
+        # Súborový systém bez pevných odkazov (napr. FAT na SD karte)
+        shutil.copy2(path, temp_backup)
+    os.replace(temp_backup, backup)
+
+
+def _fsync_directory(directory):
+    """Zápis adresára na disk, aby premenovanie prežilo výpadok (iba POSIX)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
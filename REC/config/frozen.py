@@ -0,0 +1,101 @@
+"""
+Modul pre nemenné snímky nastavení a stavu zariadení.
+
+Nastavenia a stav zariadení čítajú vlákna príjmu, požiadavky Flasku aj
+hlavné vlákno Kivy. Zapisovatelia preto objekty nemenia na mieste, ale
+pod zámkom zostavia novú snímku (kópiu iba zmenenej vetvy, ostatné vetvy
+sa zdieľajú) a nahradia ňou odkaz. Čitateľ si vezme odkaz raz a bez
+zámku vidí konzistentnú snímku - nikdy nie napoly aplikovanú zmenu a nikdy
+slovník meniaci sa počas iterácie (json.dump).
+
+FrozenDict a FrozenList sú podtriedy dict a list, takže fungujú všade, kde
+sa očakáva slovník alebo zoznam (isinstance, json.dumps, jsonify, šablóny).
+Pokus o zmenu vyhodí TypeError - kto chce údaje upraviť, urobí si kópiu
+cez thaw() alebo copy().
+"""
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} je iba na čítanie, upravte kópiu (thaw)")
+
+
+class FrozenDict(dict):
+    """Slovník iba na čítanie"""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self):
+        """Upraviteľná hlboká kópia (obyčajné dict a list)"""
+        return thaw(self)
+
+    def __reduce__(self):
+        # pickle a deepcopy by inak plnili objekt cez __setitem__
+        return (FrozenDict, (dict(self),))
+
+    def __repr__(self):
+        return f"FrozenDict({dict.__repr__(self)})"
+
+
+class FrozenList(list):
+    """Zoznam iba na čítanie"""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def copy(self):
+        """Upraviteľná hlboká kópia (obyčajné dict a list)"""
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __repr__(self):
+        return f"FrozenList({list.__repr__(self)})"
+
+
+def freeze(value):
+    """Nemenná kópia hodnoty (už zmrazené vetvy sa nekopírujú)"""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Upraviteľná hlboká kópia hodnoty (obyčajné dict a list)"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def replace_path(snapshot, keys, value):
+    """Nová snímka so zmenenou hodnotou na ceste kľúčov
+
+    Kopírujú sa iba slovníky na ceste ku kľúču, ostatné vetvy novej snímky
+    zdieľajú pôvodné (nemenné) objekty.
+
+    Args:
+        snapshot (FrozenDict): Pôvodná snímka
+        keys (list): Cesta kľúčov (napr. ['network', 'tcp_port'])
+        value: Nová hodnota
+
+    Returns:
+        FrozenDict: Nová snímka
+    """
+    changed = dict(snapshot)
+    if len(keys) == 1:
+        changed[keys[0]] = freeze(value)
+    else:
+        child = snapshot.get(keys[0])
+        changed[keys[0]] = replace_path(child if isinstance(child, dict) else FrozenDict(), keys[1:], value)
+    return FrozenDict(changed)
@@ -1,11 +1,59 @@
+import atexit
+import fnmatch
 import json
 import os
+import threading
 import yaml
 import time
 from datetime import datetime, timedelta
+from config.state_store import StateStore
+from config.atomic_file import atomic_write, backup_path, read_with_recovery
+from config.frozen import FrozenDict, freeze, replace_path, thaw
+from event_bus import event_bus, SettingChanged
+
+
+def path_matches(pattern, path):
+    """Kontrola, či sa zmena na ceste path týka odberu so vzorom pattern
+    
+    Časti vzoru sa porovnávajú cez fnmatch (napr. 'sensor_status.*'). Zmena sa
+    týka odberu aj vtedy, keď je jedna cesta predponou druhej - zmena sekcie
+    'network' sa týka odberu 'network.tcp_port' a naopak. Prázdna cesta
+    (opätovné načítanie nastavení) sa týka každého odberu.
+    """
+    if not path or not pattern:
+        return True
+    return all(fnmatch.fnmatchcase(key, part) for key, part in zip(path.split('.'), pattern.split('.')))
+
 
 class SettingsManager:
-    """Centralizovaný správca nastavení aplikácie s podporou rôznych formátov"""
+    """Centralizovaný správca nastavení aplikácie s podporou rôznych formátov
+
+    Predvolene save() zapíše súbor hneď. V režime odloženého zápisu
+    (system.write_behind, treba ho výslovne zapnúť) save() iba označí
+    nastavenia ako zmenené a súbor prepíše vlákno zápisu - až keď zmeny
+    system.flush_interval sekúnd neprichádzajú, najneskôr však
+    system.flush_max_latency sekúnd po prvej neuloženej zmene. Mnoho zmien
+    tesne po sebe sa tak uloží jediným zápisom. Pri ukončení treba zavolať
+    flush() (registrované aj cez atexit).
+
+    Prevádzkový stav (záznamy zariadení a stavy senzorov) nie je súčasťou
+    nastavení - drží ho StateStore v samostatnej databáze state.db.
+    Staršie nastavenia s kľúčmi sensor_devices a sensor_status sa do
+    databázy presunú pri štarte aplikácie (migrate_runtime_state).
+
+    Nastavenia sú nemenná snímka (FrozenDict). Zapisovatelia pod zámkom
+    zostavia novú snímku a nahradia ňou self.settings, čitatelia (get)
+    nepotrebujú zámok a nikdy nevidia napoly aplikovanú zmenu. Hodnoty
+    z get() sa nedajú meniť na mieste - na úpravu treba kópiu (dict()/thaw).
+
+    Každá zmena sa zverejní na zbernici udalostí ako SettingChanged s cestou
+    kľúča (aj 'sensor_devices.<id>' a 'sensor_status.<id>'). Obrazovky
+    a web sa cez subscribe() prihlásia na cesty, ktoré zobrazujú, a nemusia
+    nastavenia opakovane čítať.
+    """
+    # Kľúče prevádzkového stavu, ktoré sa presúvajú do StateStore
+    RUNTIME_KEYS = ("sensor_devices", "sensor_status")
+
     
     # Predvolené nastavenia
     DEFAULT_SETTINGS = {
@@ -15,7 +63,37 @@ class SettingsManager:
             "tcp_port": 8080,
             "udp_port": 8081,
             "discovery_port": 8082,
-            "web_port": 8090
+            "web_port": 8090,
+            "tcp_backlog": 128,
+            "max_connections": 256,
+            "max_concurrent_uploads": 16,
+            "tcp_client_timeout": 30,
+            "tcp_session_idle_timeout": 300,
+            "recv_chunk_size": 262144,
+            "max_upload_size": 33554432,
+            "upload_partial_ttl": 3600,
+            "presence_timeout": 3600,
+            "udp_high_rate": False,
+            "udp_rcvbuf": 1048576,
+            "udp_max_batch": 256
+        },
+        "ingest": {
+            "workers": 2,
+            "alarm_workers": 1,
+            "queue_size": 256,
+            "processes": 0,
+            "state_flush_interval": 60,
+            "device_queue_share": 0.25,
+            "device_udp_rate": 20,
+            "device_udp_burst": 40,
+            "device_tcp_rate": 2,
+            "device_tcp_burst": 10,
+            "watchdog_interval": 2,
+            "watchdog_stall_timeout": 30,
+            "restart_backoff": 1,
+            "restart_backoff_max": 60,
+            "tracing": True,
+            "trace_history": 1024
         },
         "alerts": {
             "sound_enabled": True,
@@ -30,7 +108,10 @@ class SettingsManager:
         "system": {
             "auto_start": True,
             "log_level": "INFO",
-            "config_format": "JSON"
+            "config_format": "JSON",
+            "write_behind": False,
+            "flush_interval": 1.0,
+            "flush_max_latency": 5.0
         },
         "notifications": {
             "email": {
@@ -44,9 +125,7 @@ class SettingsManager:
             },
             "cooldown_seconds": 60
         },
-        "sensors": [],
-        "sensor_devices": {},
-        "sensor_status": {}
+        "sensors": []
     }
     
     def __init__(self):
@@ -56,79 +135,258 @@ class SettingsManager:
         self.settings_file_json = os.path.join(self.config_dir, "settings.json")
         self.settings_file_yaml = os.path.join(self.config_dir, "settings.yaml")
         
-        # Nastavenia aplikácie
-        self.settings = {}
+        # Nastavenia aplikácie (nemenná snímka) a zámok zapisovateľov
+        self.settings = FrozenDict()
+        self._lock = threading.RLock()
+        
+        # Stav odloženého zápisu
+        self._flush_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flush_wakeup = threading.Event()
+        self._flush_thread = None
+        self._dirty = False
+        self._dirty_since = None
+        self._last_change = None
+        self.write_stats = {
+            "saves": 0,
+            "writes": 0,
+            "coalesced": 0
+        }
+        
+        # Prevádzkový stav zariadení a senzorov
+        self.state_store = StateStore(os.path.join(self.config_dir, "state.db"))
+        try:
+            self.state_store.open()
+        except Exception as e:
+            print(f"ERROR: Zlyhalo otvorenie úložiska stavu zariadení: {e}")
         self.load()
     
     def load(self):
         """Načíta nastavenia zo súboru alebo vytvorí predvolené nastavenia, ak súbor neexistuje"""
-        try:
-            # Skontroluj formát nastavený v predchádzajúcom behu
-            format_preference = "JSON"
-            
-            # Najprv skús načítať z JSON (predvolené)
-            if os.path.exists(self.settings_file_json):
-                with open(self.settings_file_json, 'r') as f:
-                    self.settings = json.load(f)
-                    format_preference = self.settings.get("system", {}).get("config_format", "JSON")
+        with self._lock:
+            try:
+                # Najprv skús načítať z JSON (predvolené)
+                if os.path.exists(self.settings_file_json):
+                    settings = self._read(self.settings_file_json, json.load)
                     print(f"DEBUG: Nastavenia načítané z {self.settings_file_json}")
-            # Ak neexistuje JSON, skontroluj YAML
-            elif os.path.exists(self.settings_file_yaml):
-                with open(self.settings_file_yaml, 'r') as f:
-                    self.settings = yaml.safe_load(f)
-                    format_preference = self.settings.get("system", {}).get("config_format", "YAML")
+                # Ak neexistuje JSON, skontroluj YAML
+                elif os.path.exists(self.settings_file_yaml):
+                    settings = self._read(self.settings_file_yaml, yaml.safe_load)
                     print(f"DEBUG: Nastavenia načítané z {self.settings_file_yaml}")
-            # Ak neexistuje ani jeden, vytvor predvolené nastavenia
-            else:
-                self.settings = self.DEFAULT_SETTINGS.copy()
-                self.save()
-                print(f"DEBUG: Vytvorený predvolený súbor nastavení")
-            
-            # Zabezpeč, že všetky sekcie nastavení existujú a majú aspoň predvolené hodnoty
-            for section, default_values in self.DEFAULT_SETTINGS.items():
-                if section not in self.settings:
-                    self.settings[section] = default_values
-                elif isinstance(default_values, dict):
-                    for key, val in default_values.items():
-                        if key not in self.settings[section]:
-                            self.settings[section][key] = val
-            
-            return self.settings
-        except Exception as e:
-            print(f"ERROR: Zlyhalo načítanie nastavení: {e}")
-            self.settings = self.DEFAULT_SETTINGS.copy()
-            return self.settings
+                # Ak neexistuje ani jeden, vytvor predvolené nastavenia
+                else:
+                    self.settings = freeze(self.DEFAULT_SETTINGS)
+                    self._write()
+                    print(f"DEBUG: Vytvorený predvolený súbor nastavení")
+                    settings = thaw(self.settings)
+                
+                # Zabezpeč, že všetky sekcie nastavení existujú a majú aspoň predvolené hodnoty
+                for section, default_values in self.DEFAULT_SETTINGS.items():
+                    if section not in settings:
+                        settings[section] = thaw(default_values)
+                    elif isinstance(default_values, dict):
+                        for key, val in default_values.items():
+                            if key not in settings[section]:
+                                settings[section][key] = thaw(val)
+                
+                previous = self.settings
+                self.settings = freeze(settings)
+                if previous:
+                    # Opätovné načítanie (nie prvé) sa týka všetkých odberov
+                    self._publish("", self.settings, previous)
+                return self.settings
+            except Exception as e:
+                print(f"ERROR: Zlyhalo načítanie nastavení: {e}")
+                self.settings = freeze(self.DEFAULT_SETTINGS)
+                return self.settings
     
-    def save(self):
-        """Uloží aktuálne nastavenia do súboru vo formáte podľa preferencie"""
+    def _read(self, path, parse):
+        """Načítanie súboru nastavení, pri poškodení z poslednej platnej zálohy
+        
+        Ak nie je platný ani súbor, ani záloha, poškodený súbor sa odloží
+        ({súbor}.corrupt), aby ho zápis predvolených nastavení neprepísal.
+        """
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
-            
-            # Kontrola preferovaného formátu (predvolene JSON)
-            format_preference = self.settings.get("system", {}).get("config_format", "JSON")
-            
-            if format_preference == "YAML":
-                with open(self.settings_file_yaml, 'w') as f:
-                    yaml.dump(self.settings, f, default_flow_style=False)
-                # Odstráň JSON súbor, ak existuje, aby sme predišli zmätku
-                if os.path.exists(self.settings_file_json):
-                    os.remove(self.settings_file_json)
-                print(f"DEBUG: Nastavenia uložené do {self.settings_file_yaml}")
-            else:  # Defaultne JSON
-                with open(self.settings_file_json, 'w') as f:
-                    json.dump(self.settings, f, indent=4)
-                # Odstráň YAML súbor, ak existuje
-                if os.path.exists(self.settings_file_yaml):
-                    os.remove(self.settings_file_yaml)
-                print(f"DEBUG: Nastavenia uložené do {self.settings_file_json}")
-            
+            return read_with_recovery(path, parse)
+        except Exception:
+            corrupt_path = path + ".corrupt"
+            try:
+                os.replace(path, corrupt_path)
+                print(f"ERROR: Súbor nastavení {path} je poškodený a nemá platnú zálohu, "
+                      f"odložený ako {corrupt_path}")
+            except OSError:
+                pass
+            raise
+    
+    def migrate_runtime_state(self):
+        """Presun prevádzkového stavu zo staršieho súboru nastavení do StateStore
+        
+        Volá sa pri štarte aplikácie, nie pri načítaní - samotný import
+        modulu (nástroje, benchmarky) konfiguračný súbor nemení.
+        
+        Returns:
+            bool: True, ak sa súbor nastavení prepísal bez prevádzkového stavu
+        """
+        with self._lock:
+            settings = thaw(self.settings)
+            if not self._migrate_runtime_state(settings):
+                return False
+            self.settings = freeze(settings)
+            # Konfiguračný súbor už prevádzkový stav neobsahuje
+            self._write()
             return True
-        except Exception as e:
-            print(f"ERROR: Zlyhalo uloženie nastavení: {e}")
+    
+    def _migrate_runtime_state(self, settings):
+        """Presun zariadení a stavov senzorov zo súboru nastavení do StateStore
+        
+        Returns:
+            bool: True, ak treba súbor nastavení prepísať bez prevádzkového stavu
+        """
+        legacy = {key: settings.pop(key) for key in self.RUNTIME_KEYS if key in settings}
+        if not legacy:
             return False
+        
+        if any(legacy.values()) and self.state_store.is_empty():
+            if not self.state_store.import_state(legacy.get("sensor_devices"), legacy.get("sensor_status")):
+                # Bez úspešného importu sa stav zo súboru nastavení neodstráni
+                settings.update(legacy)
+                return False
+            print(f"DEBUG: Stav {len(legacy.get('sensor_devices') or {})} zariadení presunutý do {self.state_store.path}")
+        return True
+    
+    def save(self):
+        """Uloží aktuálne nastavenia - v režime odloženého zápisu iba označí zmenu
+
+        Returns:
+            bool: True, ak sa nastavenia uložili alebo sa zápis naplánoval
+        """
+        system = self.settings.get("system", {})
+        if not system.get("write_behind", False):
+            with self._flush_lock:
+                self.write_stats["saves"] += 1
+            return self._write()
+        
+        now = time.monotonic()
+        with self._flush_lock:
+            self.write_stats["saves"] += 1
+            if self._dirty:
+                self.write_stats["coalesced"] += 1
+            else:
+                self._dirty = True
+                self._dirty_since = now
+            self._last_change = now
+            if self._flush_thread is None or not self._flush_thread.is_alive():
+                self._flush_thread = threading.Thread(target=self._flush_loop, name="settings-flush")
+                self._flush_thread.daemon = True
+                self._flush_thread.start()
+        self._flush_wakeup.set()
+        return True
+    
+    def flush(self):
+        """Okamžité uloženie neuložených zmien nastavení aj stavu zariadení (pri ukončení aplikácie)
+
+        Returns:
+            bool: True, ak sa nič neukladalo alebo sa zápis podaril
+        """
+        if not self.state_store.flush():
+            return False
+        with self._flush_lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+            self._dirty_since = None
+        if self._write():
+            return True
+        # Neúspešný zápis sa zopakuje pri ďalšom flush
+        with self._flush_lock:
+            if not self._dirty:
+                self._dirty = True
+                self._dirty_since = time.monotonic()
+        return False
+    
+    def is_dirty(self):
+        """Kontrola, či čakajú neuložené zmeny"""
+        return self._dirty
+    
+    def get_write_stats(self):
+        """Získanie počtu požiadaviek na uloženie, skutočných zápisov a zlúčených zmien"""
+        with self._flush_lock:
+            stats = dict(self.write_stats)
+            stats["dirty"] = self._dirty
+        return stats
+    
+    def _flush_deadline(self):
+        """Čas (monotonic) najbližšieho zápisu, None ak nič nečaká (volá sa pod zámkom)"""
+        if not self._dirty:
+            return None
+        system = self.settings.get("system", {})
+        return min(self._last_change + system.get("flush_interval", 1.0),
+                   self._dirty_since + system.get("flush_max_latency", 5.0))
+    
+    def _flush_loop(self):
+        """Slučka vlákna odloženého zápisu"""
+        while True:
+            with self._flush_lock:
+                deadline = self._flush_deadline()
+            if deadline is None:
+                self._flush_wakeup.wait()
+                self._flush_wakeup.clear()
+                continue
+            
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                # Nová zmena posunie termín zápisu (najviac po flush_max_latency)
+                self._flush_wakeup.wait(delay)
+                self._flush_wakeup.clear()
+                continue
+            
+            if not self.flush():
+                time.sleep(1)
+    
+    def _write(self):
+        """Zápis aktuálnych nastavení do súboru vo formáte podľa preferencie"""
+        # Vlákno zápisu a flush() pri ukončení nesmú prepisovať súbor naraz
+        with self._write_lock:
+            try:
+                os.makedirs(self.config_dir, exist_ok=True)
+                
+                # Kontrola preferovaného formátu (predvolene JSON)
+                # Snímka sa počas zápisu nezmení, aj keď ju iné vlákno nahradí
+                settings = self.settings
+                format_preference = settings.get("system", {}).get("config_format", "JSON")
+                
+                if format_preference == "YAML":
+                    # Atomický zápis - pri výpadku napájania zostane celý starý alebo nový súbor
+                    atomic_write(self.settings_file_yaml, yaml.dump(thaw(settings), default_flow_style=False))
+                    # Odstráň JSON súbor, ak existuje, aby sme predišli zmätku
+                    self._remove_with_backup(self.settings_file_json)
+                    print(f"DEBUG: Nastavenia uložené do {self.settings_file_yaml}")
+                else:  # Defaultne JSON
+                    atomic_write(self.settings_file_json, json.dumps(settings, indent=4))
+                    # Odstráň YAML súbor, ak existuje
+                    self._remove_with_backup(self.settings_file_yaml)
+                    print(f"DEBUG: Nastavenia uložené do {self.settings_file_json}")
+                
+                with self._flush_lock:
+                    self.write_stats["writes"] += 1
+                return True
+            except Exception as e:
+                print(f"ERROR: Zlyhalo uloženie nastavení: {e}")
+                return False
+    
+    @staticmethod
+    def _remove_with_backup(path):
+        """Odstránenie súboru nastavení nepoužívaného formátu aj s jeho zálohou"""
+        for file_path in (path, backup_path(path)):
+            if os.path.exists(file_path):
+                os.remove(file_path)
     
     def get(self, key, default=None):
-        """Získa konkrétne nastavenie podľa kľúča s podporou vnorených kľúčov (napr. 'network.tcp_port')"""
+        """Získa konkrétne nastavenie podľa kľúča s podporou vnorených kľúčov (napr. 'network.tcp_port')
+        
+        Slovníky a zoznamy sú iba na čítanie (FrozenDict/FrozenList) - bez zámku
+        sa čítajú z aktuálnej snímky, zmeny treba robiť cez update().
+        """
         keys = key.split('.')
         
         # Prejdi cez všetky kľúče
@@ -147,16 +405,11 @@ class SettingsManager:
         """Aktualizuje konkrétne nastavenie a uloží do súboru s podporou vnorených kľúčov"""
         keys = key.split('.')
         
-        # Príprava odkazu na správnu pozíciu nastavenia
-        if len(keys) == 1:
-            self.settings[keys[0]] = value
-        else:
-            current = self.settings
-            for k in keys[:-1]:
-                if k not in current:
-                    current[k] = {}
-                current = current[k]
-            current[keys[-1]] = value
+        # Nová snímka s kópiou iba zmenenej vetvy - čitatelia držiaci starú snímku ju vidia nezmenenú
+        with self._lock:
+            previous = self.get(key)
+            self.settings = replace_path(self.settings, keys, value)
+            self._publish(key, self.get(key), previous)
         
         return self.save()
     
@@ -173,52 +426,93 @@ class SettingsManager:
     
     def toggle_system_state(self, new_state=None):
         """Prepne alebo nastaví stav systému (aktívny/neaktívny)"""
-        if new_state is None:
-            new_state = not self.settings.get("system_active", self.DEFAULT_SETTINGS["system_active"])
-        return self.update("system_active", new_state)
+        # Prečítanie a zápis pod jedným zámkom, aby sa súbežné prepnutia nezrušili
+        with self._lock:
+            if new_state is None:
+                new_state = not self.settings.get("system_active", self.DEFAULT_SETTINGS["system_active"])
+            return self.update("system_active", new_state)
+    
+    def subscribe(self, pattern, handler, **options):
+        """Odber zmien nastavení a stavu zariadení
+        
+        Args:
+            pattern (str): Cesta alebo vzor cesty (napr. 'system_active', 'sensor_status.*')
+            handler (callable): handler(SettingChanged), pri dávkovaní handler(zoznam udalostí) -
+                                volá sa vo vlákne odberateľa
+            **options: name, queue_size, batch_size, batch_interval (pozri event_bus.Subscription)
+        
+        Returns:
+            Subscription: Odber, ktorý sa dá zrušiť cez unsubscribe
+        """
+        options.setdefault("name", f"settings:{pattern}")
+        return event_bus.subscribe(SettingChanged, handler,
+                                   match=lambda event: path_matches(pattern, event.path), **options)
+    
+    def unsubscribe(self, subscription):
+        """Zrušenie odberu zmien"""
+        event_bus.unsubscribe(subscription)
+    
+    def _publish(self, path, value, previous):
+        """Zverejnenie zmeny na ceste kľúčov (volá sa pod zámkom, aby poradie zodpovedalo snímkam)"""
+        if event_bus.has_subscribers(SettingChanged):
+            event_bus.publish(SettingChanged(path, value, previous))
+    
+    def _change_state(self, change, device_ids=(), status_ids=()):
+        """Zmena v StateStore a zverejnenie zmenených záznamov zariadení a stavov"""
+        with self._lock:
+            devices_before = self.state_store.devices
+            status_before = self.state_store.status
+            result = change()
+            for section, ids, before, after in (("sensor_devices", device_ids, devices_before, self.state_store.devices),
+                                                ("sensor_status", status_ids, status_before, self.state_store.status)):
+                for device_id in ids:
+                    if after.get(device_id) != before.get(device_id):
+                        self._publish(f"{section}.{device_id}", after.get(device_id), before.get(device_id))
+        return result
     
     def get_sensor_devices(self):
-        """Získa zoznam známych zariadení senzorov"""
-        return self.settings.get("sensor_devices", {})
+        """Získa známe zariadenia senzorov (nemenná snímka)"""
+        return self.state_store.devices
     
     def add_sensor_device(self, device_id, device_data):
         """Pridá alebo aktualizuje zariadenie senzora"""
-        if "sensor_devices" not in self.settings:
-            self.settings["sensor_devices"] = {}
+        # Aktualizuje alebo pridá zariadenie - zachová ostatné uložené údaje (napr. handle)
+        return self._change_state(lambda: self.state_store.update_device(device_id, device_data),
+                                  device_ids=(device_id,))
+    
+    def apply_sensor_updates(self, devices, statuses, save=True):
+        """Aplikuje dávku zmien zariadení a stavov senzorov jediným zápisom
         
-        # Aktualizuje alebo pridá zariadenie
-        self.settings["sensor_devices"][device_id] = device_data
-        return self.save()
+        Args:
+            devices (dict): ID zariadenia -> údaje zariadenia
+            statuses (dict): ID zariadenia -> zmeny stavu senzorov
+            save (bool): Ak False, zmeny sa iba zapíšu do pamäte a uložia neskôr
+        """
+        return self._change_state(lambda: self.state_store.apply(devices, statuses, persist=save),
+                                  device_ids=devices, status_ids=statuses)
+    
+    def save_sensor_state(self):
+        """Uloží zmeny stavu zariadení, ktoré sa zapísali iba do pamäte"""
+        return self.state_store.flush()
     
     def remove_sensor_device(self, device_id):
-        """Odstráni zariadenie senzora"""
-        if "sensor_devices" in self.settings and device_id in self.settings["sensor_devices"]:
-            del self.settings["sensor_devices"][device_id]
-            # Tiež odstráň zo stavu senzorov, ak existuje
-            if "sensor_status" in self.settings and device_id in self.settings["sensor_status"]:
-                del self.settings["sensor_status"][device_id]
-            return self.save()
-        return False
+        """Odstráni zariadenie senzora (aj jeho stav)"""
+        return self._change_state(lambda: self.state_store.remove_device(device_id),
+                                  device_ids=(device_id,), status_ids=(device_id,))
     
     def get_sensor_status(self):
-        """Získa aktuálny stav všetkých senzorov"""
-        return self.settings.get("sensor_status", {})
+        """Získa aktuálny stav všetkých senzorov (nemenná snímka)"""
+        return self.state_store.status
     
     def update_sensor_status(self, device_id, status_data):
         """Aktualizuje stav senzora"""
-        if "sensor_status" not in self.settings:
-            self.settings["sensor_status"] = {}
-        
-        # Aktualizuje alebo pridá stav
-        current_status = self.settings["sensor_status"].get(device_id, {})
-        current_status.update(status_data)
-        current_status["last_updated"] = time.time()
-        
-        self.settings["sensor_status"][device_id] = current_status
-        return self.save()
+        return self._change_state(lambda: self.state_store.update_status(device_id, status_data),
+                                  status_ids=(device_id,))
 
 # Vytvor globálnu inštanciu manažéra nastavení
 settings_manager = SettingsManager()
+# Neuložené zmeny odloženého zápisu sa zapíšu aj pri ukončení bez on_stop
+atexit.register(settings_manager.flush)
 
 # Vytvor spiatočne kompatibilné funkcie pre jednoduchú migráciu z predošlej verzie
 def load_settings():
@@ -229,6 +523,10 @@ def save_settings():
     """Kompatibilná funkcia - uloží nastavenia"""
     return settings_manager.save()
 
+def flush_settings():
+    """Kompatibilná funkcia - okamžite zapíše neuložené zmeny"""
+    return settings_manager.flush()
+
 def get_setting(key, default=None):
     """Kompatibilná funkcia - získa nastavenie"""
     return settings_manager.get(key, default)
@@ -249,6 +547,18 @@ def toggle_system_state(new_state=None):
     """Kompatibilná funkcia - prepne stav systému"""
     return settings_manager.toggle_system_state(new_state)
 
+def subscribe_setting(pattern, handler, **options):
+    """Kompatibilná funkcia - odber zmien nastavení a stavu zariadení"""
+    return settings_manager.subscribe(pattern, handler, **options)
+
+def unsubscribe_setting(subscription):
+    """Kompatibilná funkcia - zrušenie odberu zmien"""
+    return settings_manager.unsubscribe(subscription)
+
+def migrate_runtime_state():
+    """Presun prevádzkového stavu zo staršieho súboru nastavení (pri štarte aplikácie)"""
+    return settings_manager.migrate_runtime_state()
+
 def get_sensor_devices():
     """Kompatibilná funkcia - získa zariadenia senzorov"""
     return settings_manager.get_sensor_devices()
@@ -257,6 +567,14 @@ def add_sensor_device(device_id, device_data):
     """Kompatibilná funkcia - pridá zariadenie senzora"""
     return settings_manager.add_sensor_device(device_id, device_data)
 
+def apply_sensor_updates(devices, statuses, save=True):
+    """Kompatibilná funkcia - aplikuje dávku zmien zariadení a stavov"""
+    return settings_manager.apply_sensor_updates(devices, statuses, save)
+
+def save_sensor_state():
+    """Kompatibilná funkcia - uloží stav zariadení zapísaný iba do pamäte"""
+    return settings_manager.save_sensor_state()
+
 def remove_sensor_device(device_id):
     """Kompatibilná funkcia - odstráni zariadenie senzora"""
     return settings_manager.remove_sensor_device(device_id)
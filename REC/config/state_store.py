@@ -0,0 +1,213 @@
+"""
+Modul pre úložisko prevádzkového stavu zariadení a senzorov.
+
+Nastavenia (PIN, porty, SMTP) sa menia zriedka, záznamy zariadení
+a stavy senzorov pri každej správe. Prevádzkový stav preto nie je
+v settings.json, ale v samostatnej databáze SQLite v režime WAL - zmena
+jedného zariadenia zapíše iba jeho riadok a konfiguračný súbor sa pri
+príjme správ vôbec neprepisuje.
+
+Údaje sa držia aj v pamäti (slovníky devices a status), čítanie tak
+nesiahne na disk. Zmeny s persist=False sa iba označia a zapíšu pri
+flush() jednou transakciou.
+
+Slovníky v pamäti sú nemenné snímky (FrozenDict). Zmena pod zámkom
+zostaví novú snímku so skopírovanými zmenenými záznamami a nahradí ňou
+devices/status, čitatelia preto iterujú bez zámku.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from config.frozen import FrozenDict, freeze
+
+
+class StateStore:
+    """Úložisko záznamov zariadení a stavov senzorov v SQLite (WAL)"""
+
+    def __init__(self, path=None):
+        """Inicializácia úložiska
+
+        Args:
+            path (str, optional): Cesta k databáze (predvolene config/state.db)
+        """
+        self.path = path or os.path.join(os.path.dirname(__file__), "state.db")
+        self.devices = FrozenDict()
+        self.status = FrozenDict()
+        self._conn = None
+        self._lock = threading.Lock()
+        self._dirty_devices = set()
+        self._dirty_status = set()
+        self.stats = {
+            "commits": 0,
+            "rows_written": 0,
+            "errors": 0
+        }
+
+    def open(self, path=None):
+        """Otvorenie databázy (pri zadanej ceste inej databázy) a načítanie stavu do pamäte"""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+            if path:
+                self.path = path
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Spojenie používajú vlákna príjmu aj UI, prístup chráni zámok
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Vo WAL režime zápis nečaká na fsync, pri výpadku napájania
+            # sa môžu stratiť iba posledné transakcie, databáza zostane celá
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS devices (device_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS status (device_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._conn.commit()
+
+            self.devices = self._load_table("devices")
+            self.status = self._load_table("status")
+            self._dirty_devices.clear()
+            self._dirty_status.clear()
+        print(f"DEBUG: Stav zariadení načítaný z {self.path} ({len(self.devices)} zariadení)")
+
+    def close(self):
+        """Zápis čakajúcich zmien a zatvorenie databázy"""
+        self.flush()
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def is_empty(self):
+        """Kontrola, či úložisko neobsahuje žiadne zariadenie ani stav"""
+        return not self.devices and not self.status
+
+    def import_state(self, devices, statuses):
+        """Jednorazový import stavu (migrácia zo settings.json)
+
+        Returns:
+            bool: True, ak sa stav uložil
+        """
+        with self._lock:
+            new_devices = dict(self.devices)
+            for device_id, device_data in (devices or {}).items():
+                new_devices[device_id] = freeze(device_data)
+                self._dirty_devices.add(device_id)
+            new_statuses = dict(self.status)
+            for device_id, status_data in (statuses or {}).items():
+                new_statuses[device_id] = freeze(status_data)
+                self._dirty_status.add(device_id)
+            self.devices = FrozenDict(new_devices)
+            self.status = FrozenDict(new_statuses)
+            return self._commit()
+
+    def update_device(self, device_id, device_data, persist=True):
+        """Pridanie alebo aktualizácia záznamu zariadenia (ostatné polia sa zachovajú)"""
+        return self.apply({device_id: device_data}, {}, persist)
+
+    def update_status(self, device_id, status_data, persist=True):
+        """Aktualizácia stavu senzorov zariadenia (nastaví aj last_updated)"""
+        return self.apply({}, {device_id: status_data}, persist)
+
+    def apply(self, devices, statuses, persist=True):
+        """Aplikovanie dávky zmien zariadení a stavov senzorov
+
+        Args:
+            devices (dict): ID zariadenia -> údaje zariadenia
+            statuses (dict): ID zariadenia -> zmeny stavu senzorov
+            persist (bool): Ak False, zmeny sa iba zapíšu do pamäte a uložia pri flush()
+
+        Returns:
+            bool: True, ak sa zmeny uložili (alebo sa uložiť nemali)
+        """
+        now = time.time()
+        with self._lock:
+            if devices:
+                new_devices = dict(self.devices)
+                for device_id, device_data in devices.items():
+                    device = dict(new_devices.get(device_id, {}))
+                    device.update(device_data)
+                    new_devices[device_id] = freeze(device)
+                    self._dirty_devices.add(device_id)
+                self.devices = FrozenDict(new_devices)
+
+            if statuses:
+                new_statuses = dict(self.status)
+                for device_id, status_data in statuses.items():
+                    current_status = dict(new_statuses.get(device_id, {}))
+                    current_status.update(status_data)
+                    current_status["last_updated"] = now
+                    new_statuses[device_id] = freeze(current_status)
+                    self._dirty_status.add(device_id)
+                self.status = FrozenDict(new_statuses)
+
+            if not persist:
+                return True
+            return self._commit()
+
+    def remove_device(self, device_id):
+        """Odstránenie zariadenia a jeho stavu
+
+        Returns:
+            bool: True, ak zariadenie existovalo a odstránilo sa
+        """
+        with self._lock:
+            if device_id not in self.devices:
+                return False
+            self.devices = FrozenDict((key, value) for key, value in self.devices.items() if key != device_id)
+            self.status = FrozenDict((key, value) for key, value in self.status.items() if key != device_id)
+            self._dirty_devices.add(device_id)
+            self._dirty_status.add(device_id)
+            return self._commit()
+
+    def flush(self):
+        """Uloženie zmien, ktoré sa zapísali iba do pamäte"""
+        with self._lock:
+            if not self._dirty_devices and not self._dirty_status:
+                return True
+            return self._commit()
+
+    def get_stats(self):
+        """Získanie počtu transakcií, zapísaných riadkov a čakajúcich zmien"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["devices"] = len(self.devices)
+            stats["pending"] = len(self._dirty_devices) + len(self._dirty_status)
+        return stats
+
+    def _load_table(self, table):
+        """Načítanie tabuľky do slovníka (volá sa pod zámkom)"""
+        rows = {}
+        for device_id, data in self._conn.execute(f"SELECT device_id, data FROM {table}"):
+            try:
+                rows[device_id] = freeze(json.loads(data))
+            except ValueError:
+                print(f"WARNING: Poškodený záznam {device_id} v tabuľke {table}, preskakujem")
+        return FrozenDict(rows)
+
+    def _commit(self):
+        """Zápis označených riadkov jednou transakciou (volá sa pod zámkom)"""
+        if self._conn is None:
+            return False
+        try:
+            with self._conn:
+                written = self._write_rows("devices", self.devices, self._dirty_devices)
+                written += self._write_rows("status", self.status, self._dirty_status)
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            print(f"ERROR: Zlyhalo uloženie stavu zariadení: {e}")
+            return False
+        self._dirty_devices.clear()
+        self._dirty_status.clear()
+        self.stats["commits"] += 1
+        self.stats["rows_written"] += written
+        return True
+
+    def _write_rows(self, table, rows, dirty):
+        """Zápis alebo zmazanie označených riadkov tabuľky"""
+        upserts = [(device_id, json.dumps(rows[device_id])) for device_id in dirty if device_id in rows]
+        deletes = [(device_id,) for device_id in dirty if device_id not in rows]
+        if upserts:
+            self._conn.executemany(f"INSERT OR REPLACE INTO {table} (device_id, data) VALUES (?, ?)", upserts)
+        if deletes:
+            self._conn.executemany(f"DELETE FROM {table} WHERE device_id = ?", deletes)
+        return len(upserts) + len(deletes)
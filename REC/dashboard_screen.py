@@ -7,12 +7,13 @@ from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.uix.image import Image
 from kivy.uix.carousel import Carousel
-from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
 import os
-from config.settings import get_sensor_devices, get_sensor_status, remove_sensor_device, get_setting
+from config.settings import get_sensor_devices, get_sensor_status, get_setting, subscribe_setting
+from event_bus import event_bus, PresenceChanged, ImageReceived
+from network import network_manager
+from presence import presence_tracker
 
 class SensorCard(BoxLayout):
     """Widget pre zobrazenie jedného zariadenia senzora"""
@@ -368,8 +369,8 @@ class SensorCard(BoxLayout):
         """Odstránenie zariadenia zo systému"""
         popup.dismiss()
         
-        # Odstránenie zariadenia z konfigurácie
-        success = remove_sensor_device(self.device_id)
+        # Odstránenie zariadenia zo systému
+        success = network_manager.remove_device(self.device_id)
         
         if success and self.refresh_callback:
             self.refresh_callback()
@@ -423,8 +424,15 @@ class DashboardScreen(BaseScreen):
         # Uloženie kariet senzorov podľa ID zariadenia
         self.sensor_cards = {}
         
-        # Naplánovanie pravidelných aktualizácií
-        Clock.schedule_interval(self.update_dashboard, 5)  # Aktualizácia každých 5 sekúnd
+        # Aktualizácia pri zmene namiesto pravidelného čítania - mení sa iba karta zmeneného zariadenia
+        subscribe_setting("sensor_status.*", self.on_main_thread(self._on_status_changed),
+                          name="dashboard-status", **self.CHANGE_BATCH)
+        subscribe_setting("sensor_devices.*", self.on_main_thread(self._on_devices_changed),
+                          name="dashboard-devices", **self.CHANGE_BATCH)
+        event_bus.subscribe(PresenceChanged, self.on_main_thread(self.refresh_dashboard),
+                            name="dashboard-presence", **self.CHANGE_BATCH)
+        event_bus.subscribe(ImageReceived, self.on_main_thread(self._on_images_received),
+                            name="dashboard-images", **self.CHANGE_BATCH)
     
     def on_enter(self):
         """Volá sa pri vstupe na obrazovku"""
@@ -465,19 +473,12 @@ class DashboardScreen(BaseScreen):
         
         # Aktualizácia alebo pridanie kariet pre každé zariadenie
         for device_id, device_data in devices.items():
-            # Kontrola, či bolo zariadenie videné v poslednej hodine
-            if 'last_seen' in device_data:
-                try:
-                    last_seen = datetime.fromisoformat(device_data['last_seen'])
-                    now = datetime.now()
-                    # Preskočenie zariadení, ktoré neboli videné v poslednej hodine
-                    if (now - last_seen).total_seconds() > 3600:
-                        if device_id in self.sensor_cards:
-                            self.sensors_layout.remove_widget(self.sensor_cards[device_id])
-                            del self.sensor_cards[device_id]
-                        continue
-                except (ValueError, TypeError):
-                    pass
+            # Preskočenie zariadení, ktoré sú podľa sledovania prítomnosti offline
+            if not presence_tracker.is_online(device_id):
+                if device_id in self.sensor_cards:
+                    self.sensors_layout.remove_widget(self.sensor_cards[device_id])
+                    del self.sensor_cards[device_id]
+                continue
             
             if device_id in self.sensor_cards:
                 # Aktualizácia existujúcej karty
@@ -490,9 +491,25 @@ class DashboardScreen(BaseScreen):
                 self.sensor_cards[device_id] = card
                 self.sensors_layout.add_widget(card)
     
-    def update_dashboard(self, dt):
-        """Aktualizácia dashboardu na časovači"""
-        self.refresh_dashboard()
+    def _on_status_changed(self, events):
+        """Aktualizácia kariet zariadení, ktorým sa zmenil stav senzorov"""
+        statuses = get_sensor_status()
+        for device_id in {event.path.split('.', 1)[1] for event in events if '.' in event.path}:
+            card = self.sensor_cards.get(device_id)
+            if card:
+                card.update_status(statuses.get(device_id, {}))
+    
+    def _on_devices_changed(self, events):
+        """Obnovenie dashboardu pri pridaní alebo odstránení zariadenia (nie pri kontakte)"""
+        if any(event.previous is None or event.value is None for event in events):
+            self.refresh_dashboard()
+    
+    def _on_images_received(self, events):
+        """Obnovenie náhľadu na kartách zariadení, od ktorých prišiel obrázok"""
+        for device_id in {event.device_id for event in events}:
+            card = self.sensor_cards.get(device_id)
+            if card:
+                card._update_preview_image()
     
     def go_back(self, instance):
         """Návrat na hlavnú obrazovku"""
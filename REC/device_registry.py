@@ -0,0 +1,94 @@
+"""
+Modul pre register známych zariadení senzorov v pamäti.
+
+Register drží indexy ID zariadenia -> záznam a IP adresa -> ID zariadenia,
+aby sa odosielateľ prijatej správy dal určiť bez čítania nastavení.
+Sieťoví poslucháči ho aktualizujú spolu so zápisom do nastavení.
+"""
+import threading
+try:
+    from config.settings import get_sensor_devices
+except ImportError:
+    def get_sensor_devices():
+        return {}
+
+
+class DeviceRegistry:
+    """Register zariadení s indexmi podľa ID a IP adresy"""
+
+    def __init__(self):
+        """Inicializácia registra z uložených zariadení"""
+        self._lock = threading.Lock()
+        self._devices = {}
+        self._by_ip = {}
+        self.load()
+
+    def load(self):
+        """Načítanie zariadení z nastavení"""
+        with self._lock:
+            self._devices.clear()
+            self._by_ip.clear()
+            for device_id, device_data in get_sensor_devices().items():
+                self._devices[device_id] = dict(device_data)
+                if device_data.get("ip"):
+                    self._by_ip[device_data["ip"]] = device_id
+
+    def update(self, device_id, device_data):
+        """Pridanie alebo aktualizácia zariadenia (zlúči sa s existujúcim záznamom)"""
+        with self._lock:
+            record = self._devices.setdefault(device_id, {})
+            old_ip = record.get("ip")
+            record.update(device_data)
+
+            new_ip = record.get("ip")
+            if old_ip and old_ip != new_ip and self._by_ip.get(old_ip) == device_id:
+                self._reindex_ip(old_ip)
+            if new_ip:
+                # Pri viacerých zariadeniach za jednou IP (NAT) vyhráva naposledy ohlásené
+                self._by_ip[new_ip] = device_id
+
+    def update_many(self, devices):
+        """Aktualizácia viacerých zariadení naraz (ID zariadenia -> údaje)"""
+        for device_id, device_data in devices.items():
+            self.update(device_id, device_data)
+
+    def remove(self, device_id):
+        """Odstránenie zariadenia z registra"""
+        with self._lock:
+            record = self._devices.pop(device_id, None)
+            if record and self._by_ip.get(record.get("ip")) == device_id:
+                self._reindex_ip(record["ip"])
+
+    def get(self, device_id):
+        """Získanie kópie záznamu zariadenia, None ak zariadenie nie je známe"""
+        with self._lock:
+            record = self._devices.get(device_id)
+            return dict(record) if record is not None else None
+
+    def resolve(self, device_id=None, ip=None):
+        """Určenie zariadenia podľa ID z hlavičky, bez ID (starší odosielatelia) podľa IP adresy
+
+        Neznáme ID sa podľa IP nehádá - za jednou adresou (NAT) môže byť viac
+        zariadení. Volajúci také zariadenie zaregistruje pod jeho ID.
+
+        Returns:
+            tuple: (ID zariadenia, kópia záznamu alebo None pre neznáme ID) alebo (None, None)
+        """
+        with self._lock:
+            if not device_id:
+                device_id = self._by_ip.get(ip)
+                if device_id is None:
+                    return None, None
+            record = self._devices.get(device_id)
+            return device_id, dict(record) if record is not None else None
+
+    def _reindex_ip(self, ip):
+        """Presmerovanie IP adresy na iné zariadenie s rovnakou adresou (volá sa pod zámkom)"""
+        self._by_ip.pop(ip, None)
+        for other_id, other in self._devices.items():
+            if other.get("ip") == ip:
+                self._by_ip[ip] = other_id
+
+
+# Globálna inštancia registra zariadení
+device_registry = DeviceRegistry()
@@ -0,0 +1,281 @@
+"""
+Modul pre asynchrónnu zbernicu udalostí prijímača.
+
+Sieťoví poslucháči udalosti iba zverejnia (publish) a hneď pokračujú
+v príjme. Každý odberateľ má vlastnú ohraničenú frontu a vlastné vlákno,
+takže pomalý odberateľ (napr. obnova UI alebo e-mail) nezdrží príjem
+paketov ani ostatných odberateľov. Pri plnej fronte sa udalosť pre daného
+odberateľa zahodí a započíta do štatistík.
+"""
+import queue
+import threading
+import time
+
+
+class SensorEvent:
+    """Správa prijatá UDP poslucháčom
+
+    Pri správe zo senzora sú vyplnené údaje senzora, pri inej správe
+    (napr. GPIO_CONFIG_UPDATED) je sensor_type None a platí iba message.
+    """
+
+    def __init__(self, message, address, device_id=None, device_name=None,
+                 sensor_type=None, status=None, received_at=None, sent_at=None):
+        self.message = message
+        self.address = address
+        self.device_id = device_id
+        self.device_name = device_name
+        self.sensor_type = sensor_type
+        self.status = status
+        self.received_at = received_at or time.time()
+        # Čas odoslania podľa hodín odosielateľa, ak ho správa nesie
+        self.sent_at = sent_at
+
+
+class ImageReceived:
+    """Správa prijatá TCP poslucháčom a spracovaná (obrázok alebo iné dáta)"""
+
+    def __init__(self, header, address, filepath=None, payload=None,
+                 device_id=None, device_name=None, received_at=None):
+        self.header = header
+        self.address = address
+        self.filepath = filepath
+        self.payload = payload
+        self.device_id = device_id
+        self.device_name = device_name
+        self.received_at = received_at or time.time()
+
+    @property
+    def data_info(self):
+        """Slovník v tvare, ktorý dostávali pôvodné TCP callbacky"""
+        data_info = {
+            "header": self.header,
+            "address": self.address,
+        }
+        if self.filepath:
+            data_info["filepath"] = self.filepath
+        if self.payload:
+            data_info["payload"] = self.payload
+        return data_info
+
+
+class DeviceSeen:
+    """Správa prijatá poslucháčom objavovania
+
+    device_id je vyplnené, ak sa zariadenie ohlásilo alebo registrovalo.
+    """
+
+    def __init__(self, message, address, device_id=None, device_name=None):
+        self.message = message
+        self.address = address
+        self.device_id = device_id
+        self.device_name = device_name
+        self.received_at = time.time()
+
+
+class PresenceChanged:
+    """Zmena dostupnosti zariadenia (online/offline) zo sledovania prítomnosti"""
+
+    def __init__(self, device_id, online):
+        self.device_id = device_id
+        self.online = online
+        self.received_at = time.time()
+
+
+class SettingChanged:
+    """Zmena nastavenia alebo prevádzkového stavu na ceste kľúčov
+
+    Cesty sú kľúče nastavení (napr. 'system_active', 'network.tcp_port')
+    a záznamy zariadení 'sensor_devices.<id>' a 'sensor_status.<id>'.
+    Prázdna cesta znamená opätovné načítanie všetkých nastavení. value
+    a previous sú nemenné snímky (None = hodnota neexistuje).
+    """
+
+    def __init__(self, path, value, previous=None):
+        self.path = path
+        self.value = value
+        self.previous = previous
+        self.received_at = time.time()
+
+
+class AlertLogChanged:
+    """Zmena denníka upozornení
+
+    action je 'added' (alert je nové upozornenie), 'read' (alert je
+    označené upozornenie) alebo 'read_all'.
+    """
+
+    def __init__(self, action, alert=None):
+        self.action = action
+        self.alert = alert
+        self.received_at = time.time()
+
+
+class Subscription:
+    """Odber jedného typu udalostí s vlastnou frontou a vláknom"""
+
+    def __init__(self, event_type, handler, name=None, queue_size=1000,
+                 batch_size=1, batch_interval=0.0, match=None):
+        """Inicializácia odberu
+
+        Args:
+            event_type (type): Typ odoberaných udalostí
+            handler (callable): handler(udalosť), pri dávkovaní handler(zoznam udalostí)
+            name (str, optional): Názov odberu pre štatistiky
+            queue_size (int): Kapacita fronty odberateľa
+            batch_size (int): Najväčší počet udalostí v jednej dávke (1 = bez dávkovania)
+            batch_interval (float): Ako dlho čakať na doplnenie dávky v sekundách
+            match (callable, optional): Do fronty sa zaradia iba udalosti, pre ktoré
+                                        match(udalosť) vráti True (vyhodnotí sa pri publish)
+        """
+        self.event_type = event_type
+        self.handler = handler
+        self.name = name or getattr(handler, "__name__", repr(handler))
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.match = match
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.active = True
+
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "delivered": 0,
+            "dropped": 0,
+            "errors": 0,
+            "last_lag": 0.0,
+            "max_lag": 0.0
+        }
+
+        self.thread = threading.Thread(target=self._run, name=f"event-{self.name}")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def offer(self, event):
+        """Zaradenie udalosti bez čakania, pri plnej fronte sa zahodí"""
+        if not self.active or (self.match is not None and not self.match(event)):
+            return
+        try:
+            self.queue.put_nowait((time.time(), event))
+        except queue.Full:
+            with self._stats_lock:
+                self.stats["dropped"] += 1
+
+    def close(self):
+        """Ukončenie odberu po doručení udalostí, ktoré už čakajú vo fronte (nikdy nečaká)"""
+        self.active = False
+        try:
+            self.queue.put_nowait((None, None))
+        except queue.Full:
+            # Pomalý odberateľ - vlákno skončí samo, keď frontu vyprázdni
+            pass
+
+    def get_stats(self):
+        """Získanie štatistík odberu"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["name"] = self.name
+        stats["event_type"] = self.event_type.__name__
+        stats["queue_depth"] = self.queue.qsize()
+        return stats
+
+    def _run(self):
+        """Hlavná slučka vlákna odberateľa"""
+        while True:
+            published_at, event = self.queue.get()
+            if event is None:
+                return
+
+            batch = [event]
+            if self.batch_size > 1:
+                deadline = time.time() + self.batch_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        _, next_event = self.queue.get(timeout=max(0, deadline - time.time()))
+                    except queue.Empty:
+                        break
+                    if next_event is None:
+                        # Odber je zrušený, slučka sa po dávke ukončí
+                        break
+                    batch.append(next_event)
+
+            lag = time.time() - published_at
+            try:
+                if self.batch_size > 1:
+                    self.handler(batch)
+                else:
+                    self.handler(event)
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats["errors"] += 1
+                print(f"ERROR: Odberateľ udalostí '{self.name}' zlyhal: {e}")
+
+            with self._stats_lock:
+                self.stats["delivered"] += len(batch)
+                self.stats["last_lag"] = lag
+                self.stats["max_lag"] = max(self.stats["max_lag"], lag)
+
+            if not self.active and self.queue.empty():
+                return
+
+
+class EventBus:
+    """Zbernica udalostí - rozposiela udalosti odberateľom podľa typu"""
+
+    def __init__(self):
+        """Inicializácia zbernice"""
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._stats_lock = threading.Lock()
+        self._published = 0
+
+    def subscribe(self, event_type, handler, **options):
+        """Prihlásenie odberu udalostí daného typu
+
+        Args:
+            event_type (type): SensorEvent, ImageReceived, DeviceSeen, PresenceChanged,
+                               SettingChanged alebo AlertLogChanged
+            handler (callable): Funkcia volaná vo vlákne odberateľa
+            **options: name, queue_size, batch_size, batch_interval, match (pozri Subscription)
+
+        Returns:
+            Subscription: Odber, ktorý sa dá zrušiť cez unsubscribe
+        """
+        subscription = Subscription(event_type, handler, **options)
+        with self._lock:
+            # Zoznam sa pri zmene nahrádza, publish tak môže čítať bez zámku
+            current = self._subscriptions.get(event_type, [])
+            self._subscriptions[event_type] = current + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Zrušenie odberu"""
+        with self._lock:
+            current = self._subscriptions.get(subscription.event_type, [])
+            self._subscriptions[subscription.event_type] = [s for s in current if s is not subscription]
+        subscription.close()
+
+    def has_subscribers(self, event_type):
+        """Kontrola, či má typ udalostí aspoň jedného odberateľa (na vynechanie zbytočnej práce)"""
+        return bool(self._subscriptions.get(event_type))
+
+    def publish(self, event):
+        """Zverejnenie udalosti všetkým odberateľom jej typu (nikdy nečaká)"""
+        with self._stats_lock:
+            self._published += 1
+        for subscription in self._subscriptions.get(type(event), ()):
+            subscription.offer(event)
+
+    def get_stats(self):
+        """Získanie štatistík zbernice a všetkých odberov"""
+        with self._lock:
+            subscriptions = [s for subs in self._subscriptions.values() for s in subs]
+        with self._stats_lock:
+            published = self._published
+        return {
+            "published": published,
+            "subscriptions": [s.get_stats() for s in subscriptions]
+        }
+
+
+# Globálna inštancia zbernice udalostí
+event_bus = EventBus()
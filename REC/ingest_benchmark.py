@@ -0,0 +1,366 @@
+"""
+Záťažový test príjmu dát prijímača.
+
+Spustí lokálny NetworkManager s dočasnými nastaveniami, denníkom upozornení
+a adresárom obrázkov a proti nemu v samostatnom procese N virtuálnych
+odosielateľov. Tí používajú skutočné protokoly - registráciu cez port
+objavovania, binárne (alebo textové) UDP správy senzorov a obrázky cez
+TCP reláciu.
+
+Výsledkom je priepustnosť, latencia od odoslania po doručenie udalosti
+odberateľom zbernice (p50/p99), straty a čas CPU prijímača na jednu udalosť. Čas CPU zahŕňa
+iba hlavný proces prijímača, pri --processes nie procesy príjmu.
+
+Príklad:
+    python REC/ingest_benchmark.py --senders 50 --rate 5 --image-rate 0.2 --duration 30
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sensor_protocol import PROTOCOL_VERSION, REGISTERED_PREFIX, pack_sensor_event
+
+
+def parse_args(argv=None):
+    """Spracovanie argumentov príkazového riadka"""
+    parser = argparse.ArgumentParser(description="Záťažový test príjmu dát prijímača")
+    parser.add_argument("--senders", type=int, default=20, help="Počet virtuálnych odosielateľov")
+    parser.add_argument("--rate", type=float, default=2.0, help="UDP udalostí za sekundu na odosielateľa")
+    parser.add_argument("--image-rate", type=float, default=0.1, help="Obrázkov za sekundu na odosielateľa")
+    parser.add_argument("--image-size", type=int, default=150000, help="Veľkosť obrázka v bajtoch")
+    parser.add_argument("--duration", type=float, default=20.0, help="Dĺžka testu v sekundách")
+    parser.add_argument("--text", action="store_true", help="Textový formát UDP správ namiesto binárneho")
+    parser.add_argument("--base-port", type=int, default=18080, help="TCP port, UDP a objavovanie sú nasledujúce")
+    parser.add_argument("--processes", type=int, default=0, help="Počet procesov príjmu (ingest.processes)")
+    parser.add_argument("--high-rate", action="store_true", help="Zapnúť network.udp_high_rate")
+    parser.add_argument("--json", action="store_true", help="Výsledok vypísať ako JSON")
+    parser.add_argument("--verbose", action="store_true", help="Zobraziť ladiace výpisy prijímača")
+    return parser.parse_args(argv)
+
+
+def prepare_environment(work_dir, args):
+    """Presmerovanie nastavení, denníka upozornení a obrázkov do dočasného adresára
+
+    Musí sa zavolať pred spustením poslucháčov, aby test neprepísal skutočné dáta.
+    """
+    from config.settings import settings_manager
+    from config.alerts_log import alerts_log_manager
+
+    settings_manager.config_dir = work_dir
+    settings_manager.settings_file_json = os.path.join(work_dir, "settings.json")
+    settings_manager.settings_file_yaml = os.path.join(work_dir, "settings.yaml")
+    settings_manager.state_store.open(os.path.join(work_dir, "state.db"))
+    settings_manager.update("system_active", False)
+    settings_manager.update("images.storage_path", os.path.join(work_dir, "captures"))
+    settings_manager.update("network.tcp_port", args.base_port)
+    settings_manager.update("network.udp_port", args.base_port + 1)
+    settings_manager.update("network.discovery_port", args.base_port + 2)
+    settings_manager.update("network.udp_high_rate", args.high_rate)
+    settings_manager.update("ingest.processes", args.processes)
+
+    alerts_log_manager.config_dir = work_dir
+    alerts_log_manager.log_file = os.path.join(work_dir, "alerts.log")
+    alerts_log_manager._write_log([])
+
+
+class VirtualSender(threading.Thread):
+    """Jeden virtuálny odosielateľ hovoriaci skutočnými protokolmi"""
+
+    def __init__(self, index, args, deadline, image_data):
+        super(VirtualSender, self).__init__()
+        self.daemon = True
+        self.args = args
+        self.deadline = deadline
+        self.image_data = image_data
+        self.device_id = f"bench-{index:04d}"
+        self.device_name = f"Benchmark {index}"
+        self.handle = None
+        self.seq = 0
+        self.stats = {"udp_sent": 0, "images_sent": 0, "images_busy": 0, "images_failed": 0}
+
+    def run(self):
+        """Odosielanie udalostí a obrázkov do uplynutia času testu"""
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if not self.args.text:
+            self.handle = self._register(udp)
+
+        session = None
+        udp_interval = 1.0 / self.args.rate if self.args.rate > 0 else None
+        image_interval = 1.0 / self.args.image_rate if self.args.image_rate > 0 else None
+        # Rozloženie začiatkov, aby odosielatelia neposielali naraz
+        next_udp = time.time() + (udp_interval or 0) * (hash(self.device_id) % 1000) / 1000
+        next_image = time.time() + (image_interval or 0) * (hash(self.device_id[::-1]) % 1000) / 1000
+
+        try:
+            while time.time() < self.deadline:
+                now = time.time()
+                if udp_interval and now >= next_udp:
+                    self._send_event(udp)
+                    next_udp += udp_interval
+                if image_interval and now >= next_image:
+                    session = self._send_image(session)
+                    next_image += image_interval
+                pending = [self.deadline]
+                if udp_interval:
+                    pending.append(next_udp)
+                if image_interval:
+                    pending.append(next_image)
+                time.sleep(max(0, min(pending) - time.time()))
+        finally:
+            udp.close()
+            if session:
+                session.close()
+
+    def _register(self, udp):
+        """Registrácia pre binárny protokol, None ak prijímač neodpovie"""
+        udp.settimeout(2)
+        message = f"REGISTER:{PROTOCOL_VERSION}:{self.device_id}:{self.device_name}"
+        try:
+            for _ in range(3):
+                udp.sendto(message.encode(), ("127.0.0.1", self.args.base_port + 2))
+                try:
+                    data, _ = udp.recvfrom(1024)
+                except socket.timeout:
+                    continue
+                data = data.decode()
+                if data.startswith(REGISTERED_PREFIX):
+                    return int(data.split(":")[2])
+        finally:
+            udp.settimeout(None)
+        return None
+
+    def _send_event(self, udp):
+        """Odoslanie jednej udalosti senzora pohybu"""
+        self.seq += 1
+        message = None
+        if self.handle is not None:
+            message = pack_sensor_event(self.handle, "motion", "DETECTED", self.seq, time.time())
+        if message is None:
+            message = (f"SENSOR:{self.device_id}:{self.device_name}:motion:DETECTED"
+                       f":seq={self.seq}:ts={time.time():.3f}").encode()
+        udp.sendto(message, ("127.0.0.1", self.args.base_port + 1))
+        self.stats["udp_sent"] += 1
+
+    def _send_image(self, session):
+        """Odoslanie obrázka cez TCP reláciu
+
+        Returns:
+            socket: Otvorená relácia alebo None, ak sa prerušila
+        """
+        try:
+            if session is None:
+                session = socket.create_connection(("127.0.0.1", self.args.base_port), timeout=10)
+                _send_frame(session, {"type": "session_start", "version": 1,
+                                      "device_id": self.device_id, "device_name": self.device_name})
+                _recv_frame(session)
+
+            self.seq += 1
+            _send_frame(session, {
+                "type": "image",
+                "seq": self.seq,
+                "device_id": self.device_id,
+                "trigger": "motion",
+                "filename": f"{self.device_id}_{self.seq}.jpg",
+                "sent_at": time.time()
+            })
+            session.sendall(len(self.image_data).to_bytes(4, byteorder='big') + self.image_data)
+            ack = _recv_frame(session)
+            if ack and ack.get("status") == "ok":
+                self.stats["images_sent"] += 1
+            elif ack and ack.get("status") == "busy":
+                self.stats["images_busy"] += 1
+            else:
+                self.stats["images_failed"] += 1
+            return session
+        except OSError:
+            self.stats["images_failed"] += 1
+            if session:
+                session.close()
+            return None
+
+
+def _send_frame(sock, data):
+    """Odoslanie JSON rámca (4 bajty dĺžky + JSON)"""
+    frame_data = json.dumps(data).encode()
+    sock.sendall(len(frame_data).to_bytes(4, byteorder='big') + frame_data)
+
+
+def _recv_frame(sock):
+    """Prijatie JSON rámca, None ak sa spojenie zatvorilo"""
+    def recv_exactly(length):
+        data = bytearray()
+        while len(data) < length:
+            chunk = sock.recv(length - len(data))
+            if not chunk:
+                return None
+            data.extend(chunk)
+        return data
+
+    length_data = recv_exactly(4)
+    if not length_data:
+        return None
+    frame_data = recv_exactly(int.from_bytes(length_data, byteorder='big'))
+    return json.loads(frame_data.decode()) if frame_data is not None else None
+
+
+def run_fleet(args, start_at, results):
+    """Beh virtuálnych odosielateľov v samostatnom procese"""
+    time.sleep(max(0, start_at - time.time()))
+    image_data = os.urandom(args.image_size)
+    deadline = time.time() + args.duration
+    senders = [VirtualSender(index, args, deadline, image_data) for index in range(args.senders)]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+
+    totals = {}
+    for sender in senders:
+        for key, value in sender.stats.items():
+            totals[key] = totals.get(key, 0) + value
+    totals["registered"] = sum(1 for sender in senders if sender.handle is not None)
+    results.put(totals)
+
+
+def percentile(values, percent):
+    """Percentil zo zoznamu hodnôt (None pre prázdny zoznam)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(args):
+    """Spustenie testu
+
+    Returns:
+        dict: Namerané výsledky
+    """
+    work_dir = tempfile.mkdtemp(prefix="rec-benchmark-")
+    subscriptions = []
+    network_manager = None
+    try:
+        prepare_environment(work_dir, args)
+        from network import network_manager
+        from event_bus import event_bus, SensorEvent
+
+        udp_latencies = []
+        image_latencies = []
+
+        def measure_sensor_event(event):
+            if event.sent_at:
+                udp_latencies.append(time.time() - event.sent_at)
+
+        network_manager.start_listeners()
+        # Latencia sa meria pri doručení udalosti odberateľom zbernice
+        subscriptions.append(network_manager.add_tcp_callback(
+            lambda data_info, address: image_latencies.append(time.time() - data_info["header"]["sent_at"]),
+            name="benchmark-image-latency"))
+        subscriptions.append(event_bus.subscribe(SensorEvent, measure_sensor_event,
+                                                 name="benchmark-udp-latency", queue_size=100000))
+
+        time.sleep(1)
+        context = multiprocessing.get_context("fork")
+        fleet_results = context.Queue()
+        start_at = time.time() + 0.5
+        fleet = context.Process(target=run_fleet, args=(args, start_at, fleet_results))
+        cpu_before = time.process_time()
+        fleet.start()
+        sent = fleet_results.get()
+        fleet.join()
+
+        # Dobehnutie správ, ktoré ešte čakajú vo frontách
+        drain_deadline = time.time() + 10
+        while time.time() < drain_deadline:
+            ingest = network_manager.get_ingest_stats()
+            if not ingest or ingest.get("queue_depth", 0) == 0:
+                break
+            time.sleep(0.2)
+        time.sleep(1)
+        elapsed = time.time() - start_at
+        cpu_used = time.process_time() - cpu_before
+
+        udp_stats = network_manager.get_udp_stats()
+        ingest_stats = network_manager.get_ingest_stats()
+
+        udp_received = udp_stats.get("datagrams", 0)
+        events = udp_received + len(image_latencies)
+        return {
+            "senders": args.senders,
+            "registered": sent["registered"],
+            "duration": round(elapsed, 2),
+            "udp_sent": sent["udp_sent"],
+            "udp_received": udp_received,
+            "udp_dropped": sent["udp_sent"] - udp_received,
+            "udp_kernel_drops": udp_stats.get("kernel_drops"),
+            "images_sent": sent["images_sent"],
+            "images_busy": sent["images_busy"],
+            "images_failed": sent["images_failed"],
+            "images_processed": len(image_latencies),
+            "events_per_second": round(events / elapsed, 1) if elapsed else None,
+            "udp_latency_p50_ms": _ms(percentile(udp_latencies, 50)),
+            "udp_latency_p99_ms": _ms(percentile(udp_latencies, 99)),
+            "image_latency_p50_ms": _ms(percentile(image_latencies, 50)),
+            "image_latency_p99_ms": _ms(percentile(image_latencies, 99)),
+            "cpu_ms_per_event": _ms(cpu_used / events) if events else None,
+            "ingest": ingest_stats
+        }
+    finally:
+        for subscription in subscriptions:
+            event_bus.unsubscribe(subscription)
+        if network_manager is not None:
+            network_manager.stop_listeners()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _ms(seconds):
+    """Prevod sekúnd na milisekundy zaokrúhlené na desatiny"""
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def print_report(result):
+    """Výpis výsledkov testu"""
+    print("")
+    print("=== Výsledok záťažového testu ===")
+    print(f"Odosielatelia:         {result['senders']} (binárne registrovaných {result['registered']})")
+    print(f"Trvanie:               {result['duration']} s")
+    print(f"UDP odoslané/prijaté:  {result['udp_sent']} / {result['udp_received']} "
+          f"(straty {result['udp_dropped']}, v jadre {result['udp_kernel_drops']})")
+    print(f"Obrázky ok/busy/chyba: {result['images_sent']} / {result['images_busy']} / {result['images_failed']} "
+          f"(spracované {result['images_processed']})")
+    print(f"Priepustnosť:          {result['events_per_second']} udalostí/s")
+    print(f"Latencia UDP p50/p99:  {result['udp_latency_p50_ms']} / {result['udp_latency_p99_ms']} ms")
+    print(f"Latencia obr. p50/p99: {result['image_latency_p50_ms']} / {result['image_latency_p99_ms']} ms")
+    print(f"CPU na udalosť:        {result['cpu_ms_per_event']} ms")
+    if result["ingest"]:
+        print(f"Spracovanie:           {result['ingest']}")
+
+
+def main(argv=None):
+    """Vstupný bod príkazového riadka"""
+    args = parse_args(argv)
+    if args.verbose:
+        result = run_benchmark(args)
+    else:
+        # Ladiace výpisy prijímača pri záťaži zahltia výstup a skresľujú meranie
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_benchmark(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
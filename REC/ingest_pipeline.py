@@ -0,0 +1,402 @@
+"""
+Modul pre spracovanie prijatých správ mimo sieťových vlákien.
+
+Sieťoví poslucháči iba prijmú dáta a odovzdajú ich do ohraničenej fronty.
+Skupina pracovných vlákien potom správy spracuje po fázach (uloženie,
+indexovanie, aktualizácia stavu, notifikácie). Keď je fronta plná, nová
+správa sa odmietne a odosielateľ dostane signál spätného tlaku.
+
+Fronta je spravodlivá - každé zariadenie má vlastnú podfrontu s obmedzenou
+kapacitou a pracovné vlákna ich vyberajú striedavo. Zariadenie, ktoré
+posiela priveľa správ, tak čaká iba samo na seba.
+
+Správy sa delia do prioritných pruhov: "alarm" (zmeny senzorov, ktoré
+vytvárajú upozornenie a spúšťajú ochrannú dobu), "presence" (živosť
+zariadení a ostatné krátke správy) a "bulk" (obrázky). Pracovné vlákna
+berú vždy z najprioritnejšieho neprázdneho pruhu a ingest.alarm_workers
+vlákien obsluhuje iba pruh "alarm", takže čas do spustenia alarmu nezávisí
+od toho, koľko obrázkov sa práve ukladá.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+from tracing import tracer, parse_trace_id
+try:
+    from config.settings import get_setting
+except ImportError:
+    def get_setting(section, default):
+        return default
+
+
+class IngestMessage:
+    """Jedna prijatá správa prechádzajúca fázami spracovania"""
+
+    def __init__(self, kind, header, address, temp_path=None, payload=None, lane=None, events=None):
+        """Inicializácia správy
+
+        Args:
+            kind (str): Typ správy (napr. 'image', 'sensor')
+            header (dict): Hlavička správy od odosielateľa
+            address (tuple): Adresa odosielateľa (ip, port)
+            temp_path (str, optional): Dočasný súbor s prijatými dátami
+            payload (bytes, optional): Dáta správy držané v pamäti
+            lane (str, optional): Prioritný pruh (predvolene "bulk" pre obrázky, inak "presence")
+            events (list, optional): Udalosti senzorov pri správe typu 'sensor'
+        """
+        self.kind = kind
+        self.header = header
+        self.address = address
+        self.temp_path = temp_path
+        self.payload = payload
+        self.lane = lane or ("bulk" if kind == 'image' else "presence")
+        self.events = events
+        self.received_at = time.time()
+
+        # Výsledky jednotlivých fáz
+        self.filepath = None
+        self.device_id = None
+        self.device_name = None
+        self.failed_stage = None
+
+    @property
+    def fair_key(self):
+        """Kľúč spravodlivej fronty - ID zariadenia z hlavičky, inak IP adresa"""
+        return self.header.get('device_id') or self.address[0]
+
+    def discard(self):
+        """Odstránenie dočasného súboru, ak sa správa nespracovala"""
+        if self.temp_path and os.path.exists(self.temp_path):
+            try:
+                os.remove(self.temp_path)
+            except OSError as e:
+                print(f"ERROR: Zlyhalo odstránenie dočasného súboru {self.temp_path}: {e}")
+
+
+class FairQueue:
+    """Ohraničená fronta s prioritnými pruhmi a podfrontou pre každý kľúč
+
+    Položky sa vyberajú z prvého neprázdneho pruhu (pruh 0 má najvyššiu
+    prioritu) a v rámci pruhu striedavo podľa kľúča (round robin).
+    Každý pruh má vlastnú kapacitu, takže plný pruh hromadných dát
+    nezablokuje zaradenie do prioritnejších pruhov.
+    """
+
+    def __init__(self, maxsize, per_key_size, lanes=1):
+        """Inicializácia fronty
+
+        Args:
+            maxsize (int): Kapacita jedného pruhu
+            per_key_size (int): Kapacita podfronty jedného kľúča v pruhu
+            lanes (int): Počet prioritných pruhov
+        """
+        self.maxsize = maxsize
+        self.per_key_size = per_key_size
+        self._queues = [{} for _ in range(lanes)]
+        # Kľúče s čakajúcimi položkami v poradí, v akom prídu na rad
+        self._ready = [deque() for _ in range(lanes)]
+        self._sizes = [0] * lanes
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def qsize(self, lane=None):
+        """Počet čakajúcich položiek (vo všetkých pruhoch alebo v jednom)"""
+        if lane is None:
+            return sum(self._sizes)
+        return self._sizes[lane]
+
+    def key_depths(self):
+        """Počet čakajúcich položiek podľa kľúča (súčet cez pruhy)"""
+        depths = {}
+        with self._lock:
+            for queues in self._queues:
+                for key, items in queues.items():
+                    depths[key] = depths.get(key, 0) + len(items)
+        return depths
+
+    def is_key_full(self, key, lane=0):
+        """Kontrola, či je podfronta kľúča v pruhu plná"""
+        items = self._queues[lane].get(key)
+        return items is not None and len(items) >= self.per_key_size
+
+    def put(self, item, key, lane=0, block=True):
+        """Zaradenie položky do podfronty kľúča v pruhu
+
+        Raises:
+            queue.Full: Pri plnom pruhu alebo podfronte kľúča (iba ak block=False)
+        """
+        with self._not_full:
+            while self._sizes[lane] >= self.maxsize or self.is_key_full(key, lane):
+                if not block:
+                    raise queue.Full
+                self._not_full.wait()
+
+            items = self._queues[lane].get(key)
+            if items is None:
+                items = self._queues[lane][key] = deque()
+                self._ready[lane].append(key)
+            items.append(item)
+            self._sizes[lane] += 1
+            # Čakajúce vlákna môžu obsluhovať rôzne pruhy, preto sa budia všetky
+            self._not_empty.notify_all()
+
+    def get(self, lanes=None):
+        """Výber položky z najprioritnejšieho neprázdneho pruhu
+
+        Args:
+            lanes (int, optional): Obsluhovať iba prvých N pruhov (predvolene všetky)
+
+        Returns:
+            Položka alebo None, ak je fronta uzavretá a obsluhované pruhy sú prázdne
+        """
+        lanes = len(self._sizes) if lanes is None else lanes
+        with self._not_empty:
+            while True:
+                for lane in range(lanes):
+                    if self._sizes[lane]:
+                        return self._pop(lane)
+                if self._closed:
+                    return None
+                self._not_empty.wait()
+
+    def open(self):
+        """Otvorenie fronty (aj po predchádzajúcom uzavretí)"""
+        with self._lock:
+            self._closed = False
+
+    def close(self):
+        """Uzavretie fronty - get() po vyprázdnení vráti None"""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+
+    def _pop(self, lane):
+        """Výber položky ďalšieho kľúča v poradí (volá sa pod zámkom)"""
+        key = self._ready[lane].popleft()
+        items = self._queues[lane][key]
+        item = items.popleft()
+        if items:
+            self._ready[lane].append(key)
+        else:
+            del self._queues[lane][key]
+        self._sizes[lane] -= 1
+        self._not_full.notify_all()
+        return item
+
+
+class IngestPipeline:
+    """Ohraničená fronta správ spracovávaná skupinou pracovných vlákien"""
+
+    # Podiel naplnenia fronty, od ktorého hlásime spätný tlak
+    HIGH_WATERMARK = 0.8
+    # Podiel naplnenia fronty, pod ktorým sa spätný tlak uvoľní
+    LOW_WATERMARK = 0.5
+    # Prioritné pruhy od najvyššej priority
+    LANES = ("alarm", "presence", "bulk")
+
+    def __init__(self, workers=None, queue_size=None, device_queue_share=None):
+        """Inicializácia spracovania
+
+        Args:
+            workers (int, optional): Počet pracovných vlákien (predvolene ingest.workers)
+            queue_size (int, optional): Kapacita fronty (predvolene ingest.queue_size)
+            device_queue_share (float, optional): Podiel fronty, ktorý môže obsadiť jedno
+                                                  zariadenie (predvolene ingest.device_queue_share)
+        """
+        ingest_settings = get_setting("ingest", {})
+        self.worker_count = workers or ingest_settings.get("workers", 2)
+        self.alarm_worker_count = ingest_settings.get("alarm_workers", 1)
+        self.queue_size = queue_size or ingest_settings.get("queue_size", 256)
+        share = device_queue_share or ingest_settings.get("device_queue_share", 0.25)
+        self.device_queue_size = max(1, int(self.queue_size * share))
+        self.queue = FairQueue(self.queue_size, self.device_queue_size, lanes=len(self.LANES))
+        self.stages = []
+        self.routes = {}
+        self.backpressure_callbacks = []
+        self.workers = []
+        self.running = False
+        self.saturated = False
+
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "submitted": 0,
+            "processed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "device_limited": 0
+        }
+        self.device_rejections = {}
+        self.lane_stats = {lane: {"processed": 0, "last_wait": 0.0, "max_wait": 0.0} for lane in self.LANES}
+
+    def add_stage(self, name, handler, kind=None):
+        """Pridanie fázy spracovania - handler(message) sa volá v poradí pridania
+
+        Args:
+            name (str): Názov fázy
+            handler (callable): handler(message)
+            kind (str, optional): Fáza iba pre správy daného typu - takéto správy
+                                  prechádzajú len vlastnými fázami, ostatné správy
+                                  fázami pridanými bez typu
+        """
+        if kind is None:
+            self.stages.append((name, handler))
+        else:
+            self.routes.setdefault(kind, []).append((name, handler))
+
+    def add_backpressure_callback(self, callback):
+        """Pridanie callbacku callback(saturated, queue_depth) pri zmene spätného tlaku"""
+        self.backpressure_callbacks.append(callback)
+
+    def start(self):
+        """Spustenie pracovných vlákien"""
+        if self.running:
+            return
+        self.running = True
+        self.queue.open()
+        for index in range(self.worker_count):
+            worker = threading.Thread(target=self._worker, name=f"ingest-worker-{index}")
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+        for index in range(self.alarm_worker_count):
+            # Vyhradené vlákna berú iba z pruhu "alarm"
+            worker = threading.Thread(target=self._worker, args=(1,), name=f"ingest-alarm-{index}")
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+        print(f"DEBUG: Spracovanie prijatých správ spustené ({self.worker_count} vlákien, "
+              f"{self.alarm_worker_count} pre alarmy, fronta {self.queue_size})")
+
+    def stop(self, timeout=5.0):
+        """Zastavenie pracovných vlákien po spracovaní správ, ktoré už sú vo fronte"""
+        if not self.running:
+            return
+        self.running = False
+        # Vlákna dokončia správy, ktoré už čakajú, a potom skončia
+        self.queue.close()
+        for worker in self.workers:
+            worker.join(timeout)
+        self.workers = []
+        print("DEBUG: Spracovanie prijatých správ zastavené")
+
+    def submit(self, message, block=False):
+        """Zaradenie správy do fronty
+
+        Args:
+            message (IngestMessage): Prijatá správa
+            block (bool): Pri plnej fronte čakať na voľné miesto namiesto odmietnutia
+
+        Returns:
+            bool: True, ak bola správa prijatá, False pri plnej fronte
+                  alebo plnej podfronte zariadenia
+        """
+        key = message.fair_key
+        lane = self.LANES.index(message.lane)
+        try:
+            self.queue.put(message, key, lane, block=block)
+        except queue.Full:
+            if self.queue.is_key_full(key, lane):
+                # Zariadenie obsadilo svoj podiel fronty, ostatné nečakajú
+                with self._stats_lock:
+                    self.stats["device_limited"] += 1
+                    self.device_rejections[key] = self.device_rejections.get(key, 0) + 1
+                print(f"WARNING: Podfronta zariadenia {key} je plná, správa z {message.address} odmietnutá")
+                return False
+            self._count("rejected")
+            self._update_backpressure()
+            print(f"WARNING: Fronta spracovania je plná, správa z {message.address} odmietnutá")
+            return False
+
+        self._count("submitted")
+        self._update_backpressure()
+        return True
+
+    def is_saturated(self):
+        """Kontrola, či je fronta nad hranicou spätného tlaku"""
+        return self.saturated
+
+    def get_stats(self):
+        """Získanie štatistík spracovania"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+            stats["device_rejections"] = dict(self.device_rejections)
+            stats["lanes"] = {lane: dict(lane_stats, depth=self.queue.qsize(index))
+                              for index, (lane, lane_stats) in enumerate(self.lane_stats.items())}
+        stats["queue_depth"] = self.queue.qsize()
+        stats["queue_size"] = self.queue_size
+        stats["device_queue_size"] = self.device_queue_size
+        stats["device_queue_depths"] = self.queue.key_depths()
+        stats["workers"] = self.worker_count
+        stats["alarm_workers"] = self.alarm_worker_count
+        stats["saturated"] = self.saturated
+        return stats
+
+    def _worker(self, lanes=None):
+        """Hlavná slučka pracovného vlákna
+
+        Args:
+            lanes (int, optional): Obsluhovať iba prvých N pruhov (predvolene všetky)
+        """
+        while True:
+            message = self.queue.get(lanes)
+            if message is None:
+                return
+            try:
+                self._process(message)
+            finally:
+                self._update_backpressure()
+
+    def _process(self, message):
+        """Spracovanie jednej správy všetkými fázami"""
+        wait = time.time() - message.received_at
+        with self._stats_lock:
+            lane_stats = self.lane_stats[message.lane]
+            lane_stats["last_wait"] = wait
+            lane_stats["max_wait"] = max(lane_stats["max_wait"], wait)
+
+        # Správy TCP nesú stopu v hlavičke, udalosti senzorov si ju merajú samé
+        trace_id = parse_trace_id(message.header.get("trace_id"))
+        if trace_id:
+            tracer.start(trace_id, message.header.get("trace_origin_ns", 0),
+                         message.header.get("device_id"), f"{message.kind}:{message.header.get('trigger', '')}")
+            tracer.record(trace_id, f"{message.kind}.queue", time.perf_counter() - wait)
+
+        for name, handler in self.routes.get(message.kind, self.stages):
+            try:
+                with tracer.span(trace_id, f"{message.kind}.{name}"):
+                    handler(message)
+            except Exception as e:
+                message.failed_stage = name
+                message.discard()
+                self._count("failed")
+                print(f"ERROR: Fáza spracovania '{name}' zlyhala pre správu z {message.address}: {e}")
+                return
+        self._count("processed")
+        with self._stats_lock:
+            self.lane_stats[message.lane]["processed"] += 1
+
+    def _count(self, key):
+        """Navýšenie počítadla štatistík"""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _update_backpressure(self):
+        """Prepočet stavu spätného tlaku a oznámenie jeho zmeny"""
+        depth = self.queue.qsize()
+        with self._stats_lock:
+            if not self.saturated and depth >= self.queue_size * self.HIGH_WATERMARK:
+                self.saturated = True
+            elif self.saturated and depth <= self.queue_size * self.LOW_WATERMARK:
+                self.saturated = False
+            else:
+                return
+
+        print(f"DEBUG: Spätný tlak spracovania {'zapnutý' if self.saturated else 'vypnutý'} (fronta {depth}/{self.queue_size})")
+        for callback in self.backpressure_callbacks:
+            try:
+                callback(self.saturated, depth)
+            except Exception as e:
+                print(f"ERROR: Zlyhal callback spätného tlaku: {e}")
@@ -0,0 +1,255 @@
+"""
+Modul pre dohľad nad sieťovými poslucháčmi príjmu.
+
+Vlákno poslucháča, ktoré sa nepodarí spustiť (napr. obsadený port) alebo
+spadne, iba vypíše chybu a skončí - príjem potom potichu nefunguje.
+Dohľad (watchdog) v pravidelnom intervale kontroluje, či vlákna poslucháčov
+žijú a či neuviazli pri spracovaní. Spadnutého poslucháča nahradí novou
+inštanciou (vlákno sa nedá spustiť znova) s exponenciálne rastúcou pauzou
+medzi pokusmi a pre každého poslucháča zverejňuje stav zdravia - čas behu,
+počet reštartov, poslednú chybu a počet správ za sekundu.
+"""
+import threading
+import time
+try:
+    from config.settings import get_setting
+except ImportError:
+    def get_setting(section, default):
+        return default
+
+# Stavy sledovaného poslucháča
+STATE_RUNNING = "running"
+STATE_STALLED = "stalled"
+STATE_FAILED = "failed"
+STATE_STOPPED = "stopped"
+
+
+class SupervisedListener:
+    """Údaje o živote poslucháča, ktoré číta IngestWatchdog
+
+    Trieda sa pridáva k vláknu poslucháča (threading.Thread), ktorý má
+    príznak running a metódu clone() vracajúcu novú nespustenú inštanciu.
+    """
+    started_at = None
+    errors = 0
+    last_error = None
+    last_error_at = None
+    handled = 0
+    busy_since = None
+
+    def _mark_started(self):
+        """Zaznamenanie spustenia slučky príjmu"""
+        self.started_at = time.time()
+
+    def _record_error(self, error):
+        """Zaznamenanie chyby soketu alebo slučky príjmu"""
+        self.errors += 1
+        self.last_error = str(error)
+        self.last_error_at = time.time()
+
+    def _begin_work(self):
+        """Začiatok spracovania prijatých dát (na rozpoznanie uviaznutia)"""
+        self.busy_since = time.monotonic()
+
+    def _end_work(self, count=1):
+        """Koniec spracovania prijatých dát"""
+        self.handled += count
+        self.busy_since = None
+
+    def stall_time(self, now=None):
+        """Ako dlho v sekundách poslucháč uviazol pri spracovaní (0 = nečaká)"""
+        busy_since = self.busy_since
+        if busy_since is None:
+            return 0.0
+        return max(0.0, (time.monotonic() if now is None else now) - busy_since)
+
+
+class WatchedListener:
+    """Záznam dohľadu o jednom poslucháčovi"""
+
+    def __init__(self, name, listener, on_restart, backoff):
+        self.name = name
+        self.listener = listener
+        self.on_restart = on_restart
+        self.state = STATE_RUNNING
+        self.restarts = 0
+        self.backoff = backoff
+        self.retry_at = None
+        self.restarted_at = None
+        # Chyby predchádzajúcich inštancií poslucháča
+        self.previous_errors = 0
+        self.last_error = None
+        self.last_error_at = None
+        self.last_handled = 0
+        self.last_check = time.monotonic()
+        self.events_per_sec = 0.0
+
+
+class IngestWatchdog:
+    """Dohľad nad poslucháčmi s automatickým reštartom a stavom zdravia"""
+
+    def __init__(self, interval=None, stall_timeout=None, backoff=None, backoff_max=None):
+        """Inicializácia dohľadu
+
+        Args:
+            interval (float, optional): Interval kontroly v sekundách (ingest.watchdog_interval)
+            stall_timeout (float, optional): Po koľkých sekundách spracovania je poslucháč
+                                             uviaznutý (ingest.watchdog_stall_timeout)
+            backoff (float, optional): Pauza pred prvým reštartom (ingest.restart_backoff)
+            backoff_max (float, optional): Najdlhšia pauza medzi reštartmi (ingest.restart_backoff_max)
+        """
+        ingest_settings = get_setting("ingest", {})
+        self.interval = interval or ingest_settings.get("watchdog_interval", 2)
+        self.stall_timeout = stall_timeout or ingest_settings.get("watchdog_stall_timeout", 30)
+        self.backoff = backoff or ingest_settings.get("restart_backoff", 1)
+        self.backoff_max = backoff_max or ingest_settings.get("restart_backoff_max", 60)
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def watch(self, name, listener, on_restart=None):
+        """Zaradenie poslucháča pod dohľad
+
+        Args:
+            name (str): Názov poslucháča v stave zdravia (napr. 'tcp')
+            listener (SupervisedListener): Spustený poslucháč
+            on_restart (callable, optional): on_restart(nový poslucháč) po reštarte
+        """
+        with self._lock:
+            self._watched[name] = WatchedListener(name, listener, on_restart, self.backoff)
+
+    def start(self):
+        """Spustenie vlákna dohľadu"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-watchdog")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Zastavenie vlákna dohľadu a vyradenie všetkých poslucháčov"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+        with self._lock:
+            self._watched = {}
+
+    @property
+    def healthy(self):
+        """Kontrola, či všetci sledovaní poslucháči bežia a neuviazli"""
+        with self._lock:
+            return all(entry.state == STATE_RUNNING for entry in self._watched.values())
+
+    def check(self, now=None):
+        """Kontrola všetkých poslucháčov a reštart spadnutých, ktorým uplynula pauza
+
+        Returns:
+            list: Názvy reštartovaných poslucháčov
+        """
+        now = time.monotonic() if now is None else now
+        restarted = []
+        with self._lock:
+            entries = list(self._watched.values())
+
+        for entry in entries:
+            listener = entry.listener
+            elapsed = now - entry.last_check
+            if elapsed > 0:
+                entry.events_per_sec = max(0, listener.handled - entry.last_handled) / elapsed
+            entry.last_handled = listener.handled
+            entry.last_check = now
+            if listener.last_error:
+                entry.last_error = listener.last_error
+                entry.last_error_at = listener.last_error_at
+
+            if listener.is_alive():
+                stalled = listener.stall_time(now) > self.stall_timeout
+                if stalled and entry.state != STATE_STALLED:
+                    print(f"WARNING: Poslucháč {entry.name} uviazol pri spracovaní "
+                          f"(viac ako {self.stall_timeout} s)")
+                entry.state = STATE_STALLED if stalled else STATE_RUNNING
+                if (entry.backoff > self.backoff and entry.restarted_at is not None
+                        and now - entry.restarted_at >= self.backoff_max):
+                    # Poslucháč po reštarte dlho beží, ďalší pád začne znova krátkou pauzou
+                    entry.backoff = self.backoff
+                continue
+
+            if not listener.running:
+                # Poslucháča zastavil správca siete
+                entry.state = STATE_STOPPED
+                continue
+
+            if entry.state != STATE_FAILED:
+                entry.state = STATE_FAILED
+                entry.retry_at = now + entry.backoff
+                print(f"ERROR: Poslucháč {entry.name} nebeží ({entry.last_error or 'neznáma chyba'}), "
+                      f"reštart o {entry.backoff:.1f} s")
+            if now >= entry.retry_at and self._restart(entry, now):
+                restarted.append(entry.name)
+        return restarted
+
+    def _restart(self, entry, now):
+        """Nahradenie spadnutého poslucháča novou inštanciou"""
+        old = entry.listener
+        try:
+            listener = old.clone()
+            listener.start()
+        except Exception as e:
+            entry.last_error = str(e)
+            entry.last_error_at = time.time()
+            print(f"ERROR: Reštart poslucháča {entry.name} zlyhal: {e}")
+            return False
+        finally:
+            entry.retry_at = now + entry.backoff
+            entry.backoff = min(entry.backoff * 2, self.backoff_max)
+
+        entry.previous_errors += old.errors
+        entry.listener = listener
+        entry.restarts += 1
+        entry.restarted_at = now
+        entry.last_handled = 0
+        entry.state = STATE_RUNNING
+        if entry.on_restart:
+            entry.on_restart(listener)
+        print(f"DEBUG: Poslucháč {entry.name} reštartovaný ({entry.restarts}. reštart)")
+        return True
+
+    def get_health(self):
+        """Získanie stavu zdravia všetkých sledovaných poslucháčov
+
+        Returns:
+            dict: Názov poslucháča -> stav, čas behu, reštarty, chyby, správy za sekundu
+        """
+        now = time.monotonic()
+        health = {}
+        with self._lock:
+            entries = list(self._watched.values())
+        for entry in entries:
+            listener = entry.listener
+            started_at = listener.started_at
+            alive = listener.is_alive()
+            health[entry.name] = {
+                "state": entry.state,
+                "alive": alive,
+                "uptime": time.time() - started_at if alive and started_at else 0.0,
+                "restarts": entry.restarts,
+                "errors": entry.previous_errors + listener.errors,
+                "last_error": entry.last_error,
+                "last_error_at": entry.last_error_at,
+                "events_per_sec": round(entry.events_per_sec, 2),
+                "stalled_for": listener.stall_time(now) if alive else 0.0,
+                "next_restart_in": (max(0.0, entry.retry_at - now)
+                                    if entry.state == STATE_FAILED else None)
+            }
+        return health
+
+    def _run(self):
+        """Slučka pravidelnej kontroly"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"ERROR: Chyba dohľadu nad poslucháčmi: {e}")
@@ -0,0 +1,169 @@
+"""
+Modul pre príjem dát vo viacerých procesoch.
+
+Pri nastavení ingest.processes > 0 sa TCP a UDP poslucháči nespúšťajú
+v procese aplikácie, ale v N samostatných procesoch, ktoré sa na rovnaké
+porty viažu cez SO_REUSEPORT - jadro medzi ne rozdeľuje pripojenia
+a datagramy. Procesy iba prijímajú dáta (obrázky zapisujú do dočasných
+súborov) a výsledky posielajú cez spoločnú frontu hlavnému procesu.
+
+Stav zariadení, senzorov a upozornení zapisuje iba hlavný proces
+(IngestPipeline a UDPListener.process_batch), takže nastavenia a záznam
+upozornení majú stále jediného zapisovateľa.
+"""
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import threading
+from ingest_pipeline import IngestMessage
+try:
+    from config.settings import get_setting
+except ImportError:
+    def get_setting(section, default):
+        return default
+
+
+class _ForwardingPipeline:
+    """Náhrada IngestPipeline v pracovnom procese - správy posiela hlavnému procesu"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def submit(self, message):
+        """Odoslanie prijatej správy hlavnému procesu bez čakania
+
+        Returns:
+            bool: False pri plnej fronte (odosielateľ dostane "busy")
+        """
+        try:
+            self.results.put_nowait(("message", message.kind, message.header, message.address,
+                                     message.temp_path, message.payload, message.received_at))
+        except queue.Full:
+            return False
+        return True
+
+    def submit_udp_batch(self, batch):
+        """Odoslanie dávky datagramov - pri plnej fronte čaká (datagramy zadrží jadro)"""
+        self.results.put(("udp", batch))
+
+
+def _worker_main(index, results, stop_event):
+    """Hlavná funkcia pracovného procesu"""
+    # Modul network importuje tento modul, preto až tu
+    import network
+
+    # Ukončenie riadi hlavný proces cez stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    forwarding = _ForwardingPipeline(results)
+    tcp_listener = network.TCPListener(pipeline=forwarding, reuse_port=True)
+    udp_listener = network.UDPListener(reuse_port=True, sink=forwarding.submit_udp_batch)
+    tcp_listener.start()
+    udp_listener.start()
+    print(f"DEBUG: Proces príjmu {index} spustený (PID {os.getpid()})")
+
+    stop_event.wait()
+    tcp_listener.stop()
+    udp_listener.stop()
+    tcp_listener.join(5)
+    print(f"DEBUG: Proces príjmu {index} zastavený")
+
+
+class IngestWorkerPool:
+    """Skupina procesov prijímajúcich TCP a UDP dáta na zdieľaných portoch"""
+
+    def __init__(self, processes, on_message, on_udp_batch):
+        """Inicializácia skupiny procesov
+
+        Args:
+            processes (int): Počet pracovných procesov
+            on_message (callable): on_message(IngestMessage) pre prijaté TCP správy
+            on_udp_batch (callable): on_udp_batch(batch) pre dávky datagramov
+        """
+        self.process_count = processes
+        self.on_message = on_message
+        self.on_udp_batch = on_udp_batch
+        # Procesy sa vytvárajú cez fork - nový proces by inak importoval celé Kivy GUI
+        self.context = multiprocessing.get_context("fork")
+        self.results = self.context.Queue(maxsize=get_setting("ingest", {}).get("queue_size", 256))
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.forward_thread = None
+
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "messages": 0,
+            "udp_batches": 0,
+            "errors": 0
+        }
+
+    @staticmethod
+    def is_supported():
+        """Kontrola, či platforma podporuje SO_REUSEPORT a fork"""
+        return hasattr(socket, "SO_REUSEPORT") and "fork" in multiprocessing.get_all_start_methods()
+
+    def start(self):
+        """Spustenie pracovných procesov a vlákna preberajúceho ich výsledky"""
+        self.forward_thread = threading.Thread(target=self._forward, name="ingest-forward")
+        self.forward_thread.daemon = True
+        self.forward_thread.start()
+
+        for index in range(self.process_count):
+            process = self.context.Process(target=_worker_main, name=f"ingest-process-{index}",
+                                           args=(index, self.results, self.stop_event))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+        print(f"DEBUG: Príjem dát spustený v {self.process_count} procesoch (SO_REUSEPORT)")
+
+    def stop(self, timeout=5.0):
+        """Zastavenie pracovných procesov a prevzatie ich posledných výsledkov"""
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                print(f"WARNING: Proces {process.name} sa neukončil, násilne ho ukončujem")
+                process.terminate()
+        self.processes = []
+
+        # Zarážka sa zaradí za všetky výsledky, ktoré procesy stihli odoslať
+        self.results.put(None)
+        if self.forward_thread:
+            self.forward_thread.join(timeout)
+            self.forward_thread = None
+        print("DEBUG: Procesy príjmu dát zastavené")
+
+    def get_stats(self):
+        """Získanie štatistík preberania výsledkov"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["processes"] = self.process_count
+        stats["alive"] = sum(1 for process in self.processes if process.is_alive())
+        return stats
+
+    def _forward(self):
+        """Preberanie výsledkov pracovných procesov v hlavnom procese"""
+        while True:
+            item = self.results.get()
+            if item is None:
+                return
+            try:
+                if item[0] == "udp":
+                    self._count("udp_batches")
+                    self.on_udp_batch(item[1])
+                else:
+                    kind, header, address, temp_path, payload, received_at = item[1:]
+                    message = IngestMessage(kind, header, address, temp_path=temp_path, payload=payload)
+                    message.received_at = received_at
+                    self._count("messages")
+                    self.on_message(message)
+            except Exception as e:
+                self._count("errors")
+                print(f"ERROR: Zlyhalo prevzatie výsledku z procesu príjmu: {e}")
+
+    def _count(self, key):
+        """Navýšenie počítadla štatistík"""
+        with self._stats_lock:
+            self.stats[key] += 1
@@ -10,8 +10,11 @@ from kivy.uix.image import Image
 from kivy.clock import Clock
 from datetime import datetime
 import os
-from config.settings import get_setting, validate_pin, update_pin, toggle_system_state, get_alerts, get_sensor_devices, get_sensor_status
+from config.settings import get_setting, validate_pin, update_pin, toggle_system_state, get_alerts, get_sensor_devices, get_sensor_status, subscribe_setting
+from config.alerts_log import subscribe_alerts
+from event_bus import event_bus, PresenceChanged
 from network import network_manager
+from presence import presence_tracker
 
 class NumericKeypad(GridLayout):
     def __init__(self, callback, **kwargs):
@@ -160,8 +163,15 @@ class MainScreen(BaseScreen):
         # Track grace period popup
         self.grace_period_popup = None
         
-        # Naplánuj pravidelné aktualizácie
-        Clock.schedule_interval(self.update_ui, 5)  # Každých 5 sekúnd
+        # Aktualizácie pri zmene namiesto pravidelného čítania
+        subscribe_setting("system_active", self.on_main_thread(self.update_ui),
+                          name="main-screen-system", **self.CHANGE_BATCH)
+        subscribe_setting("sensor_devices.*", self.on_main_thread(self._on_devices_changed),
+                          name="main-screen-devices", **self.CHANGE_BATCH)
+        event_bus.subscribe(PresenceChanged, self.on_main_thread(lambda events: self.update_devices_summary()),
+                            name="main-screen-presence", **self.CHANGE_BATCH)
+        subscribe_alerts(self.on_main_thread(lambda events: self.update_alerts_summary()),
+                         name="main-screen-alerts", **self.CHANGE_BATCH)
         
         # More frequent checks for grace period status
         Clock.schedule_interval(self.check_grace_period, 1)  # Check every second
@@ -170,6 +180,11 @@ class MainScreen(BaseScreen):
         """Volaná pri vstupe na obrazovku"""
         self.update_ui()
         
+    def _on_devices_changed(self, events):
+        """Súhrn zariadení sa mení iba pri pridaní alebo odstránení zariadenia, nie pri kontakte"""
+        if any(event.previous is None or event.value is None for event in events):
+            self.update_devices_summary()
+        
     def update_devices_summary(self):
         """Aktualizácia súhrnu pripojených zariadení"""
         self.devices_grid.clear_widgets()
@@ -187,18 +202,8 @@ class MainScreen(BaseScreen):
         
         # Zobrazenie súhrnu zariadení
         total_devices = len(devices)
-        active_devices = 0
-        
-        # Zistenie počtu aktívnych zariadení
-        now = datetime.now()
-        for device_id, device_data in devices.items():
-            if 'last_seen' in device_data:
-                try:
-                    last_seen = datetime.fromisoformat(device_data['last_seen'])
-                    if (now - last_seen).total_seconds() < 3600:  # Aktívne v poslednej hodine
-                        active_devices += 1
-                except (ValueError, TypeError):
-                    pass
+        # Počet aktívnych zariadení udržiava sledovanie prítomnosti
+        active_devices = presence_tracker.active_count
                     
         # Prvý stĺpec - Celkový počet
         self.devices_grid.add_widget(Label(
@@ -2,300 +2,1214 @@
 Modul pre kompletnú správu sieťovej komunikácie.
 Obsahuje implementáciu sieťových poslucháčov aj centralizovaného správcu.
 """
+import asyncio
+import select
 import socket
+import struct
 import threading
 import time
 import json
 import os
+import tempfile
 from datetime import datetime
+from ingest_pipeline import IngestMessage, IngestPipeline
+from ingest_workers import IngestWorkerPool
+from ingest_watchdog import IngestWatchdog, SupervisedListener
+from device_registry import device_registry
+from event_bus import event_bus, SensorEvent, ImageReceived, DeviceSeen
+from sensor_state import sensor_state
+from presence import presence_tracker
+from upload_store import UploadStore, UploadError
+from rate_limiter import DeviceRateLimiter
+from tracing import tracer, format_trace_id
+from sensor_protocol import (DeviceHandleTable, SequenceTracker, is_binary_datagram, is_multi_datagram,
+                             unpack_sensor_event, split_multi, pack_ack, split_sequence_tokens,
+                             negotiate_version, REGISTER_PREFIX, REGISTERED_PREFIX, MAX_DATAGRAM_SIZE)
+
+# Príznak neblokujúceho čítania pri vyprázdňovaní fronty UDP socketu
+DRAIN_FLAGS = getattr(socket, "MSG_DONTWAIT", 0)
 try:
-    from config.settings import get_setting, add_sensor_device, update_sensor_status, get_sensor_devices
+    from config.settings import get_setting, remove_sensor_device
 except ImportError:
     def get_setting(section, default):
         return default
-    def add_sensor_device(device_id, data):
-        pass
-    def update_sensor_status(device_id, sensor_type, status):
-        pass
-    def get_sensor_devices():
-        return {}
+    def remove_sensor_device(device_id):
+        return False
 
-class TCPListener(threading.Thread):
-    def __init__(self):
+def get_storage_path():
+    """Získanie adresára na ukladanie obrázkov (vytvorí ho, ak neexistuje)"""
+    # Získanie cesty z nastavení
+    storage_path = get_setting("images.storage_path", "captures")
+    
+    # Ak nie je absolútna cesta, vytvor cestu relatívnu k projektu
+    if not os.path.isabs(storage_path):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        storage_path = os.path.join(base_dir, storage_path)
+        
+    # Zaisti existenciu adresára
+    os.makedirs(storage_path, exist_ok=True)
+    return storage_path
+
+
+# Fázy spracovania prijatej správy - volajú sa postupne pre každú správu
+
+def persist_image(message):
+    """Fáza uloženia - presun dočasného súboru pod konečný názov"""
+    if message.kind != 'image':
+        return
+    
+    trigger_type = message.header.get('trigger', 'unknown')
+    filename = message.header.get('filename', f"{trigger_type}_{int(time.time())}.jpg")
+    
+    # Názov súboru od odosielateľa nesmie obsahovať cestu
+    filepath = os.path.join(get_storage_path(), os.path.basename(filename))
+    
+    # Atomické premenovanie - čitatelia nikdy neuvidia neúplný obrázok
+    os.replace(message.temp_path, filepath)
+    message.temp_path = None
+    message.filepath = filepath
+    print(f"DEBUG: Uložený obrázok: {filepath}")
+
+def index_image(message):
+    """Fáza indexovania - priradenie správy k zariadeniu podľa device_id z hlavičky,
+    pri starších odosielateľoch podľa IP adresy"""
+    device_id, device = device_registry.resolve(message.header.get('device_id'), message.address[0])
+    if device_id is None:
+        return
+    if device is None:
+        # Zariadenie ohlásené zatiaľ iba hlavičkou obrázka sa zaregistruje pod svojím ID
+        device = {
+            "name": message.header.get('device_name', 'Unknown Device'),
+            "ip": message.address[0],
+            "last_seen": datetime.fromtimestamp(message.received_at).isoformat()
+        }
+        device_registry.update(device_id, device)
+        sensor_state.update({device_id: device}, {})
+        print(f"DEBUG: Zaregistrované nové zariadenie {device_id} z {message.address[0]}")
+    message.device_id = device_id
+    message.device_name = device.get('name', 'Unknown Device')
+    presence_tracker.seen(device_id)
+
+def update_image_status(message):
+    """Fáza aktualizácie stavu senzora, ktorý spustil zachytenie obrázka"""
+    trigger_type = message.header.get('trigger', 'unknown')
+    
+    # Ak je to obrázok zo senzora, aktualizuj stav senzora
+    if message.kind == 'image' and trigger_type in ['motion', 'door', 'window'] and message.device_id:
+        status = "DETECTED" if trigger_type == "motion" else "OPEN"
+        status_data = {
+            trigger_type: status,
+            "last_updated": time.time()
+        }
+        sensor_state.update({}, {message.device_id: status_data})
+        print(f"DEBUG: Aktualizovaný stav senzora {trigger_type} na {status} pre zariadenie {message.device_name}")
+
+def publish_received(message):
+    """Fáza notifikácií - zverejnenie udalosti ImageReceived na zbernici udalostí"""
+    # Ostatné typy správ odovzdáme odberateľom aj s dátami
+    event_bus.publish(ImageReceived(message.header, message.address,
+                                    filepath=message.filepath,
+                                    payload=message.payload,
+                                    device_id=message.device_id,
+                                    device_name=message.device_name,
+                                    received_at=message.received_at))
+
+
+class TCPListener(SupervisedListener, threading.Thread):
+    """TCP poslucháč pre prenos obrázkov obsluhovaný jednou asyncio slučkou.
+
+    Všetky pripojenia obsluhuje jediná slučka udalostí namiesto vlákna pre
+    každého klienta. Počet otvorených pripojení obmedzuje network.max_connections
+    (ďalšie čakajú vo fronte jadra, network.tcp_backlog) a počet súbežne
+    prijímaných dát network.max_concurrent_uploads.
+
+    Obrázky sa prijímajú cez recv_into do opakovane používaných bufferov
+    (jeden na každý slot prenosu, network.recv_chunk_size) a priebežne sa
+    zapisujú do dočasného súboru, ktorý sa po prijatí atomicky premenuje.
+    Pamäť na prenos je tak obmedzená bez ohľadu na veľkosť obrázka.
+
+    Ak je zadané spracovanie (IngestPipeline), prijatá správa sa iba zaradí
+    do jeho fronty a pri plnej fronte dostane odosielateľ potvrdenie "busy".
+    Potvrdenie "busy" dostane aj zariadenie, ktoré prekročí povolený počet
+    správ za sekundu (ingest.device_tcp_rate). Limit sa počíta podľa ID
+    zariadenia iba pre zaregistrované zariadenie z jeho IP adresy, inak
+    podľa IP adresy - zmenou ID v hlavičke sa obísť nedá. Jednorazový
+    obrázok sa neobmedzuje, taký odosielateľ ho nemôže poslať znova.
+
+    Podporované sú dva režimy:
+    - jednorazový: hlavička typu "image", obrazové dáta a zatvorenie spojenia
+    - relácia: úvodná hlavička "session_start", po nej ľubovoľný počet správ
+      (hlavička + 4 bajty dĺžky dát + dáta) a na každú správu potvrdenie "ack"
+
+    V relácii sa obrázok môže posielať aj po častiach (upload_begin,
+    upload_chunk s posunom a CRC32, upload_commit). Potvrdenie nesie posun
+    "offset", od ktorého odosielateľ pokračuje aj po prerušení spojenia.
+
+    Slučka udalostí si každú sekundu zaznamená čas (loop_heartbeat), podľa
+    ktorého IngestWatchdog rozpozná zablokovanú slučku.
+    """
+    # Maximálna povolená dĺžka JSON hlavičky (ochrana pred poškodenými dátami)
+    MAX_HEADER_LENGTH = 64 * 1024
+    # Maximálna dĺžka dát neobrazových správ, ktoré sa držia v pamäti
+    MAX_INLINE_PAYLOAD = 1024 * 1024
+    # Verzia protokolu relácií
+    SESSION_PROTOCOL_VERSION = 1
+    # Správy prenosu obrázka po častiach
+    UPLOAD_MESSAGES = ('upload_begin', 'upload_chunk', 'upload_commit')
+
+    # Odporúčaná pauza pred opakovaním správy odmietnutej pre spätný tlak
+    BUSY_RETRY_AFTER = 1.0
+    # Interval záznamu živosti slučky udalostí
+    HEARTBEAT_INTERVAL = 1.0
+
+    def __init__(self, pipeline=None, reuse_port=False):
         super(TCPListener, self).__init__()
         self.daemon = True
         self.running = False
-        self.port = get_setting("network", {}).get("tcp_port", 8080)
-        self.callbacks = []
+        self.pipeline = pipeline
+        # Viac procesov na jednom porte (IngestWorkerPool)
+        self.reuse_port = reuse_port
+        network_settings = get_setting("network", {})
+        self.port = network_settings.get("tcp_port", 8080)
+        self.backlog = network_settings.get("tcp_backlog", 128)
+        self.max_connections = network_settings.get("max_connections", 256)
+        self.max_concurrent_uploads = network_settings.get("max_concurrent_uploads", 16)
+        self.client_timeout = network_settings.get("tcp_client_timeout", 30)
+        self.session_idle_timeout = network_settings.get("tcp_session_idle_timeout", 300)
+        self.recv_chunk_size = network_settings.get("recv_chunk_size", 256 * 1024)
+        self.upload_store = UploadStore(
+            os.path.join(get_storage_path(), ".partial"),
+            max_size=network_settings.get("max_upload_size", 32 * 1024 * 1024),
+            max_age=network_settings.get("upload_partial_ttl", 3600))
+        ingest_settings = get_setting("ingest", {})
+        self.rate_limiter = DeviceRateLimiter("tcp", ingest_settings.get("device_tcp_rate", 2),
+                                              ingest_settings.get("device_tcp_burst", 10))
+        self.socket = None
+        self.loop = None
+        self.loop_heartbeat = None
+        self._serve_task = None
+        self._upload_buffers = None
+        
+    def clone(self):
+        """Nová nespustená inštancia s rovnakým spracovaním a obmedzením (na reštart)"""
+        listener = TCPListener(pipeline=self.pipeline, reuse_port=self.reuse_port)
+        listener.rate_limiter = self.rate_limiter
+        return listener
+        
+    def stall_time(self, now=None):
+        """Ako dlho v sekundách slučka udalostí nezaznamenala živosť (0 = beží)"""
+        heartbeat = self.loop_heartbeat
+        if heartbeat is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, now - heartbeat - self.HEARTBEAT_INTERVAL)
         
     def add_callback(self, callback):
-        """Pridanie callback funkcie, ktorá sa zavolá pri prijatí dát"""
-        self.callbacks.append(callback)
+        """Pridanie callback funkcie callback(data_info, address) - odber ImageReceived"""
+        return event_bus.subscribe(ImageReceived,
+                                   lambda event: callback(event.data_info, event.address))
         
     def run(self):
-        """Spustenie vlákna TCP poslucháča"""
+        """Spustenie vlákna TCP poslucháča so slučkou udalostí"""
         self.running = True
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        
+        try:
+            self._serve_task = self.loop.create_task(self._serve())
+            self.loop.run_until_complete(self._serve_task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._record_error(e)
+            print(f"ERROR: TCP poslucháč sa nepodarilo spustiť: {e}")
+        finally:
+            self.loop_heartbeat = None
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+            
+    async def _serve(self):
+        """Prijímanie pripojení s obmedzením počtu otvorených pripojení"""
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.socket.setblocking(False)
+        connection_slots = asyncio.Semaphore(self.max_connections)
+        # Každý slot prenosu má vlastný buffer, ktorý sa používa opakovane
+        self._upload_buffers = asyncio.Queue()
+        for _ in range(self.max_concurrent_uploads):
+            self._upload_buffers.put_nowait(memoryview(bytearray(self.recv_chunk_size)))
+        client_tasks = set()
         
         try:
             self.socket.bind(('0.0.0.0', self.port))
-            self.socket.listen(5)
-            print(f"DEBUG: TCP poslucháč spustený na porte {self.port}")
+            self.socket.listen(self.backlog)
+            print(f"DEBUG: TCP poslucháč spustený na porte {self.port} "
+                  f"(backlog {self.backlog}, max. {self.max_concurrent_uploads} súbežných prenosov)")
+            self._mark_started()
+            heartbeat_task = self.loop.create_task(self._heartbeat())
+            client_tasks.add(heartbeat_task)
             
             while self.running:
+                # Nové pripojenie prijmeme až keď je voľný slot pre pripojenie
+                await connection_slots.acquire()
                 try:
-                    client, address = self.socket.accept()
-                    
-                    # Vytvorenie vlákna pre obsluhu klienta
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client, address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                    
+                    client, address = await self.loop.sock_accept(self.socket)
+                except asyncio.CancelledError:
+                    connection_slots.release()
+                    raise
                 except Exception as e:
+                    connection_slots.release()
+                    self._record_error(e)
                     print(f"ERROR: Chyba TCP pripojenia: {e}")
-                    time.sleep(1)
-        except Exception as e:
-            print(f"ERROR: TCP poslucháč sa nepodarilo spustiť: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                
+                client.setblocking(False)
+                task = self.loop.create_task(self._handle_client(client, address, connection_slots))
+                client_tasks.add(task)
+                task.add_done_callback(client_tasks.discard)
         finally:
+            for task in list(client_tasks):
+                task.cancel()
+            if client_tasks:
+                await asyncio.gather(*client_tasks, return_exceptions=True)
             self.socket.close()
             
-    def _handle_client(self, client, address):
-        """Spracovanie pripojenia klienta a prijatia dát"""
-        try:
-            # Príjem hlavičky (prvé 4 bajty obsahujú dĺžku hlavičky JSON)
-            header_length_data = client.recv(4)
-            if not header_length_data:
-                print(f"DEBUG: Klient {address} sa odpojil bez odoslania dát")
-                return
-                
-            header_length = int.from_bytes(header_length_data, byteorder='big')
-            header_data = client.recv(header_length)
+    async def _heartbeat(self):
+        """Pravidelný záznam živosti slučky udalostí pre IngestWatchdog"""
+        while True:
+            self.loop_heartbeat = time.monotonic()
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
             
-            if not header_data:
-                print(f"DEBUG: Klient {address} sa odpojil bez odoslania hlavičky")
+    async def _handle_client(self, client, address, connection_slots):
+        """Spracovanie pripojenia klienta - jednorazová správa alebo relácia"""
+        try:
+            header = await asyncio.wait_for(self._recv_header(client, address), self.client_timeout)
+            if header is None:
                 return
                 
-            # Parsovanie hlavičky
-            header = json.loads(header_data.decode('utf-8'))
-            
             print(f"DEBUG: Prijatá TCP hlavička z {address}: {header}")
             
-            # Spracovanie rôznych typov dát
-            if header.get('type') == 'image':
-                self._handle_image_data(client, header, address)
+            if header.get('type') == 'session_start':
+                await self._handle_session(client, address, header)
             else:
-                print(f"WARNING: Neznámy typ dát v hlavičke: {header.get('type')}")
-                
-            # Volanie všetkých callbackov
-            data_info = {
-                "header": header,
-                "address": address,
-            }
-            for callback in self.callbacks:
-                callback(data_info, address)
+                await self._handle_message(client, address, header, in_session=False)
                 
+        except asyncio.TimeoutError:
+            print(f"WARNING: Časový limit TCP pripojenia z {address} vypršal")
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
             print(f"ERROR: Chyba pri spracovaní TCP pripojenia z {address}: {e}")
         finally:
             client.close()
+            connection_slots.release()
             
-    def _handle_image_data(self, client, header, address):
-        """Spracovanie prijatia obrazových dát"""
+    async def _handle_session(self, client, address, start_header):
+        """Obsluha trvalej relácie - viac správ cez jedno pripojenie"""
+        device_id = start_header.get('device_id', 'unknown')
+        await self._send_frame(client, {
+            "type": "session_ack",
+            "version": self.SESSION_PROTOCOL_VERSION,
+            "uploads": True
+        })
+        print(f"DEBUG: Otvorená TCP relácia so zariadením {device_id} z {address}")
+        
+        message_count = 0
         try:
-            # Čítanie dĺžky obrazových dát
-            image_length_data = client.recv(4)
-            image_length = int.from_bytes(image_length_data, byteorder='big')
-            
-            # Postupne načítavanie obrazových dát
-            received_data = bytearray()
-            bytes_received = 0
-            
-            while bytes_received < image_length:
-                chunk = client.recv(min(4096, image_length - bytes_received))
-                if not chunk:
+            while self.running:
+                header = await asyncio.wait_for(
+                    self._recv_header(client, address, expect_data=False),
+                    self.session_idle_timeout)
+                if header is None:
+                    break
+                    
+                if header.get('type') == 'session_end':
+                    await self._send_frame(client, {"type": "ack", "seq": header.get('seq'), "status": "ok"})
                     break
-                received_data.extend(chunk)
-                bytes_received += len(chunk)
                 
-            if bytes_received < image_length:
-                print(f"WARNING: Nepodarilo sa prijať všetky obrazové dáta. Očakávané: {image_length}, Prijaté: {bytes_received}")
-                return
+                # Správy relácie patria zariadeniu z úvodnej hlavičky
+                if 'device_id' in start_header:
+                    header.setdefault('device_id', start_header['device_id'])
                 
-            print(f"DEBUG: Prijaté obrazové dáta, {bytes_received} bajtov")
+                if header.get('type') in self.UPLOAD_MESSAGES:
+                    ack = await self._handle_upload(client, address, header)
+                else:
+                    ack = {"status": await self._handle_message(client, address, header, in_session=True)}
+                ack["type"] = "ack"
+                ack["seq"] = header.get('seq')
+                if ack["status"] == "busy":
+                    ack["retry_after"] = self.BUSY_RETRY_AFTER
+                await self._send_frame(client, ack)
+                message_count += 1
+        except asyncio.TimeoutError:
+            print(f"DEBUG: TCP relácia so zariadením {device_id} ukončená pre nečinnosť")
             
-            # Získanie potrebných metadát
-            trigger_type = header.get('trigger', 'unknown')
-            timestamp = header.get('timestamp')
-            filename = header.get('filename', f"{trigger_type}_{int(time.time())}.jpg")
+        print(f"DEBUG: TCP relácia so zariadením {device_id} ukončená po {message_count} správach")
             
-            # Uloženie obrazových dát
-            self._save_image_data(received_data, trigger_type, timestamp, filename, address[0])
-            
-        except Exception as e:
-            print(f"ERROR: Zlyhalo spracovanie obrazových dát: {e}")
+    async def _handle_message(self, client, address, header, in_session):
+        """Prijatie dát jednej správy a jej odovzdanie na spracovanie
+
+        Returns:
+            str: Stav pre potvrdenie - "ok", "busy" (plná fronta) alebo "error"
+        """
+        payload = None
+        message_type = header.get('type')
+        
+        # V relácii nesie dáta každá správa (dĺžka môže byť 0),
+        # jednorazové spojenie iba správa typu "image"
+        if in_session or message_type == 'image':
+            buffer_view = await self._upload_buffers.get()
+            try:
+                if message_type == 'image':
+                    payload = await asyncio.wait_for(
+                        self._recv_payload_to_file(client, buffer_view), self.client_timeout)
+                else:
+                    payload = await asyncio.wait_for(
+                        self._recv_payload_into(client, buffer_view), self.client_timeout)
+                    if payload is not None:
+                        # Kópia skôr, ako buffer dostane ďalší prenos
+                        payload = bytes(payload)
+            finally:
+                self._upload_buffers.put_nowait(buffer_view)
+            if payload is None:
+                if in_session:
+                    raise ConnectionError("Spojenie prerušené počas prenosu dát")
+                return "error"
+        else:
+            print(f"WARNING: Neznámy typ dát v hlavičke: {message_type}")
+        
+        if message_type == 'image':
+            message = IngestMessage('image', header, address, temp_path=payload)
+        else:
+            message = IngestMessage(message_type, header, address, payload=bytes(payload) if payload else None)
+        self.handled += 1
+        
+        # Jednorazový obrázok sa neobmedzuje - odosielateľ na "busy" nečaká a nezopakuje ho
+        one_shot_image = not in_session and message_type == 'image'
+        if not one_shot_image and not self.rate_limiter.allow(self._limit_key(message)):
+            self._discard(message, in_session, "prekročený limit správ")
+            return "busy"
+        
+        if self.pipeline:
+            # Spracovanie prebehne v pracovných vláknach, slučka sa hneď vracia
+            if self.pipeline.submit(message):
+                return "ok"
+            self._discard(message, in_session, "plná fronta spracovania")
+            return "busy"
+        
+        # Bez spracovania nesmú ukladanie na disk a callbacky blokovať slučku udalostí
+        return await self.loop.run_in_executor(None, self._process_message, message)
             
-    def _save_image_data(self, image_data, trigger_type, timestamp, filename, sender_ip):
-        """Uloženie prijatých obrazových dát do súboru"""
+    @staticmethod
+    def _limit_key(message):
+        """Kľúč obmedzenia rýchlosti - ID zaregistrovaného zariadenia z jeho IP, inak IP adresa"""
+        device_id = message.header.get('device_id')
+        ip = message.address[0]
+        device = device_registry.get(device_id) if device_id else None
+        if device is not None and device.get('ip') == ip:
+            return device_id
+        return ip
+    
+    @staticmethod
+    def _discard(message, in_session, reason):
+        """Zahodenie neprijatej správy, jednorazovej so zápisom do logu (nezopakuje sa)"""
+        message.discard()
+        if not in_session:
+            print(f"WARNING: Správa {message.kind} zo zariadenia {message.header.get('device_id', 'unknown')} "
+                  f"z {message.address} zahodená ({reason}), odosielateľ ju nezopakuje")
+    
+    async def _handle_upload(self, client, address, header):
+        """Spracovanie jednej správy prenosu obrázka po častiach
+
+        Returns:
+            dict: Obsah potvrdenia - stav a posun, od ktorého odosielateľ pokračuje
+        """
+        # Časť sa prijíma cez recv_into do buffera slotu prenosu, slot sa
+        # uvoľní až po jej zápise (obmedzuje počet súbežných príjmov)
+        buffer_view = await self._upload_buffers.get()
         try:
-            # Získanie cesty z nastavení
-            storage_path = get_setting("images.storage_path", "captures")
+            payload = await asyncio.wait_for(self._recv_payload_into(client, buffer_view), self.client_timeout)
+            if payload is None:
+                raise ConnectionError("Spojenie prerušené počas prenosu časti obrázka")
             
-            # Ak nie je absolútna cesta, vytvor cestu relatívnu k projektu
-            if not os.path.isabs(storage_path):
-                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                storage_path = os.path.join(base_dir, storage_path)
+            message_type = header.get('type')
+            upload_id = header.get('upload_id')
+            store = self.upload_store
+            try:
+                if message_type == 'upload_begin':
+                    offset = await self.loop.run_in_executor(None, store.begin, upload_id, header)
+                    return {"status": "ok", "offset": offset}
+                    
+                if message_type == 'upload_chunk':
+                    offset = await self.loop.run_in_executor(
+                        None, store.append, upload_id, header.get('offset'), payload, header.get('crc32'))
+                    return {"status": "ok", "offset": offset}
                 
-            # Zaisti existenciu adresára
-            os.makedirs(storage_path, exist_ok=True)
+                # upload_commit - úplný obrázok pokračuje ako bežná správa typu "image"
+                temp_path, image_header = await self.loop.run_in_executor(None, store.complete, upload_id)
+            except UploadError as e:
+                print(f"WARNING: Prenos {upload_id} z {address}: {e}")
+                if e.offset is None:
+                    return {"status": "error"}
+                # Odosielateľ pošle dáta znova od posledného platného posunu
+                return {"status": "ok", "offset": e.offset, "error": str(e)}
+        finally:
+            self._upload_buffers.put_nowait(buffer_view)
+        
+        message = IngestMessage('image', image_header, address, temp_path=temp_path)
+        if not self.rate_limiter.allow(self._limit_key(message)):
+            # Úplný prenos zostáva v úložisku, odosielateľ ho potvrdí neskôr
+            return {"status": "busy"}
+        if self.pipeline:
+            if not self.pipeline.submit(message):
+                # Úplný prenos zostáva v úložisku, kým ho odosielateľ znova nepotvrdí
+                return {"status": "busy"}
+            store.forget(upload_id)
+            return {"status": "ok"}
+        
+        store.forget(upload_id)
+        return {"status": await self.loop.run_in_executor(None, self._process_message, message)}
+        
+    async def _recv_exactly(self, client, length):
+        """Prijatie presne zadaného počtu bajtov, None ak sa klient odpojí skôr"""
+        received_data = bytearray()
+        
+        while len(received_data) < length:
+            chunk = await self.loop.sock_recv(client, min(4096, length - len(received_data)))
+            if not chunk:
+                return None
+            received_data.extend(chunk)
+            
+        return received_data
+    
+    async def _recv_header(self, client, address, expect_data=True):
+        """Príjem rámca hlavičky - 4 bajty dĺžky a JSON hlavička"""
+        header_length_data = await self._recv_exactly(client, 4)
+        if not header_length_data:
+            if expect_data:
+                print(f"DEBUG: Klient {address} sa odpojil bez odoslania dát")
+            return None
             
-            # Vytvorenie súboru
-            filepath = os.path.join(storage_path, filename)
+        header_length = int.from_bytes(header_length_data, byteorder='big')
+        if header_length > self.MAX_HEADER_LENGTH:
+            print(f"WARNING: Príliš dlhá hlavička od {address}: {header_length} bajtov")
+            return None
             
-            with open(filepath, 'wb') as f:
-                f.write(image_data)
-                
-            print(f"DEBUG: Uložený obrázok: {filepath}")
+        header_data = await self._recv_exactly(client, header_length)
+        if not header_data:
+            print(f"DEBUG: Klient {address} sa odpojil bez odoslania hlavičky")
+            return None
             
-            # Volanie notifikácií alebo logovanie
-            # Tu by sme mohli pridať kód na správu upozornení alebo logovanie udalosti
+        # Parsovanie hlavičky
+        return json.loads(header_data.decode('utf-8'))
+    
+    async def _send_frame(self, client, data):
+        """Odoslanie JSON rámca (4 bajty dĺžky + JSON) klientovi"""
+        frame_data = json.dumps(data).encode('utf-8')
+        await self.loop.sock_sendall(client, len(frame_data).to_bytes(4, byteorder='big') + frame_data)
             
-            # Ak je to obrázok zo senzora, aktualizuj stav senzora
-            if trigger_type in ['motion', 'door', 'window']:
-                # Hľadanie ID zariadenia na základe IP adresy
-                device_id = None
-                device_name = None
-                
-                devices = get_sensor_devices()
-                
-                for d_id, d_data in devices.items():
-                    if d_data.get('ip') == sender_ip:
-                        device_id = d_id
-                        device_name = d_data.get('name', 'Unknown Device')
+    async def _recv_payload_into(self, client, buffer_view):
+        """Prijatie menších dát správy cez recv_into do zadaného buffera
+
+        Returns:
+            memoryview: Prijaté dáta (časť buffera, väčšie dáta v novom bufferi),
+                        None ak neprišli celé
+        """
+        payload_length_data = await self._recv_exactly(client, 4)
+        if not payload_length_data:
+            print("WARNING: Klient sa odpojil pred odoslaním dát správy")
+            return None
+        payload_length = int.from_bytes(payload_length_data, byteorder='big')
+        if payload_length > self.MAX_INLINE_PAYLOAD:
+            raise ValueError(f"Príliš veľké dáta správy: {payload_length} bajtov")
+        if payload_length > len(buffer_view):
+            buffer_view = memoryview(bytearray(payload_length))
+        
+        payload = buffer_view[:payload_length]
+        bytes_received = 0
+        while bytes_received < payload_length:
+            count = await self.loop.sock_recv_into(client, payload[bytes_received:])
+            if not count:
+                print(f"WARNING: Nepodarilo sa prijať všetky dáta správy. Očakávané: {payload_length}")
+                return None
+            bytes_received += count
+        return payload
+    
+    async def _recv_payload_to_file(self, client, buffer_view):
+        """Prúdové prijatie obrazových dát priamo do dočasného súboru
+
+        Dáta sa čítajú cez recv_into do zadaného buffera a hneď sa zapisujú
+        na disk, takže v pamäti nikdy nie je celý obrázok.
+
+        Returns:
+            str: Cesta k dočasnému súboru, None ak neprišli všetky dáta
+        """
+        # Čítanie dĺžky obrazových dát
+        image_length_data = await self._recv_exactly(client, 4)
+        if not image_length_data:
+            print("WARNING: Klient sa odpojil pred odoslaním obrazových dát")
+            return None
+        image_length = int.from_bytes(image_length_data, byteorder='big')
+        
+        # Dočasný súbor v cieľovom adresári, aby bolo premenovanie atomické
+        storage_path = get_storage_path()
+        fd, temp_path = tempfile.mkstemp(dir=storage_path, prefix=".upload-", suffix=".part")
+        # mkstemp vytvára súbor s právami 0600, obrázky majú byť čitateľné ako doteraz
+        os.chmod(temp_path, 0o644)
+        bytes_received = 0
+        
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while bytes_received < image_length:
+                    to_read = min(len(buffer_view), image_length - bytes_received)
+                    count = await self.loop.sock_recv_into(client, buffer_view[:to_read])
+                    if not count:
                         break
-                        
-                if device_id:
-                    status = "DETECTED" if trigger_type == "motion" else "OPEN"
-                    status_data = {
-                        trigger_type: status,
-                        "last_updated": time.time()
-                    }
-                    update_sensor_status(device_id, status_data)
-                    print(f"DEBUG: Aktualizovaný stav senzora {trigger_type} na {status} pre zariadenie {device_name}")
+                    f.write(buffer_view[:count])
+                    bytes_received += count
+        except BaseException:
+            os.remove(temp_path)
+            raise
+            
+        if bytes_received < image_length:
+            print(f"WARNING: Nepodarilo sa prijať všetky obrazové dáta. Očakávané: {image_length}, Prijaté: {bytes_received}")
+            os.remove(temp_path)
+            return None
             
+        print(f"DEBUG: Prijaté obrazové dáta, {bytes_received} bajtov")
+        return temp_path
+    
+    def _process_message(self, message):
+        """Spracovanie správy všetkými fázami priamo (bez IngestPipeline)
+
+        Returns:
+            str: Stav pre potvrdenie - "ok" alebo "error"
+        """
+        try:
+            persist_image(message)
+            index_image(message)
+            update_image_status(message)
+            publish_received(message)
+            return "ok"
         except Exception as e:
-            print(f"ERROR: Zlyhalo uloženie obrázka: {e}")
+            print(f"ERROR: Zlyhalo spracovanie prijatej správy: {e}")
+            message.discard()
+            return "error"
             
     def stop(self):
         """Zastavenie vlákna TCP poslucháča"""
         self.running = False
         try:
-            self.socket.close()
-        except:
+            # Slučka beží v inom vlákne, zrušenie musí prejsť cez ňu
+            if self.loop and self._serve_task and not self.loop.is_closed():
+                self.loop.call_soon_threadsafe(self._serve_task.cancel)
+        except RuntimeError:
             pass
         print("DEBUG: TCP poslucháč zastavený")
 
 
-class UDPListener(threading.Thread):
-    def __init__(self):
+class UDPListener(SupervisedListener, threading.Thread):
+    """UDP poslucháč pre aktualizácie stavu senzorov
+
+    V režime vysokej záťaže (network.udp_high_rate) poslucháč nastaví väčší
+    prijímací buffer jadra (network.udp_rcvbuf), pri každom prebudení prečíta
+    všetky čakajúce datagramy (najviac network.udp_max_batch), spracuje ich
+    naraz a zmeny stavu uloží jediným zápisom nastavení za celú dávku.
+
+    Prijíma textový formát SENSOR:{id}:{name}:{type}:{status} aj binárny
+    formát zo sensor_protocol, v ktorom je zariadenie určené identifikátorom
+    (handle) prideleným pri registrácii cez DiscoveryListener.
+
+    Pri príjme vo viacerých procesoch (IngestWorkerPool) poslucháč v procese
+    príjmu iba odovzdá dávky do sink a v hlavnom procese sa vlákno nespúšťa -
+    dávky spracuje process_batch.
+
+    Udalosti s poradovým číslom, ktoré už bolo prijaté (duplikát) alebo je
+    nižšie ako najvyššie prijaté číslo zariadenia (oneskorený datagram), sa
+    zahodia a započítajú ako "duplicates" a "stale".
+
+    Udalosti zariadenia, ktoré prekročí ingest.device_udp_rate správ za
+    sekundu, sa zahodia a započítajú ako "throttled". Tie, ktoré odosielateľ
+    nezopakuje (textový formát alebo bez potvrdení), aj ako "throttled_lost".
+
+    Datagram môže niesť viac udalostí naraz (rámec MULTI_MAGIC zo
+    sensor_protocol) a prijíma sa celý až do maximálnej veľkosti UDP.
+
+    Binárne udalosti s príznakom potvrdenia sa potvrdia jedným datagramom
+    MSG_ACK na zariadenie a dávku - aj duplikáty a oneskorené udalosti, aby
+    ich odosielateľ prestal opakovať. Udalosti zahodené obmedzovačom
+    ("throttled") sa nepotvrdia, odosielateľ ich pošle znova.
+
+    Ak je zadané spracovanie (IngestPipeline), dávka sa rozdelí podľa
+    zariadení - zariadenia s alarmom idú do pruhu "alarm", ostatné do pruhu
+    "presence" - a zapíšu ich pracovné vlákna fázou apply_message, pre
+    každé zariadenie vždy iba jedno naraz. Udalosť prijatá skôr ako už
+    aplikovaná udalosť toho istého senzora sa zahodí ("superseded").
+    """
+    # Veľkosť buffera pre jeden datagram - dlhšie datagramy by jadro orezalo
+    RECV_SIZE = MAX_DATAGRAM_SIZE
+
+    def __init__(self, handle_table=None, reuse_port=False, sink=None, pipeline=None):
         super(UDPListener, self).__init__()
         self.daemon = True
         self.running = False
-        self.port = get_setting("network", {}).get("udp_port", 8081)
-        self.callbacks = []
+        self.socket = None
+        self.handle_table = handle_table or DeviceHandleTable()
+        self.reuse_port = reuse_port
+        self.sink = sink
+        self.pipeline = pipeline
+        network_settings = get_setting("network", {})
+        self.port = network_settings.get("udp_port", 8081)
+        self.high_rate = network_settings.get("udp_high_rate", False)
+        self.rcvbuf = network_settings.get("udp_rcvbuf", 1048576)
+        self.max_batch = network_settings.get("udp_max_batch", 256)
+        ingest_settings = get_setting("ingest", {})
+        self.rate_limiter = DeviceRateLimiter("udp", ingest_settings.get("device_udp_rate", 20),
+                                              ingest_settings.get("device_udp_burst", 40))
+        self.sequence_tracker = SequenceTracker()
+        # Zámky zariadení, aby sa ich udalosti neaplikovali súbežne a mimo poradia
+        self._apply_locks_guard = threading.Lock()
+        self._apply_locks = {}
+        # Čas príjmu poslednej aplikovanej udalosti: ID zariadenia -> {typ senzora: čas}
+        self.applied_at = {}
+        # Socket pre potvrdenia, keď datagramy prijímajú pracovné procesy
+        self._ack_socket = None
+        # Opakovane používaný buffer príjmu, datagram sa z neho skopíruje v skutočnej dĺžke
+        self._recv_buffer = bytearray(self.RECV_SIZE)
+        
+        # Počítadlá prijatých a stratených datagramov
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "datagrams": 0,
+            "multi_datagrams": 0,
+            "events": 0,
+            "batches": 0,
+            "largest_batch": 0,
+            "malformed": 0,
+            "unknown_handle": 0,
+            "duplicates": 0,
+            "stale": 0,
+            "superseded": 0,
+            "sender_restarts": 0,
+            "throttled": 0,
+            "throttled_lost": 0,
+            "acks_sent": 0,
+            "kernel_drops": 0
+        }
+        
+    def clone(self):
+        """Nová nespustená inštancia so zdieľaným stavom a štatistikami (na reštart)
+
+        Zdieľa sa aj sledovanie poradových čísel, takže po reštarte sa
+        neprijmú znova udalosti, ktoré už boli spracované.
+        """
+        listener = UDPListener(handle_table=self.handle_table, reuse_port=self.reuse_port,
+                               sink=self.sink, pipeline=self.pipeline)
+        listener.rate_limiter = self.rate_limiter
+        listener.sequence_tracker = self.sequence_tracker
+        listener._apply_locks_guard = self._apply_locks_guard
+        listener._apply_locks = self._apply_locks
+        listener.applied_at = self.applied_at
+        listener._stats_lock = self._stats_lock
+        listener.stats = self.stats
+        return listener
         
     def add_callback(self, callback):
-        """Pridanie callback funkcie, ktorá sa zavolá pri prijatí dát"""
-        self.callbacks.append(callback)
+        """Pridanie callback funkcie callback(správa, address) - odber SensorEvent"""
+        return event_bus.subscribe(SensorEvent, lambda event: callback(event.message, event.address))
         
     def run(self):
         """Spustenie vlákna UDP poslucháča"""
         self.running = True
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if self.high_rate:
+            self._configure_receive_buffer()
         
         try:
             self.socket.bind(('0.0.0.0', self.port))
-            print(f"DEBUG: UDP poslucháč spustený na porte {self.port}")
+            print(f"DEBUG: UDP poslucháč spustený na porte {self.port}"
+                  f"{' (režim vysokej záťaže)' if self.high_rate else ''}")
+            self._mark_started()
             
             while self.running:
                 try:
-                    data, address = self.socket.recvfrom(1024)
-                    data = data.decode('utf-8')
-                    print(f"DEBUG: UDP dáta prijaté z {address}: {data}")
-                    
-                    # Spracovanie dát zo senzora
-                    if data.startswith("SENSOR:"):
-                        parts = data.split(":")
-                        if len(parts) >= 5:  # Očakávame SENSOR:ID:NAME:TYPE:STATUS
-                            device_id = parts[1]
-                            device_name = parts[2]
-                            sensor_type = parts[3]
-                            status = parts[4]
-                            
-                            # Registrácia alebo aktualizácia informácií o zariadení
-                            device_data = {
-                                "name": device_name,
-                                "ip": address[0],
-                                "last_seen": datetime.now().isoformat(),
-                            }
-                            add_sensor_device(device_id, device_data)
-                            
-                            # Aktualizácia stavu senzora
-                            status_data = {
-                                sensor_type: status,
-                                "last_updated": time.time()
-                            }
-                            update_sensor_status(device_id, status_data)
-                            
-                            # Vytvorenie upozornenia pre senzorové udalosti
-                            # Importuj až tu, aby sa zabránilo cyklickému importu
-                            try:
-                                from config.settings import add_alert, get_setting
-                                
-                                # Vytvor alert pre dôležité senzorové udalosti
-                                if (sensor_type == "motion" and status == "DETECTED") or \
-                                   ((sensor_type == "door" or sensor_type == "window") and status == "OPEN"):
-                                    alert_data = {
-                                        "device_id": device_id,
-                                        "device_name": device_name,
-                                        "sensor_type": sensor_type,
-                                        "status": status,
-                                        "timestamp": time.time(),
-                                        "read": False
-                                    }
-                                    
-                                    # Vždy pridaj upozornenie do histórie alertov
-                                    add_alert(alert_data)
-                                    print(f"DEBUG: Vytvorené upozornenie pre {device_name} - {sensor_type} {status}")
-                                    
-                                    # Kontrola, či je systém aktívny a spustenie ochrannej doby pre alarm
-                                    system_active = get_setting("system_active", False)
-                                    if system_active:
-                                        try:
-                                            # Import notification service pre spustenie ochrannej doby
-                                            from notification_service import notification_service
-                                            # Spustenie ochrannej doby pre alarm - 30 sekúnd
-                                            notification_service.start_grace_period(alert_data, 30)
-                                            print(f"DEBUG: Spustená ochranná doba pre {device_name} - {sensor_type}")
-                                        except Exception as e:
-                                            print(f"ERROR: Zlyhalo spustenie ochrannej doby: {e}")
-                            except Exception as e:
-                                print(f"ERROR: Zlyhalo vytvorenie upozornenia: {e}")
-                    
-                    for callback in self.callbacks:
-                        callback(data, address)
+                    batch = self._receive_batch()
+                    self._begin_work()
+                    try:
+                        if self.sink:
+                            self.sink(batch)
+                        else:
+                            self.process_batch(batch)
+                    finally:
+                        self._end_work(len(batch))
                 except Exception as e:
+                    if not self.running:
+                        break
+                    self._record_error(e)
                     print(f"ERROR: Chyba príjmu UDP: {e}")
                     time.sleep(1)
         except Exception as e:
+            self._record_error(e)
             print(f"ERROR: UDP poslucháč sa nepodarilo spustiť: {e}")
         finally:
             self.socket.close()
             
+    def _configure_receive_buffer(self):
+        """Nastavenie prijímacieho buffera jadra pre nárazovú záťaž"""
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            effective = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            # Linux vracia dvojnásobok nastavenej hodnoty (réžia jadra)
+            if effective < self.rcvbuf:
+                print(f"WARNING: Prijímací buffer UDP je iba {effective} bajtov namiesto {self.rcvbuf}, "
+                      f"skontrolujte net.core.rmem_max")
+            else:
+                print(f"DEBUG: Prijímací buffer UDP nastavený na {effective} bajtov")
+        except OSError as e:
+            print(f"WARNING: Nepodarilo sa nastaviť prijímací buffer UDP: {e}")
+            
+    def _receive_batch(self):
+        """Príjem dávky datagramov
+
+        Čaká na prvý datagram. V režime vysokej záťaže potom bez čakania
+        prečíta všetky ďalšie, ktoré už sú vo fronte jadra.
+
+        Returns:
+            list: Zoznam dvojíc (dáta datagramu, adresa)
+        """
+        raw_batch = [self._recv_datagram()]
+        
+        if self.high_rate:
+            while len(raw_batch) < self.max_batch:
+                try:
+                    if DRAIN_FLAGS:
+                        raw_batch.append(self._recv_datagram(DRAIN_FLAGS))
+                    else:
+                        # Platformy bez MSG_DONTWAIT (Windows)
+                        readable, _, _ = select.select([self.socket], [], [], 0)
+                        if not readable:
+                            break
+                        raw_batch.append(self._recv_datagram())
+                except (BlockingIOError, InterruptedError):
+                    break
+        
+        return raw_batch
+    
+    def _recv_datagram(self, flags=0):
+        """Príjem jedného datagramu do spoločného buffera
+
+        Returns:
+            tuple: (dáta datagramu, adresa)
+        """
+        length, address = self.socket.recvfrom_into(self._recv_buffer, 0, flags)
+        return bytes(self._recv_buffer[:length]), address
+    
+    def process_batch(self, batch):
+        """Spracovanie dávky datagramov - jeden zápis stavu za celú dávku (v každom pruhu)"""
+        with self._stats_lock:
+            self.stats["datagrams"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        
+        entries = []
+        acks = {}
+        for data, address in self._split_events(batch):
+            started = time.perf_counter()
+            message, event = self._parse_datagram(data, address)
+            if event and not self.rate_limiter.allow(event["device_id"]):
+                # Zariadenie posiela priveľa správ - zahodia sa bez zápisu aj upozornenia.
+                # Nepotvrdia sa a poradové číslo sa nezaznamená, takže odosielateľ
+                # s potvrdeniami ich zopakuje. Textové a nepotvrdzované udalosti
+                # sa už nezopakujú - tie sú stratené a počítajú sa zvlášť.
+                self._count("throttled")
+                if not event["ack"]:
+                    self._count("throttled_lost")
+                continue
+            if event and event["ack"]:
+                acks.setdefault((address, event["handle"]), []).append(event["seq"])
+            if event and event["seq"] is not None and not self._check_sequence(event):
+                continue
+            if message is not None:
+                entries.append((message, address, event))
+            if event and event["trace_id"]:
+                tracer.start(event["trace_id"], event["origin_ns"], event["device_id"],
+                             f"{event['sensor_type']}:{event['status']}")
+                tracer.record(event["trace_id"], "parse", started)
+                event["parsed_at"] = time.perf_counter()
+        
+        # Potvrdenie ešte pred zápisom - odosielateľ nečaká na spracovanie
+        if acks:
+            self._send_acks(acks)
+        
+        if not self.pipeline:
+            self._apply_entries(entries)
+            return
+        
+        # Každé zariadenie dostane vlastnú správu (a podfrontu), všetky jeho
+        # udalosti idú spolu - pri alarme celé v pruhu "alarm", aby sa nezmenilo ich poradie
+        device_entries = {}
+        for entry in entries:
+            device_id = entry[2]["device_id"] if entry[2] else None
+            device_entries.setdefault(device_id, []).append(entry)
+        for device_id, grouped in device_entries.items():
+            alarm = any(event and self._is_alarm(event) for _, _, event in grouped)
+            # Pri plnom pruhu počkáme, datagramy medzitým zadrží jadro
+            self.pipeline.submit(IngestMessage('sensor', {"device_id": device_id}, ("udp", self.port),
+                                               lane="alarm" if alarm else "presence",
+                                               events=grouped), block=True)
+    
+    def _split_events(self, batch):
+        """Rozdelenie datagramov so zlúčenými udalosťami na jednotlivé udalosti
+
+        Returns:
+            list: Zoznam dvojíc (dáta udalosti, adresa)
+        """
+        events = []
+        multi = 0
+        for data, address in batch:
+            if not is_multi_datagram(data):
+                events.append((data, address))
+                continue
+            try:
+                parts = split_multi(data)
+            except ValueError as e:
+                self._count("malformed")
+                print(f"WARNING: Poškodený zlúčený datagram z {address}: {e}")
+                continue
+            multi += 1
+            events.extend((part, address) for part in parts)
+        
+        with self._stats_lock:
+            self.stats["multi_datagrams"] += multi
+            self.stats["events"] += len(events)
+        return events
+    
+    def _send_acks(self, acks):
+        """Odoslanie potvrdení prijatých poradových čísel
+
+        Args:
+            acks (dict): (adresa, handle) -> zoznam poradových čísel
+        """
+        sock = self.socket
+        if sock is None:
+            if self._ack_socket is None:
+                self._ack_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock = self._ack_socket
+        
+        for (address, handle), seqs in acks.items():
+            for datagram in pack_ack(handle, seqs):
+                try:
+                    sock.sendto(datagram, address)
+                    self._count("acks_sent")
+                except OSError as e:
+                    print(f"WARNING: Zlyhalo odoslanie potvrdenia na {address}: {e}")
+    
+    def _check_sequence(self, event):
+        """Kontrola poradového čísla udalosti - False pre duplikát alebo oneskorený datagram"""
+        result = self.sequence_tracker.check(event["device_id"], event["seq"], event["sent_at"])
+        if result == SequenceTracker.RESTARTED:
+            self._count("sender_restarts")
+            print(f"DEBUG: Zariadenie {event['device_id']} začalo nové poradie správ (reštart odosielateľa)")
+        if result == SequenceTracker.DUPLICATE:
+            self._count("duplicates")
+            return False
+        if result == SequenceTracker.STALE:
+            self._count("stale")
+            if not self.high_rate:
+                print(f"DEBUG: Oneskorená udalosť {event['sensor_type']}:{event['status']} "
+                      f"zo zariadenia {event['device_id']} (poradie {event['seq']}) zahodená")
+            return False
+        return True
+    
+    def apply_message(self, message):
+        """Fáza spracovania správy typu 'sensor' zaradenej cez process_batch
+
+        Správy jedného zariadenia môžu spracovať rôzne pracovné vlákna naraz
+        (pruh alarm aj presence), stav senzorov zariadenia sa preto
+        aplikuje vždy iba v jednom z nich.
+        """
+        with self._device_lock(message.header.get("device_id")):
+            self._apply_entries(message.events)
+    
+    def _device_lock(self, device_id):
+        """Zámok spracovania udalostí zariadenia"""
+        with self._apply_locks_guard:
+            lock = self._apply_locks.get(device_id)
+            if lock is None:
+                lock = self._apply_locks[device_id] = threading.Lock()
+            return lock
+    
+    def _apply_entries(self, entries):
+        """Zápis udalostí senzorov a ich zverejnenie odberateľom
+
+        Args:
+            entries (list): Zoznam (text správy, adresa, udalosť senzora alebo None)
+        """
+        entries = [entry for entry in entries if not entry[2] or not self._is_superseded(entry[2])]
+        events = [event for _, _, event in entries if event]
+        for event in events:
+            if event["trace_id"]:
+                # Čakanie vo fronte spracovania (bez IngestPipeline takmer nulové)
+                tracer.record(event["trace_id"], "queue", event["parsed_at"])
+        if events:
+            self._apply_events(events)
+        
+        # Odberatelia dostanú udalosti vo vlastných vláknach, príjem nečaká
+        for message, address, event in entries:
+            if event:
+                event_bus.publish(SensorEvent(message, address,
+                                              device_id=event["device_id"],
+                                              device_name=event["device_name"],
+                                              sensor_type=event["sensor_type"],
+                                              status=event["status"],
+                                              received_at=event["received_at"],
+                                              sent_at=event["sent_at"]))
+            else:
+                event_bus.publish(SensorEvent(message, address))
+    
+    def _parse_datagram(self, data, address):
+        """Rozparsovanie datagramu v textovom alebo binárnom formáte
+
+        Returns:
+            tuple: (text správy pre callbacky, udalosť senzora alebo None).
+                   Pri poškodenom datagrame (None, None).
+        """
+        if is_binary_datagram(data):
+            return self._parse_binary(data, address)
+        
+        try:
+            message = data.decode('utf-8')
+        except UnicodeDecodeError:
+            self._count("malformed")
+            return None, None
+            
+        if not self.high_rate:
+            print(f"DEBUG: UDP dáta prijaté z {address}: {message}")
+        
+        if not message.startswith("SENSOR:"):
+            return message, None
+            
+        # Očakávame SENSOR:ID:NAME:TYPE:STATUS[:seq=N:ts=T] - názov môže obsahovať
+        # dvojbodky, preto sa koncové položky, typ a stav čítajú od konca
+        parts, seq, sent_at, trace = split_sequence_tokens(message.split(":"))
+        if len(parts) < 5:
+            self._count("malformed")
+            return message, None
+            
+        return ":".join(parts), {
+            "device_id": parts[1],
+            "device_name": ":".join(parts[2:-2]),
+            "sensor_type": parts[-2],
+            "status": parts[-1],
+            "seq": seq,
+            "sent_at": sent_at,
+            "ack": False,
+            "trace_id": trace[0] if trace else 0,
+            "origin_ns": trace[1] if trace else 0,
+            "ip": address[0],
+            "received_at": time.time()
+        }
+    
+    def _parse_binary(self, data, address):
+        """Rozparsovanie binárneho datagramu senzora"""
+        try:
+            decoded = unpack_sensor_event(data)
+        except (ValueError, struct.error) as e:
+            self._count("malformed")
+            print(f"WARNING: Poškodený binárny datagram z {address}: {e}")
+            return None, None
+        
+        device_id = self.handle_table.resolve(decoded["handle"])
+        if device_id is None:
+            # Zariadenie sa ešte neregistrovalo (napr. po strate stavu prijímača)
+            self._count("unknown_handle")
+            return None, None
+        
+        device = device_registry.get(device_id) or {}
+        device_name = device.get("name", device_id)
+        event = {
+            "device_id": device_id,
+            "device_name": device_name,
+            "sensor_type": decoded["sensor_type"],
+            "status": decoded["status"],
+            "seq": decoded["seq"],
+            "sent_at": decoded["timestamp"],
+            "handle": decoded["handle"],
+            "ack": decoded["ack"],
+            "trace_id": decoded["trace_id"],
+            "origin_ns": decoded["origin_ns"],
+            "ip": address[0],
+            "received_at": time.time()
+        }
+        
+        # Callbacky dostanú rovnaký text ako pri textovom formáte
+        message = f"SENSOR:{device_id}:{device_name}:{event['sensor_type']}:{event['status']}"
+        if not self.high_rate:
+            print(f"DEBUG: Binárny UDP datagram z {address}: {message}")
+        return message, event
+    
+    def _is_superseded(self, event):
+        """Kontrola, či už bola aplikovaná neskôr prijatá udalosť toho istého senzora
+
+        Pruh "alarm" môže predbehnúť staršie udalosti zariadenia z pruhu
+        "presence" - tie už stav senzora nezmenia, nevytvoria upozornenie
+        a nezverejnia sa. Volá sa pod zámkom zariadenia.
+        """
+        applied = self.applied_at.setdefault(event["device_id"], {})
+        if applied.get(event["sensor_type"], 0) > event["received_at"]:
+            self._count("superseded")
+            if not self.high_rate:
+                print(f"DEBUG: Udalosť {event['sensor_type']}:{event['status']} zo zariadenia "
+                      f"{event['device_id']} je staršia ako už aplikovaný stav senzora, zahodená")
+            return True
+        applied[event["sensor_type"]] = event["received_at"]
+        return False
+    
+    def _apply_events(self, events):
+        """Uloženie dávky udalostí senzorov jedným zápisom a vytvorenie upozornení"""
+        started = time.perf_counter()
+        devices = {}
+        statuses = {}
+        
+        for event in events:
+            device_id = event["device_id"]
+            
+            # Registrácia alebo aktualizácia informácií o zariadení - staršia
+            # udalosť iného senzora už nevráti IP a čas posledného videnia späť
+            if event["received_at"] >= max(self.applied_at.get(device_id, {}).values(), default=0):
+                devices[device_id] = {
+                    "name": event["device_name"],
+                    "ip": event["ip"],
+                    "last_seen": datetime.fromtimestamp(event["received_at"]).isoformat(),
+                }
+            
+            # Aktualizácia stavu senzora - neskoršia udalosť v dávke má prednosť
+            status_data = statuses.setdefault(device_id, {})
+            status_data[event["sensor_type"]] = event["status"]
+            status_data["last_updated"] = event["received_at"]
+        
+        device_registry.update_many(devices)
+        # Na disk sa hneď zapíšu iba prechody stavu, živosť sa zlučuje
+        sensor_state.update(devices, statuses)
+        for device_id in devices:
+            presence_tracker.seen(device_id)
+        
+        # Zápis stavu prebieha za celú dávku, každá stopa dostane jeho trvanie
+        finished = time.perf_counter()
+        for event in events:
+            if event["trace_id"]:
+                tracer.record(event["trace_id"], "status", started, finished)
+        
+        for event in events:
+            self._create_alert(event)
+            
+    @staticmethod
+    def _is_alarm(event):
+        """Kontrola, či udalosť vytvára upozornenie (pohyb, otvorené dvere alebo okno)"""
+        sensor_type = event["sensor_type"]
+        status = event["status"]
+        return (sensor_type == "motion" and status == "DETECTED") or \
+               (sensor_type in ("door", "window") and status == "OPEN")
+            
+    def _create_alert(self, event):
+        """Vytvorenie upozornenia pre dôležité senzorové udalosti"""
+        device_id = event["device_id"]
+        device_name = event["device_name"]
+        sensor_type = event["sensor_type"]
+        status = event["status"]
+        
+        # Importuj až tu, aby sa zabránilo cyklickému importu
+        try:
+            from config.settings import add_alert, get_setting
+            
+            # Vytvor alert pre dôležité senzorové udalosti
+            if self._is_alarm(event):
+                alert_data = {
+                    "device_id": device_id,
+                    "device_name": device_name,
+                    "sensor_type": sensor_type,
+                    "status": status,
+                    "timestamp": time.time(),
+                    "read": False
+                }
+                trace_id = event.get("trace_id")
+                if trace_id:
+                    # Ochranná doba a e-mail pokračujú v stope udalosti
+                    alert_data["trace_id"] = format_trace_id(trace_id)
+                
+                # Vždy pridaj upozornenie do histórie alertov
+                with tracer.span(trace_id, "add_alert"):
+                    add_alert(alert_data)
+                print(f"DEBUG: Vytvorené upozornenie pre {device_name} - {sensor_type} {status}")
+                
+                # Kontrola, či je systém aktívny a spustenie ochrannej doby pre alarm
+                system_active = get_setting("system_active", False)
+                if system_active:
+                    try:
+                        # Import notification service pre spustenie ochrannej doby
+                        from notification_service import notification_service
+                        # Spustenie ochrannej doby pre alarm - 30 sekúnd
+                        with tracer.span(trace_id, "grace_start"):
+                            notification_service.start_grace_period(alert_data, 30)
+                        print(f"DEBUG: Spustená ochranná doba pre {device_name} - {sensor_type}")
+                    except Exception as e:
+                        print(f"ERROR: Zlyhalo spustenie ochrannej doby: {e}")
+        except Exception as e:
+            print(f"ERROR: Zlyhalo vytvorenie upozornenia: {e}")
+            
+    def _count(self, key, amount=1):
+        """Navýšenie počítadla štatistík"""
+        with self._stats_lock:
+            self.stats[key] += amount
+            
+    def _read_kernel_drops(self):
+        """Počet datagramov zahodených jadrom (iba Linux)
+
+        Bez vlastného socketu (príjem vo viacerých procesoch) sa sčítajú
+        straty všetkých socketov na UDP porte.
+
+        Returns:
+            int: Počet zahodených datagramov alebo None, ak nie je dostupný
+        """
+        try:
+            inode = str(os.fstat(self.socket.fileno()).st_ino) if self.socket else None
+            port = f"{self.port:04X}"
+            drops = None
+            for table in ("/proc/net/udp", "/proc/net/udp6"):
+                if not os.path.exists(table):
+                    continue
+                with open(table, 'r') as f:
+                    next(f)
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) <= 9:
+                            continue
+                        if inode is not None:
+                            if parts[9] == inode:
+                                return int(parts[-1])
+                        elif parts[1].rsplit(":", 1)[-1] == port:
+                            drops = (drops or 0) + int(parts[-1])
+            return drops
+        except (OSError, ValueError):
+            pass
+        return None
+    
+    def get_stats(self):
+        """Získanie štatistík prijímania vrátane strát v jadre"""
+        kernel_drops = self._read_kernel_drops()
+        with self._stats_lock:
+            if kernel_drops is not None:
+                self.stats["kernel_drops"] = kernel_drops
+            stats = dict(self.stats)
+        stats["high_rate"] = self.high_rate
+        return stats
+            
     def stop(self):
         """Zastavenie vlákna UDP poslucháča"""
         self.running = False
@@ -303,20 +1217,27 @@ class UDPListener(threading.Thread):
             self.socket.close()
         except:
             pass
+        if self._ack_socket:
+            self._ack_socket.close()
+            self._ack_socket = None
         print("DEBUG: UDP poslucháč zastavený")
 
 
-class DiscoveryListener(threading.Thread):
-    def __init__(self):
+class DiscoveryListener(SupervisedListener, threading.Thread):
+    def __init__(self, handle_table=None):
         super(DiscoveryListener, self).__init__()
         self.daemon = True
         self.running = False
+        self.handle_table = handle_table or DeviceHandleTable()
         self.port = get_setting("network", {}).get("discovery_port", 8082)
-        self.callbacks = []
+        
+    def clone(self):
+        """Nová nespustená inštancia so zdieľanou tabuľkou identifikátorov (na reštart)"""
+        return DiscoveryListener(handle_table=self.handle_table)
         
     def add_callback(self, callback):
-        """Pridanie callback funkcie, ktorá sa zavolá pri objavení zariadenia"""
-        self.callbacks.append(callback)
+        """Pridanie callback funkcie callback(správa, address) - odber DeviceSeen"""
+        return event_bus.subscribe(DeviceSeen, lambda event: callback(event.message, event.address))
         
     def run(self):
         """Spustenie vlákna poslucháča objavovania"""
@@ -328,16 +1249,20 @@ class DiscoveryListener(threading.Thread):
         try:
             self.socket.bind(('0.0.0.0', self.port))
             print(f"DEBUG: Poslucháč objavovania spustený na porte {self.port}")
+            self._mark_started()
             
             while self.running:
                 try:
-                    data, address = self.socket.recvfrom(1024)
+                    data, address = self.socket.recvfrom(MAX_DATAGRAM_SIZE)
+                    self._begin_work()
                     data = data.decode('utf-8')
                     print(f"DEBUG: Správa objavovania prijatá z {address}: {data}")
+                    device_id = device_name = None
                     
                     # Registrácia objavených zariadení
                     if data.startswith("SECURITY_DEVICE:ONLINE:"):
-                        parts = data.split(":")
+                        # Názov zariadenia je posledný a môže obsahovať dvojbodky
+                        parts = data.split(":", 3)
                         if len(parts) >= 4:
                             device_id = parts[2]
                             device_name = parts[3]
@@ -348,19 +1273,92 @@ class DiscoveryListener(threading.Thread):
                                 "ip": address[0],
                                 "last_seen": datetime.now().isoformat(),
                             }
-                            add_sensor_device(device_id, device_data)
+                            device_registry.update(device_id, device_data)
+                            sensor_state.update({device_id: device_data}, {})
+                            presence_tracker.seen(device_id)
                             print(f"DEBUG: Registrované zariadenie senzora {device_name} ({device_id})")
                     
-                    for callback in self.callbacks:
-                        callback(data, address)
+                    # Registrácia pre binárny protokol senzorov
+                    if data.startswith(REGISTER_PREFIX):
+                        device_id, device_name = self._handle_register(data, address)
+                    
+                    # Odoslanie odpovede na požiadavku objavovania s našou IP adresou
+                    if data.startswith("DISCOVER:"):
+                        local_ip = self._get_local_ip(address)
+                        response = f"SECURITY_SYSTEM:ONLINE:{local_ip}"
+                        self.socket.sendto(response.encode('utf-8'), address)
+                        print(f"DEBUG: Odoslaná odpoveď objavovania na {address} s IP {local_ip}")
+                    
+                    event_bus.publish(DeviceSeen(data, address, device_id=device_id, device_name=device_name))
                 except Exception as e:
+                    if not self.running:
+                        break
+                    self._record_error(e)
                     print(f"ERROR: Chyba príjmu objavovania: {e}")
                     time.sleep(1)
+                finally:
+                    self._end_work()
         except Exception as e:
+            self._record_error(e)
             print(f"ERROR: Poslucháč objavovania sa nepodarilo spustiť: {e}")
         finally:
             self.socket.close()
             
+    def _handle_register(self, data, address):
+        """Nadviazanie binárneho protokolu - pridelenie identifikátora zariadeniu
+
+        Formát: REGISTER:{max_verzia}:{device_id}:{device_name}
+        Odpoveď: REGISTERED:{verzia}:{handle}
+
+        Returns:
+            tuple: (device_id, device_name), pri neplatnej registrácii (None, None)
+        """
+        parts = data.split(":", 3)
+        if len(parts) < 4:
+            print(f"WARNING: Neplatná registrácia z {address}: {data}")
+            return None, None
+        
+        try:
+            offered_version = int(parts[1])
+        except ValueError:
+            print(f"WARNING: Neplatná verzia protokolu v registrácii z {address}: {parts[1]}")
+            return None, None
+        device_id = parts[2]
+        device_name = parts[3]
+        
+        version = negotiate_version(offered_version)
+        handle = self.handle_table.assign(device_id)
+        
+        device_data = {
+            "name": device_name,
+            "ip": address[0],
+            "last_seen": datetime.now().isoformat(),
+            "handle": handle,
+        }
+        device_registry.update(device_id, device_data)
+        sensor_state.update({device_id: device_data}, {})
+        presence_tracker.seen(device_id)
+        
+        response = f"{REGISTERED_PREFIX}{version}:{handle}"
+        self.socket.sendto(response.encode('utf-8'), address)
+        print(f"DEBUG: Zariadenie {device_name} ({device_id}) registrované s identifikátorom {handle}, protokol v{version}")
+        return device_id, device_name
+        
+    def _get_local_ip(self, address):
+        """Zistenie lokálnej IP adresy, ktorá sa používa na komunikáciu s odosielateľom"""
+        local_ip = socket.gethostbyname(socket.gethostname())
+        
+        # Pre prípady, keď gethostbyname vráti localhost, skúsime iný prístup
+        if local_ip.startswith("127."):
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                # Toto v skutočnosti neodosiela žiadne pakety
+                s.connect((address[0], 1))
+                local_ip = s.getsockname()[0]
+            finally:
+                s.close()
+        return local_ip
+            
     def stop(self):
         """Zastavenie vlákna poslucháča objavovania"""
         self.running = False
@@ -379,6 +1377,10 @@ class NetworkManager:
         self.tcp_listener = None
         self.udp_listener = None
         self.discovery_listener = None
+        self.ingest_pipeline = None
+        self.worker_pool = None
+        self.handle_table = None
+        self.watchdog = None
         self.is_running = False
         
     def start_listeners(self):
@@ -387,18 +1389,56 @@ class NetworkManager:
             print("DEBUG: Sieťoví poslucháči už bežia")
             return
 
-        # Inicializácia a spustenie TCP poslucháča
-        self.tcp_listener = TCPListener()
-        self.tcp_listener.start()
+        # Spracovanie prijatých správ beží mimo sieťových vlákien
+        self.ingest_pipeline = IngestPipeline()
+        self.ingest_pipeline.add_stage("persist", persist_image)
+        self.ingest_pipeline.add_stage("index", index_image)
+        self.ingest_pipeline.add_stage("status", update_image_status)
+        self.ingest_pipeline.add_stage("notify", publish_received)
+        
+        # Identifikátory zariadení pre binárny protokol zdieľajú UDP aj objavovanie
+        self.handle_table = DeviceHandleTable()
+        # Udalosti senzorov zapisujú pracovné vlákna v prioritných pruhoch
+        self.udp_listener = UDPListener(handle_table=self.handle_table, pipeline=self.ingest_pipeline)
+        self.ingest_pipeline.add_stage("sensor", self.udp_listener.apply_message, kind="sensor")
+        self.ingest_pipeline.start()
+        sensor_state.start()
+        presence_tracker.start()
         
-        # Inicializácia a spustenie UDP poslucháča
-        self.udp_listener = UDPListener()
-        self.udp_listener.start()
+        processes = get_setting("ingest", {}).get("processes", 0)
+        if processes and not IngestWorkerPool.is_supported():
+            print("WARNING: Príjem vo viacerých procesoch nie je na tejto platforme podporovaný (SO_REUSEPORT)")
+            processes = 0
+        
+        if processes:
+            # TCP a UDP prijímajú pracovné procesy, stav zapisuje iba tento proces
+            self.worker_pool = IngestWorkerPool(processes,
+                                                on_message=self._submit_forwarded,
+                                                on_udp_batch=self.udp_listener.process_batch)
+            self.worker_pool.start()
+        else:
+            # Inicializácia a spustenie TCP poslucháča
+            self.tcp_listener = TCPListener(pipeline=self.ingest_pipeline)
+            self.tcp_listener.start()
+            
+            # Spustenie UDP poslucháča
+            self.udp_listener.start()
         
         # Inicializácia a spustenie poslucháča objavovania
-        self.discovery_listener = DiscoveryListener()
+        self.discovery_listener = DiscoveryListener(handle_table=self.handle_table)
         self.discovery_listener.start()
         
+        # Dohľad reštartuje poslucháčov, ktorí spadnú alebo sa nespustia
+        self.watchdog = IngestWatchdog()
+        if self.tcp_listener:
+            self.watchdog.watch("tcp", self.tcp_listener,
+                                lambda listener: setattr(self, "tcp_listener", listener))
+            self.watchdog.watch("udp", self.udp_listener,
+                                lambda listener: setattr(self, "udp_listener", listener))
+        self.watchdog.watch("discovery", self.discovery_listener,
+                            lambda listener: setattr(self, "discovery_listener", listener))
+        self.watchdog.start()
+        
         self.is_running = True
         print("DEBUG: Všetci sieťoví poslucháči úspešne spustení")
         
@@ -408,6 +1448,11 @@ class NetworkManager:
             print("DEBUG: Sieťoví poslucháči nie sú spustení")
             return
             
+        # Dohľad sa zastaví prvý, aby zastavených poslucháčov nereštartoval
+        if self.watchdog:
+            self.watchdog.stop()
+            self.watchdog = None
+            
         # Zastavenie všetkých poslucháčov
         if self.tcp_listener:
             self.tcp_listener.stop()
@@ -417,27 +1462,136 @@ class NetworkManager:
             self.udp_listener.stop()
             self.udp_listener = None
             
+        if self.worker_pool:
+            self.worker_pool.stop()
+            self.worker_pool = None
+            
         if self.discovery_listener:
             self.discovery_listener.stop()
             self.discovery_listener = None
+        
+        # Dokončenie správ, ktoré už čakajú vo fronte spracovania
+        if self.ingest_pipeline:
+            self.ingest_pipeline.stop()
+            self.ingest_pipeline = None
+        
+        # Uloženie zlúčených zmien stavu senzorov
+        sensor_state.stop()
+        presence_tracker.stop()
             
         self.is_running = False
         print("DEBUG: Všetci sieťoví poslucháči úspešne zastavení")
     
-    def add_tcp_callback(self, callback):
-        """Pridanie spätného volania pre TCP udalosti"""
+    def add_tcp_callback(self, callback, **options):
+        """Pridanie spätného volania callback(data_info, address) pre TCP udalosti
+
+        Callback beží vo vlastnom vlákne odberu na zbernici udalostí.
+
+        Returns:
+            Subscription: Odber, ktorý sa dá zrušiť cez event_bus.unsubscribe
+        """
+        return event_bus.subscribe(ImageReceived,
+                                   lambda event: callback(event.data_info, event.address),
+                                   **options)
+            
+    def _submit_forwarded(self, message):
+        """Zaradenie správy z procesu príjmu - pri plnej fronte čaká,
+        takže spätný tlak sa prenesie až k procesom príjmu"""
+        self.ingest_pipeline.submit(message, block=True)
+            
+    def add_backpressure_callback(self, callback):
+        """Pridanie spätného volania pri zmene spätného tlaku spracovania"""
+        if self.ingest_pipeline:
+            self.ingest_pipeline.add_backpressure_callback(callback)
+            
+    def get_ingest_stats(self):
+        """Získanie štatistík spracovania prijatých správ"""
+        if self.ingest_pipeline:
+            return self.ingest_pipeline.get_stats()
+        return {}
+            
+    def get_rate_limit_stats(self):
+        """Získanie počítadiel obmedzenia rýchlosti a spravodlivej fronty podľa zariadení"""
+        stats = {}
+        if self.udp_listener:
+            stats["udp"] = self.udp_listener.rate_limiter.get_stats()
         if self.tcp_listener:
-            self.tcp_listener.add_callback(callback)
+            stats["tcp"] = self.tcp_listener.rate_limiter.get_stats()
+        if self.ingest_pipeline:
+            pipeline_stats = self.ingest_pipeline.get_stats()
+            stats["queue"] = {
+                "device_limited": pipeline_stats["device_limited"],
+                "device_rejections": pipeline_stats["device_rejections"],
+                "device_queue_size": pipeline_stats["device_queue_size"],
+                "device_queue_depths": pipeline_stats["device_queue_depths"]
+            }
+        return stats
+            
+    def get_worker_stats(self):
+        """Získanie štatistík procesov príjmu (prázdne pri príjme v jednom procese)"""
+        if self.worker_pool:
+            return self.worker_pool.get_stats()
+        return {}
             
-    def add_udp_callback(self, callback):
-        """Pridanie spätného volania pre UDP udalosti"""
+    def get_udp_stats(self):
+        """Získanie štatistík UDP poslucháča (prijaté dávky, straty)"""
         if self.udp_listener:
-            self.udp_listener.add_callback(callback)
+            return self.udp_listener.get_stats()
+        return {}
             
-    def add_discovery_callback(self, callback):
-        """Pridanie spätného volania pre udalosti objavovania"""
-        if self.discovery_listener:
-            self.discovery_listener.add_callback(callback)
+    def add_udp_callback(self, callback, **options):
+        """Pridanie spätného volania callback(správa, address) pre UDP udalosti"""
+        return event_bus.subscribe(SensorEvent,
+                                   lambda event: callback(event.message, event.address),
+                                   **options)
+            
+    def add_discovery_callback(self, callback, **options):
+        """Pridanie spätného volania callback(správa, address) pre udalosti objavovania"""
+        return event_bus.subscribe(DeviceSeen,
+                                   lambda event: callback(event.message, event.address),
+                                   **options)
+            
+    def remove_device(self, device_id):
+        """Odstránenie zariadenia zo stavu, registra zariadení aj sledovania prítomnosti
+
+        Returns:
+            bool: True, ak zariadenie existovalo a odstránilo sa
+        """
+        if not remove_sensor_device(device_id):
+            return False
+        device_registry.remove(device_id)
+        presence_tracker.remove(device_id)
+        return True
+            
+    def get_state_stats(self):
+        """Získanie štatistík zápisov stavu senzorov (prechody, zlúčené zmeny)"""
+        return sensor_state.get_stats()
+            
+    def get_presence_stats(self):
+        """Získanie počtu sledovaných zariadení a zariadení online"""
+        return presence_tracker.get_stats()
+            
+    def get_health(self):
+        """Získanie stavu zdravia príjmu - stav, čas behu, reštarty, chyby a správy
+        za sekundu každého poslucháča
+
+        Returns:
+            dict: running, healthy a listeners (názov poslucháča -> stav zdravia)
+        """
+        health = {
+            "running": self.is_running,
+            "healthy": self.is_active(),
+            "listeners": self.watchdog.get_health() if self.watchdog else {}
+        }
+        if self.worker_pool:
+            worker_stats = self.worker_pool.get_stats()
+            health["workers"] = worker_stats
+            health["healthy"] = health["healthy"] and worker_stats["alive"] == worker_stats["processes"]
+        return health
+            
+    def get_event_stats(self):
+        """Získanie štatistík zbernice udalostí (doručené, zahodené, oneskorenie)"""
+        return event_bus.get_stats()
             
     def restart_listeners(self):
         """Reštartovanie všetkých sieťových poslucháčov"""
@@ -445,8 +1599,8 @@ class NetworkManager:
         self.start_listeners()
         
     def is_active(self):
-        """Kontrola, či sú poslucháči aktívni"""
-        return self.is_running
+        """Kontrola, či sú poslucháči spustení a bežia (žiadny nespadol ani neuviazol)"""
+        return self.is_running and (self.watchdog is None or self.watchdog.healthy)
 
 # Vytvorenie globálnej inštancie pre jednoduchý prístup
 network_manager = NetworkManager()
\ No newline at end of file
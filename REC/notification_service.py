@@ -11,6 +11,7 @@ try:
 except ImportError:
     pygame = None
 from config.settings import get_setting
+from tracing import tracer, parse_trace_id
 
 class NotificationService:
     """
@@ -152,20 +153,23 @@ class NotificationService:
             print(f"Zlyhalo prehrávanie zvuku: {e}")
             return False
     
-    def play_alarm(self, duration_seconds=30):
+    def play_alarm(self, duration_seconds=30, trace_id=None):
         """Prehratie zvuku alarmu v samostatnom vlákne s trvaním
         
         Args:
             duration_seconds (int): Trvanie prehrávania alarmu v sekundách
+            trace_id (int, optional): Stopa udalosti, ktorá alarm spustila
         """
         if self.playing_alarm:
             print("Alarm sa už prehráva")
+            tracer.mark(trace_id, "alarm")
             return
         
         def alarm_thread():
             self.playing_alarm = True
             # Prehratie zvuku alarmu
             if self.play_sound("alarm", -1):  # -1 znamená opakovať nekonečne
+                tracer.mark(trace_id, "alarm")
                 # Čakanie na stanovené trvanie
                 time.sleep(duration_seconds)
                 # Zastavenie alarmu
@@ -247,9 +251,11 @@ class NotificationService:
                 return  # Časovač bol medzičasom zrušený
             
             print("DEBUG: Vypršala ochranná doba - aktivujem alarm a odosielajm email")
+            trace_id = parse_trace_id(alert_data.get("trace_id"))
+            tracer.mark(trace_id, "grace_expired")
             
             # Prehranie alarmu
-            self.play_alarm()
+            self.play_alarm(trace_id=trace_id)
             
             # Odoslanie emailu
             title = f"BEZPEČNOSTNÉ UPOZORNENIE - {alert_data.get('sensor_type', 'Senzor')} {alert_data.get('status', '')}"
@@ -260,7 +266,8 @@ class NotificationService:
                      f"Systém nebol deaktivovaný v ochrannej dobe {grace_seconds} sekúnd."
             
             # Odoslanie emailového upozornenia
-            self.send_email_alert(title, message)
+            with tracer.span(trace_id, "email"):
+                self.send_email_alert(title, message)
             
             # Reset premenných ochrannej doby
             self.is_in_grace_period = False
@@ -0,0 +1,180 @@
+"""
+Modul pre sledovanie prítomnosti zariadení.
+
+Namiesto toho, aby každé zobrazenie pri obnove parsovalo last_seen všetkých
+zariadení a porovnávalo ho s hodinovým oknom, si sledovanie prítomnosti
+drží monotónny čas posledného kontaktu každého zariadenia. Vypršanie
+zariadení rieši časovacie koleso (timer wheel) - každé zariadenie je
+v jednom slote podľa času vypršania a pri posune kolesa sa kontroluje iba
+aktuálny slot. Prechody online/offline sa zverejňujú ako PresenceChanged
+na zbernici udalostí a počet aktívnych zariadení je priebežne udržiavaný.
+"""
+import math
+import threading
+import time
+from datetime import datetime
+from event_bus import event_bus, PresenceChanged
+try:
+    from config.settings import get_setting, get_sensor_devices
+except ImportError:
+    def get_setting(section, default):
+        return default
+    def get_sensor_devices():
+        return {}
+
+
+class PresenceTracker:
+    """Sledovanie online/offline stavu zariadení s časovacím kolesom"""
+
+    def __init__(self, timeout=None, resolution=1.0):
+        """Inicializácia sledovania
+
+        Args:
+            timeout (float, optional): Po koľkých sekundách bez kontaktu je zariadenie
+                                       offline (predvolene network.presence_timeout)
+            resolution (float): Dĺžka jedného slotu kolesa v sekundách
+        """
+        self.timeout = timeout or get_setting("network", {}).get("presence_timeout", 3600)
+        self.resolution = resolution
+        self._slot_count = int(math.ceil(self.timeout / resolution)) + 1
+        self._wheel = [set() for _ in range(self._slot_count)]
+        self._slots = {}
+        self._last_seen = {}
+        self._online = set()
+        self._cursor = 0
+        self._cursor_time = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.load()
+
+    @property
+    def active_count(self):
+        """Počet zariadení online (bez prepočtu)"""
+        return len(self._online)
+
+    def load(self):
+        """Načítanie posledného kontaktu zariadení z nastavení (bez oznamovania prechodov)"""
+        now_wall = datetime.now()
+        now = time.monotonic()
+        with self._lock:
+            for device_id, device_data in get_sensor_devices().items():
+                try:
+                    age = (now_wall - datetime.fromisoformat(device_data["last_seen"])).total_seconds()
+                except (KeyError, ValueError, TypeError):
+                    continue
+                if age < self.timeout:
+                    self._last_seen[device_id] = now - max(0, age)
+                    self._online.add(device_id)
+                    self._schedule(device_id)
+
+    def start(self):
+        """Spustenie vlákna posúvajúceho časovacie koleso"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="presence-wheel")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Zastavenie vlákna časovacieho kolesa"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+
+    def seen(self, device_id):
+        """Zaznamenanie kontaktu so zariadením"""
+        with self._lock:
+            self._last_seen[device_id] = time.monotonic()
+            self._unschedule(device_id)
+            self._schedule(device_id)
+            if device_id in self._online:
+                return
+            self._online.add(device_id)
+        event_bus.publish(PresenceChanged(device_id, True))
+
+    def remove(self, device_id):
+        """Odstránenie zariadenia zo sledovania (zariadenie online prejde do offline)"""
+        with self._lock:
+            self._unschedule(device_id)
+            self._last_seen.pop(device_id, None)
+            if device_id not in self._online:
+                return
+            self._online.discard(device_id)
+        event_bus.publish(PresenceChanged(device_id, False))
+
+    def is_online(self, device_id):
+        """Kontrola, či je zariadenie online (platí aj medzi posunmi kolesa)"""
+        last_seen = self._last_seen.get(device_id)
+        return (device_id in self._online and last_seen is not None
+                and time.monotonic() - last_seen < self.timeout)
+
+    def get_online_devices(self):
+        """Získanie množiny ID zariadení, ktoré sú online"""
+        with self._lock:
+            return set(self._online)
+
+    def get_stats(self):
+        """Získanie počtu sledovaných zariadení a zariadení online"""
+        with self._lock:
+            return {
+                "tracked": len(self._last_seen),
+                "online": len(self._online),
+                "timeout": self.timeout
+            }
+
+    def advance(self, now=None):
+        """Posun kolesa do aktuálneho času a vyradenie zariadení bez kontaktu"""
+        now = time.monotonic() if now is None else now
+        went_offline = []
+        with self._lock:
+            if now - self._cursor_time > self.timeout + self.resolution:
+                # Po dlhom výpadku (napr. uspatie) stačí jedna otáčka kolesa
+                self._cursor_time = now - self.timeout - self.resolution
+
+            while self._cursor_time + self.resolution <= now:
+                self._cursor_time += self.resolution
+                self._cursor = (self._cursor + 1) % self._slot_count
+                due = self._wheel[self._cursor]
+                self._wheel[self._cursor] = set()
+                for device_id in due:
+                    self._slots.pop(device_id, None)
+                    if self._last_seen[device_id] + self.timeout <= now:
+                        self._online.discard(device_id)
+                        went_offline.append(device_id)
+                    else:
+                        # Slot je hrubší ako presný čas vypršania
+                        self._schedule(device_id)
+
+        for device_id in went_offline:
+            event_bus.publish(PresenceChanged(device_id, False))
+        return went_offline
+
+    def _schedule(self, device_id):
+        """Zaradenie zariadenia do slotu podľa času vypršania (volá sa pod zámkom)"""
+        expires = self._last_seen[device_id] + self.timeout
+        ticks = int(math.ceil((expires - self._cursor_time) / self.resolution))
+        ticks = min(max(ticks, 1), self._slot_count - 1)
+        slot = (self._cursor + ticks) % self._slot_count
+        self._wheel[slot].add(device_id)
+        self._slots[device_id] = slot
+
+    def _unschedule(self, device_id):
+        """Vyradenie zariadenia z kolesa (volá sa pod zámkom)"""
+        slot = self._slots.pop(device_id, None)
+        if slot is not None:
+            self._wheel[slot].discard(device_id)
+
+    def _run(self):
+        """Slučka posúvania kolesa"""
+        while not self._stop_event.wait(self.resolution):
+            try:
+                self.advance()
+            except Exception as e:
+                print(f"ERROR: Chyba sledovania prítomnosti zariadení: {e}")
+
+
+# Globálna inštancia sledovania prítomnosti
+presence_tracker = PresenceTracker()
@@ -0,0 +1,129 @@
+"""
+Modul pre obmedzenie rýchlosti správ jednotlivých zariadení.
+
+Každé zariadenie má vlastné vedro žetónov (token bucket) - žetóny pribúdajú
+rýchlosťou rate za sekundu až do kapacity burst a každá správa jeden žetón
+spotrebuje. Keď žetóny dôjdu, správa sa odmietne. Pokazený senzor alebo zle
+nastavený odosielateľ tak nemôže zahltiť príjem a spomaliť upozornenia
+z ostatných zariadení.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Vedro žetónov jedného zariadenia"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def consume(self, cost=1, now=None):
+        """Spotrebovanie žetónov, False ak ich nie je dosť"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def is_idle(self, now):
+        """Kontrola, či by vedro bolo znova plné (zariadenie je nečinné)"""
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class DeviceRateLimiter:
+    """Obmedzenie rýchlosti správ podľa zariadenia s počítadlami pre každé zariadenie"""
+
+    # Najväčší počet sledovaných zariadení, potom sa nečinné vedrá odstránia
+    MAX_DEVICES = 4096
+
+    def __init__(self, name, rate, burst=None):
+        """Inicializácia obmedzenia
+
+        Args:
+            name (str): Názov obmedzenia pre štatistiky (napr. 'udp')
+            rate (float): Povolený počet správ za sekundu na zariadenie (0 = bez obmedzenia)
+            burst (float, optional): Najväčší jednorazový nárast správ (predvolene 2 * rate)
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst or max(1, 2 * rate)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._counters = {}
+        self.stats = {
+            "allowed": 0,
+            "throttled": 0
+        }
+
+    @property
+    def enabled(self):
+        """Kontrola, či je obmedzenie zapnuté"""
+        return self.rate > 0
+
+    def allow(self, key, cost=1):
+        """Kontrola a započítanie správy zariadenia
+
+        Args:
+            key (str): ID zariadenia, pri neznámom zariadení IP adresa
+            cost (float): Počet spotrebovaných žetónov
+
+        Returns:
+            bool: True, ak správa neprekročila povolenú rýchlosť
+        """
+        if not self.enabled:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_DEVICES:
+                    self._prune(now)
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+
+            allowed = bucket.consume(cost, now)
+            counters = self._counters.setdefault(key, {"allowed": 0, "throttled": 0})
+            result = "allowed" if allowed else "throttled"
+            counters[result] += 1
+            self.stats[result] += 1
+
+        if not allowed and counters["throttled"] == 1:
+            print(f"WARNING: Zariadenie {key} prekročilo limit {self.name} ({self.rate}/s), správy sa odmietajú")
+        return allowed
+
+    def get_stats(self, top=10):
+        """Získanie štatistík obmedzenia
+
+        Args:
+            top (int): Počet zariadení s najviac odmietnutými správami vo výpise
+
+        Returns:
+            dict: Súčty, nastavenie a najviac obmedzované zariadenia
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            throttled = [(key, dict(counters)) for key, counters in self._counters.items()
+                         if counters["throttled"]]
+        throttled.sort(key=lambda item: item[1]["throttled"], reverse=True)
+        stats["name"] = self.name
+        stats["rate"] = self.rate
+        stats["burst"] = self.burst
+        stats["devices"] = {key: counters for key, counters in throttled[:top]}
+        return stats
+
+    def _prune(self, now):
+        """Odstránenie vedier a počítadiel nečinných zariadení (volá sa pod zámkom)
+
+        Odstránia sa aj počítadlá obmedzovaných zariadení - inak by odosielateľ
+        meniaci ID neobmedzene zväčšoval tabuľku. Súčty v stats zostávajú.
+        """
+        for key in [key for key, bucket in self._buckets.items() if bucket.is_idle(now)]:
+            del self._buckets[key]
+            self._counters.pop(key, None)
@@ -0,0 +1,459 @@
+"""
+Modul pre binárny formát UDP správ senzorov.
+
+Namiesto textu SENSOR:{id}:{name}:{type}:{status} posiela odosielateľ po
+úspešnom nadviazaní spojenia krátky binárny datagram s číselným
+identifikátorom (handle) zariadenia, ktorý mu prijímač pridelil.
+
+Nadviazanie spojenia prebieha cez port objavovania:
+    odosielateľ -> REGISTER:{max_verzia}:{device_id}:{device_name}
+    prijímač    -> REGISTERED:{verzia}:{handle}
+
+Textový formát zostáva ako záložný pre staršie prijímače a odosielateľov.
+Registrovaný odosielateľ pripája k textovej správe poradové číslo a čas
+odoslania: SENSOR:{id}:{name}:{type}:{status}:seq={n}:ts={čas}.
+
+Vo verzii 2 môže odosielateľ v type správy nastaviť príznak FLAG_ACK.
+Prijímač potom poradové čísla takýchto udalostí potvrdí dávkovým
+datagramom MSG_ACK (jeden za dávku prijatých datagramov) a odosielateľ
+nepotvrdené udalosti opakuje s exponenciálne rastúcou pauzou.
+
+Od verzie 3 môže odosielateľ zlúčiť viac udalostí (binárnych aj
+textových) do jedného datagramu: magic MULTI_MAGIC, verzia, počet udalostí
+a pre každú udalosť 2 bajty dĺžky a jej dáta. Datagram nemá prekročiť
+MTU cesty (MAX_MULTI_SIZE), aby sa nefragmentoval.
+
+Verzia 4 pripája k binárnej udalosti identifikátor stopy (trace ID, 0 = bez
+stopy) a čas hrany GPIO v nanosekundách (SENSOR_TRACE), textová správa
+nesie položku tr={trace_id}@{čas_ns}. Prijímač podľa nich meria oneskorenie
+jednotlivých fáz spracovania (modul tracing).
+
+Poradové čísla sú monotónne pre každé zariadenie. Prijímač si pamätá
+najvyššie prijaté číslo (high-water mark) a okno posledných čísel, takže
+duplikáty a oneskorené datagramy zahodí v konštantnom čase.
+"""
+import struct
+import threading
+try:
+    from config.settings import get_sensor_devices
+except ImportError:
+    def get_sensor_devices():
+        return {}
+
+# Identifikácia binárneho datagramu a podporované verzie protokolu
+MAGIC = b"SB"
+MULTI_MAGIC = b"SM"
+PROTOCOL_VERSION = 4
+SUPPORTED_VERSIONS = (1, 2, 3, 4)
+
+# Typy binárnych správ
+MSG_SENSOR = 1
+MSG_ACK = 2
+# Príznak v type správy - odosielateľ žiada potvrdenie (od verzie 2)
+FLAG_ACK = 0x80
+
+# magic, verzia, typ správy, handle, senzor, stav, poradové číslo, časová pečiatka
+SENSOR_EVENT = struct.Struct("!2sBBHBBId")
+# identifikátor stopy a čas hrany GPIO v ns - za udalosťou od verzie 4
+SENSOR_TRACE = struct.Struct("!QQ")
+# magic, verzia, typ správy, handle, počet potvrdených čísel; za ním čísla po 4 bajtoch
+ACK_HEADER = struct.Struct("!2sBBHB")
+ACK_SEQ = struct.Struct("!I")
+# Najviac potvrdených čísel v jednom datagrame
+MAX_ACK_SEQS = 255
+# magic, verzia, počet udalostí; pred každou udalosťou jej dĺžka
+MULTI_HEADER = struct.Struct("!2sBB")
+MULTI_LENGTH = struct.Struct("!H")
+# Najväčší zlúčený datagram - MTU Ethernetu bez hlavičiek IPv4 a UDP
+MAX_MULTI_SIZE = 1472
+# Najväčší prijímaný datagram
+MAX_DATAGRAM_SIZE = 65535
+
+# Číselníky typov senzorov a ich stavov
+SENSOR_TYPES = {
+    "motion": 1,
+    "door": 2,
+    "window": 3
+}
+SENSOR_STATES = {
+    "DETECTED": 1,
+    "CLEAR": 2,
+    "OPEN": 3,
+    "CLOSED": 4
+}
+SENSOR_TYPE_NAMES = {value: name for name, value in SENSOR_TYPES.items()}
+SENSOR_STATE_NAMES = {value: name for name, value in SENSOR_STATES.items()}
+
+# Správy nadviazania spojenia
+REGISTER_PREFIX = "REGISTER:"
+REGISTERED_PREFIX = "REGISTERED:"
+
+# Voliteľné koncové položky textovej správy
+SEQ_TOKEN = "seq="
+TIMESTAMP_TOKEN = "ts="
+TRACE_TOKEN = "tr="
+
+
+def is_binary_datagram(data):
+    """Kontrola, či ide o binárny datagram senzora"""
+    return data[:2] == MAGIC
+
+
+def is_multi_datagram(data):
+    """Kontrola, či ide o datagram so zlúčenými udalosťami"""
+    return data[:2] == MULTI_MAGIC
+
+
+def pack_multi(events, max_size=MAX_MULTI_SIZE):
+    """Zlúčenie udalostí do čo najmenšieho počtu datagramov
+
+    Samostatná udalosť sa posiela bez rámca, aby jej rozumel aj starší prijímač.
+
+    Args:
+        events (list): Dáta jednotlivých udalostí (bytes)
+        max_size (int): Najväčšia veľkosť jedného datagramu
+
+    Returns:
+        list: Datagramy na odoslanie
+    """
+    datagrams = []
+    group = []
+    size = MULTI_HEADER.size
+
+    def close_group():
+        if len(group) == 1:
+            datagrams.append(group[0])
+        elif group:
+            datagrams.append(MULTI_HEADER.pack(MULTI_MAGIC, PROTOCOL_VERSION, len(group)) +
+                             b"".join(MULTI_LENGTH.pack(len(event)) + event for event in group))
+
+    for event in events:
+        event_size = MULTI_LENGTH.size + len(event)
+        if group and (size + event_size > max_size or len(group) == 255):
+            close_group()
+            group = []
+            size = MULTI_HEADER.size
+        group.append(event)
+        size += event_size
+    close_group()
+    return datagrams
+
+
+def split_multi(data):
+    """Rozdelenie datagramu so zlúčenými udalosťami
+
+    Returns:
+        list: Dáta jednotlivých udalostí
+
+    Raises:
+        ValueError: Ak datagram nemá platný formát
+    """
+    if len(data) < MULTI_HEADER.size:
+        raise ValueError(f"Príliš krátky zlúčený datagram ({len(data)} bajtov)")
+    magic, version, count = MULTI_HEADER.unpack_from(data)
+    if magic != MULTI_MAGIC or version not in SUPPORTED_VERSIONS or version < 3:
+        raise ValueError(f"Nepodporovaná verzia zlúčeného datagramu {version}")
+
+    events = []
+    offset = MULTI_HEADER.size
+    for _ in range(count):
+        if offset + MULTI_LENGTH.size > len(data):
+            raise ValueError("Neúplný zlúčený datagram")
+        length, = MULTI_LENGTH.unpack_from(data, offset)
+        offset += MULTI_LENGTH.size
+        if offset + length > len(data):
+            raise ValueError("Neúplná udalosť v zlúčenom datagrame")
+        events.append(bytes(data[offset:offset + length]))
+        offset += length
+    return events
+
+
+def pack_sensor_event(handle, sensor_type, status, seq, timestamp, ack=False, trace=None):
+    """Zabalenie udalosti senzora do binárneho datagramu
+
+    Args:
+        ack (bool): Žiadať potvrdenie prijatia (verzia 2)
+        trace (tuple, optional): (identifikátor stopy, čas hrany v ns) (verzia 4)
+
+    Returns:
+        bytes: Datagram alebo None, ak typ alebo stav nemá binárny kód
+    """
+    sensor_code = SENSOR_TYPES.get(sensor_type)
+    state_code = SENSOR_STATES.get(status)
+    if sensor_code is None or state_code is None:
+        return None
+    msg_type = MSG_SENSOR | FLAG_ACK if ack else MSG_SENSOR
+    trace_id, origin_ns = trace or (0, 0)
+    return SENSOR_EVENT.pack(MAGIC, PROTOCOL_VERSION, msg_type, handle,
+                             sensor_code, state_code, seq & 0xFFFFFFFF, timestamp) + \
+        SENSOR_TRACE.pack(trace_id, origin_ns)
+
+
+def unpack_sensor_event(data):
+    """Rozbalenie binárneho datagramu senzora
+
+    Returns:
+        dict: handle, sensor_type, status, seq, timestamp, ack, trace_id a origin_ns
+              (bez stopy 0)
+
+    Raises:
+        ValueError: Ak datagram nemá platný formát
+    """
+    if len(data) < SENSOR_EVENT.size:
+        raise ValueError(f"Príliš krátky datagram ({len(data)} bajtov)")
+
+    magic, version, msg_type, handle, sensor_code, state_code, seq, timestamp = \
+        SENSOR_EVENT.unpack_from(data)
+    if magic != MAGIC or version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Nepodporovaná verzia protokolu {version}")
+    ack = version >= 2 and bool(msg_type & FLAG_ACK)
+    if msg_type & ~FLAG_ACK != MSG_SENSOR:
+        raise ValueError(f"Neznámy typ správy {msg_type}")
+    if sensor_code not in SENSOR_TYPE_NAMES or state_code not in SENSOR_STATE_NAMES:
+        raise ValueError(f"Neznámy senzor {sensor_code} alebo stav {state_code}")
+    trace_id = origin_ns = 0
+    if version >= 4:
+        if len(data) < SENSOR_EVENT.size + SENSOR_TRACE.size:
+            raise ValueError(f"Chýba stopa udalosti ({len(data)} bajtov)")
+        trace_id, origin_ns = SENSOR_TRACE.unpack_from(data, SENSOR_EVENT.size)
+
+    return {
+        "handle": handle,
+        "sensor_type": SENSOR_TYPE_NAMES[sensor_code],
+        "status": SENSOR_STATE_NAMES[state_code],
+        "seq": seq,
+        "timestamp": timestamp,
+        "ack": ack,
+        "trace_id": trace_id,
+        "origin_ns": origin_ns
+    }
+
+
+def pack_ack(handle, seqs):
+    """Zabalenie potvrdenia poradových čísel jedného zariadenia
+
+    Returns:
+        list: Datagramy (pri viac ako MAX_ACK_SEQS číslach viac datagramov)
+    """
+    datagrams = []
+    for start in range(0, len(seqs), MAX_ACK_SEQS):
+        part = seqs[start:start + MAX_ACK_SEQS]
+        datagrams.append(ACK_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_ACK, handle, len(part)) +
+                         b"".join(ACK_SEQ.pack(seq & 0xFFFFFFFF) for seq in part))
+    return datagrams
+
+
+def unpack_ack(data):
+    """Rozbalenie potvrdenia
+
+    Returns:
+        tuple: (handle, zoznam potvrdených poradových čísel)
+
+    Raises:
+        ValueError: Ak datagram nie je platné potvrdenie
+    """
+    if len(data) < ACK_HEADER.size:
+        raise ValueError(f"Príliš krátke potvrdenie ({len(data)} bajtov)")
+    magic, version, msg_type, handle, count = ACK_HEADER.unpack_from(data)
+    if magic != MAGIC or msg_type != MSG_ACK:
+        raise ValueError("Datagram nie je potvrdenie")
+    if len(data) < ACK_HEADER.size + count * ACK_SEQ.size:
+        raise ValueError("Neúplné potvrdenie")
+    seqs = [ACK_SEQ.unpack_from(data, ACK_HEADER.size + index * ACK_SEQ.size)[0] for index in range(count)]
+    return handle, seqs
+
+
+def negotiate_version(offered_version):
+    """Výber najvyššej spoločnej verzie protokolu (0 = iba textový formát)"""
+    common = [v for v in SUPPORTED_VERSIONS if v <= offered_version]
+    return max(common) if common else 0
+
+
+class DeviceHandleTable:
+    """Tabuľka krátkych číselných identifikátorov (handle) zariadení
+
+    Pridelené identifikátory sa ukladajú do záznamu zariadenia v nastaveniach
+    (kľúč "handle"), aby platili aj po reštarte prijímača.
+    """
+
+    # Najväčší identifikátor, ktorý sa zmestí do binárneho formátu
+    MAX_HANDLE = 0xFFFF
+
+    def __init__(self):
+        """Inicializácia tabuľky z uložených zariadení"""
+        self._lock = threading.Lock()
+        self._by_handle = {}
+        self._by_device = {}
+        self.load()
+
+    def load(self):
+        """Načítanie pridelených identifikátorov z nastavení"""
+        with self._lock:
+            self._by_handle.clear()
+            self._by_device.clear()
+            for device_id, device_data in get_sensor_devices().items():
+                handle = device_data.get("handle")
+                if isinstance(handle, int):
+                    self._by_handle[handle] = device_id
+                    self._by_device[device_id] = handle
+
+    def assign(self, device_id):
+        """Pridelenie identifikátora zariadeniu (existujúci sa zachová)
+
+        Returns:
+            int: Identifikátor zariadenia
+
+        Raises:
+            OverflowError: Ak už nie je voľný žiadny identifikátor
+        """
+        with self._lock:
+            if device_id in self._by_device:
+                return self._by_device[device_id]
+
+            handle = max(self._by_handle, default=0) + 1
+            if handle > self.MAX_HANDLE:
+                # Hľadanie uvoľneného identifikátora
+                handle = next((h for h in range(1, self.MAX_HANDLE + 1) if h not in self._by_handle), None)
+                if handle is None:
+                    raise OverflowError("Nie je voľný žiadny identifikátor zariadenia")
+
+            self._by_handle[handle] = device_id
+            self._by_device[device_id] = handle
+            return handle
+
+    def release(self, device_id):
+        """Uvoľnenie identifikátora odstráneného zariadenia"""
+        with self._lock:
+            handle = self._by_device.pop(device_id, None)
+            if handle is not None:
+                self._by_handle.pop(handle, None)
+
+    def resolve(self, handle):
+        """Získanie ID zariadenia podľa identifikátora, None ak je neznámy"""
+        return self._by_handle.get(handle)
+
+
+def split_sequence_tokens(parts):
+    """Oddelenie koncových položiek seq=, ts= a tr= od častí textovej správy
+
+    Args:
+        parts (list): Časti správy rozdelenej podľa dvojbodky
+
+    Returns:
+        tuple: (časti bez koncových položiek, poradové číslo alebo None, čas odoslania alebo None,
+                (identifikátor stopy, čas hrany v ns) alebo None)
+    """
+    seq = None
+    timestamp = None
+    trace = None
+    while parts:
+        token = parts[-1]
+        try:
+            if token.startswith(SEQ_TOKEN):
+                seq = int(token[len(SEQ_TOKEN):]) & 0xFFFFFFFF
+            elif token.startswith(TIMESTAMP_TOKEN):
+                timestamp = float(token[len(TIMESTAMP_TOKEN):])
+            elif token.startswith(TRACE_TOKEN):
+                trace_id, origin_ns = token[len(TRACE_TOKEN):].split("@")
+                trace = (int(trace_id, 16), int(origin_ns))
+            else:
+                break
+        except ValueError:
+            break
+        parts = parts[:-1]
+    return parts, seq, timestamp, trace
+
+
+class SequenceTracker:
+    """Najvyššie prijaté poradové číslo (high-water mark) každého zariadenia
+
+    Okrem najvyššieho čísla sa pamätá bitová maska posledných WINDOW čísel,
+    podľa ktorej sa odlíši duplikát od oneskoreného datagramu. Reštart
+    odosielateľa (počítadlo začína znova od 1) sa rozpozná podľa novšieho
+    času odoslania alebo podľa čísla v prvých RESTART_WINDOW číslach.
+    """
+
+    # Počet posledných poradových čísel, pre ktoré sa rozlišujú duplikáty
+    WINDOW = 64
+    # Poradové čísla, ktorými začína odosielateľ po reštarte
+    RESTART_WINDOW = 16
+
+    ACCEPTED = "accepted"
+    RESTARTED = "restarted"
+    DUPLICATE = "duplicate"
+    STALE = "stale"
+
+    def __init__(self):
+        """Inicializácia prázdnej tabuľky"""
+        self._lock = threading.Lock()
+        # ID zariadenia -> [najvyššie číslo, bitová maska okna, čas odoslania najvyššieho čísla]
+        self._devices = {}
+        self.stats = {
+            self.ACCEPTED: 0,
+            self.DUPLICATE: 0,
+            self.STALE: 0,
+            "restarts": 0
+        }
+
+    def check(self, device_id, seq, sent_at=None):
+        """Kontrola a zaznamenanie poradového čísla udalosti
+
+        Args:
+            device_id (str): ID zariadenia
+            seq (int): Poradové číslo (32 bitov, môže pretiecť)
+            sent_at (float, optional): Čas odoslania podľa odosielateľa
+
+        Returns:
+            str: ACCEPTED, RESTARTED (prijaté, odosielateľ začal nové poradie),
+                 DUPLICATE alebo STALE
+        """
+        with self._lock:
+            state = self._devices.get(device_id)
+            if state is None:
+                self._devices[device_id] = [seq, 1, sent_at]
+                return self._count(self.ACCEPTED)
+
+            high, window, high_sent_at = state
+            ahead = (seq - high) & 0xFFFFFFFF
+            if ahead and ahead < 0x80000000:
+                # Novšie číslo - posun okna
+                state[0] = seq
+                state[1] = ((window << ahead) | 1) & ((1 << self.WINDOW) - 1) if ahead < self.WINDOW else 1
+                state[2] = sent_at
+                return self._count(self.ACCEPTED)
+
+            behind = (high - seq) & 0xFFFFFFFF
+            if self._is_restart(seq, behind, sent_at, high_sent_at):
+                self._devices[device_id] = [seq, 1, sent_at]
+                self._count(self.ACCEPTED)
+                self.stats["restarts"] += 1
+                return self.RESTARTED
+
+            if behind < self.WINDOW and window & (1 << behind):
+                return self._count(self.DUPLICATE)
+            return self._count(self.STALE)
+
+    def forget(self, device_id):
+        """Zabudnutie stavu zariadenia (napr. po jeho odstránení)"""
+        with self._lock:
+            self._devices.pop(device_id, None)
+
+    def get_stats(self):
+        """Získanie počítadiel prijatých, duplicitných a oneskorených udalostí"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["devices"] = len(self._devices)
+        return stats
+
+    def _is_restart(self, seq, behind, sent_at, high_sent_at):
+        """Kontrola, či staršie číslo znamená reštart odosielateľa"""
+        if sent_at is not None and high_sent_at is not None and sent_at > high_sent_at:
+            # Oneskorený datagram bol odoslaný skôr, nie neskôr
+            return True
+        # Bez spoľahlivých hodín (napr. pred synchronizáciou času) pomôže začiatok počítadla
+        return seq <= self.RESTART_WINDOW and behind > self.WINDOW
+
+    def _count(self, result):
+        """Navýšenie počítadla výsledku (volá sa pod zámkom)"""
+        self.stats[result] += 1
+        return result
@@ -0,0 +1,145 @@
+"""
+Modul pre zlučovanie zápisov stavu senzorov.
+
+Každá správa senzora a každé ohlásenie zariadenia mení aspoň last_seen
+alebo last_updated. Tabuľka stavu zmeny vždy hneď zapíše do úložiska stavu
+v pamäti (obrazovky a web vidia aktuálne hodnoty), ale na disk ich uloží
+iba pri skutočnom prechode stavu (napr. CLOSED -> OPEN, nové zariadenie,
+zmena IP). Zmeny, ktoré sú len prejavom živosti, sa zlúčia a uložia raz
+za ingest.state_flush_interval sekúnd.
+"""
+import threading
+try:
+    from config.settings import (get_setting, get_sensor_devices, get_sensor_status,
+                                 apply_sensor_updates, save_sensor_state)
+except ImportError:
+    def get_setting(section, default):
+        return default
+    def get_sensor_devices():
+        return {}
+    def get_sensor_status():
+        return {}
+    def apply_sensor_updates(devices, statuses, save=True):
+        return True
+    def save_sensor_state():
+        return True
+
+# Polia, ktorých zmena nie je prechodom stavu, iba prejavom živosti
+HEARTBEAT_FIELDS = ("last_seen", "last_updated")
+
+
+class SensorStateTable:
+    """Tabuľka stavu senzorov s okamžitým zápisom prechodov a zlučovaním ostatného"""
+
+    def __init__(self, flush_interval=None):
+        """Inicializácia tabuľky
+
+        Args:
+            flush_interval (float, optional): Interval ukladania zlúčených zmien v sekundách
+                                              (predvolene ingest.state_flush_interval)
+        """
+        self.flush_interval = flush_interval or get_setting("ingest", {}).get("state_flush_interval", 60)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.stats = {
+            "updates": 0,
+            "transitions": 0,
+            "coalesced": 0,
+            "writes": 0
+        }
+
+    def start(self):
+        """Spustenie vlákna pravidelného ukladania zlúčených zmien"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sensor-state-flush")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Zastavenie vlákna a uloženie zlúčených zmien"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+        self.flush()
+
+    def update(self, devices, statuses):
+        """Zaznamenanie zmien zariadení a stavov senzorov
+
+        Args:
+            devices (dict): ID zariadenia -> údaje zariadenia
+            statuses (dict): ID zariadenia -> zmeny stavu senzorov
+
+        Returns:
+            bool: True, ak išlo o prechod stavu a zmeny sa hneď uložili
+        """
+        with self._lock:
+            transition = self._is_transition(devices, statuses)
+            apply_sensor_updates(devices, statuses, save=transition)
+
+            self.stats["updates"] += 1
+            if transition:
+                # Uložením sa zapísali aj všetky doteraz zlúčené zmeny
+                self.stats["transitions"] += 1
+                self.stats["writes"] += 1
+                self._dirty = False
+            else:
+                self.stats["coalesced"] += 1
+                self._dirty = True
+            return transition
+
+    def flush(self):
+        """Uloženie zlúčených zmien, ak nejaké čakajú"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            self._dirty = False
+            self.stats["writes"] += 1
+        return save_sensor_state()
+
+    def get_stats(self):
+        """Získanie štatistík zápisov"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["dirty"] = self._dirty
+        return stats
+
+    def _is_transition(self, devices, statuses):
+        """Kontrola, či sa mení niečo iné ako časové údaje živosti"""
+        known_devices = get_sensor_devices()
+        for device_id, device_data in devices.items():
+            known = known_devices.get(device_id)
+            if known is None or self._differs(known, device_data):
+                return True
+
+        known_statuses = get_sensor_status()
+        for device_id, status_data in statuses.items():
+            known = known_statuses.get(device_id)
+            if known is None or self._differs(known, status_data):
+                return True
+        return False
+
+    @staticmethod
+    def _differs(known, changes):
+        """Porovnanie zmien s uloženým záznamom bez polí živosti"""
+        for key, value in changes.items():
+            if key not in HEARTBEAT_FIELDS and known.get(key) != value:
+                return True
+        return False
+
+    def _run(self):
+        """Slučka pravidelného ukladania"""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"ERROR: Zlyhalo uloženie zlúčeného stavu senzorov: {e}")
+
+
+# Globálna inštancia tabuľky stavu senzorov
+sensor_state = SensorStateTable()
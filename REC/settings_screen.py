@@ -7,7 +7,7 @@ from kivy.uix.switch import Switch
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 # Zmena relatívneho importu na absolútny import
-from config.settings import get_setting, update_setting, save_settings
+from config.settings import get_setting, update_setting, save_settings, get_sensor_devices
 from base_screen import BaseScreen
 
 class SettingsScreen(BaseScreen):
@@ -76,7 +76,7 @@ class SettingsScreen(BaseScreen):
         device_layout.add_widget(Label(text="Zariadenie:", size_hint_x=0.3))
         
         # Získanie pripojených zariadení pre spinner
-        devices = get_setting("sensor_devices", {})
+        devices = get_sensor_devices()
         device_names = ["Všetky zariadenia"]  # Možnosť vysielať na všetky zariadenia
         self.device_ids = ["all"]  # Uloženie ID zariadení s rovnakým indexom ako názvy
         
@@ -404,7 +404,7 @@ class SettingsScreen(BaseScreen):
             target_device_id = self.device_ids[selected_device_index]
             
             # Získať informácie o zariadení
-            devices = get_setting("sensor_devices", {})
+            devices = get_sensor_devices()
             if not devices:
                 self.status_label.text = "Žiadne pripojené zariadenia na aktualizáciu"
                 return
@@ -555,15 +555,16 @@ class SettingsScreen(BaseScreen):
     def save_settings(self, instance):
         """Uloženie nastavení do súboru"""
         try:
+            # Nastavenia sú nemenná snímka - upravujú sa kópie sekcií
             # Aktualizácia sieťových nastavení
-            network = get_setting("network", {})
+            network = dict(get_setting("network", {}))
             network["tcp_port"] = int(self.tcp_port.text)
             network["udp_port"] = int(self.udp_port.text)
             network["discovery_port"] = int(self.discovery_port.text)
             update_setting("network", network)
             
             # Aktualizácia konfigurácie GPIO pinov
-            gpio_config = get_setting("gpio_config", {})
+            gpio_config = dict(get_setting("gpio_config", {}))
             gpio_config["motion_pin"] = int(self.motion_pin.text)
             gpio_config["door_pin"] = int(self.door_pin.text)
             gpio_config["window_pin"] = int(self.window_pin.text)
@@ -571,7 +572,7 @@ class SettingsScreen(BaseScreen):
             update_setting("gpio_config", gpio_config)
             
             # Aktualizácia nastavení upozornení
-            alerts = get_setting("alerts", {})
+            alerts = dict(get_setting("alerts", {}))
             alerts["sound_enabled"] = self.alert_sound.active
             alerts["notification_type"] = self.notification_type.text
             alerts["retention_days"] = int(self.retention_days.text)
@@ -579,7 +580,7 @@ class SettingsScreen(BaseScreen):
             
             # Aktualizácia emailových nastavení
             notifications = get_setting("notifications", {})
-            email_settings = notifications.get("email", {})
+            email_settings = dict(notifications.get("email", {}))
             email_settings["enabled"] = self.email_enabled.active
             email_settings["smtp_server"] = self.smtp_server.text
             email_settings["smtp_port"] = int(self.smtp_port.text)
@@ -594,14 +595,14 @@ class SettingsScreen(BaseScreen):
             update_setting("notifications.email", email_settings)
             
             # Aktualizácia nastavení obrázkov
-            images = get_setting("images", {})
+            images = dict(get_setting("images", {}))
             images["storage_path"] = self.storage_path.text
             images["retention_days"] = int(self.img_retention_days.text)
             images["quality"] = self.image_quality.text
             update_setting("images", images)
             
             # Aktualizácia systémových nastavení
-            system = get_setting("system", {})
+            system = dict(get_setting("system", {}))
             system["auto_start"] = self.auto_start.active
             system["log_level"] = self.log_level.text
             system["config_format"] = self.config_format.text
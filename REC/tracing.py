@@ -0,0 +1,241 @@
+"""
+Modul pre sledovanie oneskorenia udalostí od hrany GPIO po upozornenie.
+
+Odosielateľ pri zmene senzora vytvorí identifikátor stopy (trace ID)
+a časovú pečiatku hrany v nanosekundách a posiela ich v UDP správe aj
+v hlavičke TCP obrázka. Každá fáza prijímača (parsovanie, zápis stavu,
+add_alert, spustenie ochrannej doby, odoslanie e-mailu, alarm) zaznamená
+úsek (span) - svoje trvanie a čas od hrany. Úseky sa zlučujú do
+histogramov oneskorenia pre každú fázu a posledné stopy sa držia
+v obmedzenom počte na dohľadanie jednotlivej udalosti.
+
+Čas od hrany porovnáva hodiny odosielateľa a prijímača, preto je presný
+iba pri synchronizovaných hodinách (NTP). Záporné hodnoty (hodiny
+prijímača idú pozadu) sa započítajú do najnižšieho koša.
+"""
+import threading
+import time
+from collections import OrderedDict
+try:
+    from config.settings import get_setting
+except ImportError:
+    def get_setting(section, default):
+        return default
+
+# Horné hranice košov histogramu v milisekundách (posledný kôš je neohraničený)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+              1000, 2500, 5000, 10000, 30000, 60000)
+
+
+def format_trace_id(trace_id):
+    """Textová podoba identifikátora stopy (16 šestnástkových číslic)"""
+    return f"{trace_id:016x}"
+
+
+def parse_trace_id(value):
+    """Identifikátor stopy z textu alebo čísla, None ak nie je platný"""
+    if value is None:
+        return None
+    try:
+        trace_id = int(value, 16) if isinstance(value, str) else int(value)
+    except (TypeError, ValueError):
+        return None
+    return trace_id or None
+
+
+class LatencyHistogram:
+    """Histogram oneskorení s pevnými košmi"""
+
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value_ms):
+        """Započítanie jednej hodnoty v milisekundách"""
+        value_ms = max(0.0, value_ms)
+        index = 0
+        while index < len(BUCKETS_MS) and value_ms > BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.maximum = max(self.maximum, value_ms)
+
+    def percentile(self, fraction):
+        """Odhad percentilu - horná hranica koša, v ktorom percentil leží"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.maximum
+        return self.maximum
+
+    def to_dict(self):
+        """Súhrn histogramu pre API"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.maximum, 3),
+            "buckets": {f"le_{bound}": count for bound, count in zip(BUCKETS_MS, self.counts)},
+            "overflow": self.counts[-1]
+        }
+
+
+class Tracer:
+    """Záznam úsekov stôp a histogramy oneskorenia podľa fázy"""
+
+    def __init__(self, enabled=None, history=None):
+        """Inicializácia sledovania
+
+        Args:
+            enabled (bool, optional): Zapnutie sledovania (predvolene ingest.tracing)
+            history (int, optional): Počet posledných stôp v pamäti (ingest.trace_history)
+        """
+        ingest_settings = get_setting("ingest", {})
+        self.enabled = ingest_settings.get("tracing", True) if enabled is None else enabled
+        self.history = history or ingest_settings.get("trace_history", 1024)
+        self._lock = threading.Lock()
+        self._traces = OrderedDict()
+        self._durations = {}
+        self._since_origin = {}
+
+    def start(self, trace_id, origin_ns, device_id=None, sensor=None):
+        """Zaregistrovanie stopy prijatej od odosielateľa
+
+        Args:
+            trace_id (int): Identifikátor stopy
+            origin_ns (int): Čas hrany GPIO u odosielateľa (time.time_ns)
+            device_id (str, optional): Zariadenie, ktoré stopu vytvorilo
+            sensor (str, optional): Senzor a stav (napr. 'motion:DETECTED')
+        """
+        if not self.enabled or not trace_id:
+            return
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                if len(self._traces) >= self.history:
+                    self._traces.popitem(last=False)
+                trace = self._traces[trace_id] = {
+                    "trace_id": format_trace_id(trace_id),
+                    "origin_ns": origin_ns,
+                    "device_id": device_id,
+                    "sensor": sensor,
+                    "spans": []
+                }
+            elif sensor and not trace["sensor"]:
+                trace["sensor"] = sensor
+
+    def record(self, trace_id, stage, started, finished=None):
+        """Zaznamenanie úseku fázy
+
+        Args:
+            trace_id (int): Identifikátor stopy (None = bez stopy, nič sa nezaznamená)
+            stage (str): Názov fázy (napr. 'parse', 'add_alert')
+            started (float): Začiatok úseku (time.perf_counter)
+            finished (float, optional): Koniec úseku (predvolene teraz)
+        """
+        if not self.enabled or not trace_id:
+            return
+        finished = time.perf_counter() if finished is None else finished
+        duration_ms = (finished - started) * 1000
+        now_ns = time.time_ns() - int((time.perf_counter() - finished) * 1e9)
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            since_origin_ms = None
+            if trace and trace["origin_ns"]:
+                since_origin_ms = (now_ns - trace["origin_ns"]) / 1e6
+                self._histogram(self._since_origin, stage).add(since_origin_ms)
+                trace["spans"].append({
+                    "stage": stage,
+                    "duration_ms": round(duration_ms, 3),
+                    "since_origin_ms": round(since_origin_ms, 3)
+                })
+            self._histogram(self._durations, stage).add(duration_ms)
+
+    def span(self, trace_id, stage):
+        """Kontextový manažér, ktorý zaznamená trvanie bloku ako úsek fázy"""
+        return _Span(self, trace_id, stage)
+
+    def mark(self, trace_id, stage):
+        """Zaznamenanie okamihu (úsek s nulovým trvaním), napr. začiatok alarmu"""
+        now = time.perf_counter()
+        self.record(trace_id, stage, now, now)
+
+    def get_trace(self, trace_id):
+        """Získanie jednej stopy s jej úsekmi, None ak už nie je v pamäti"""
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                return None
+            return dict(trace, spans=list(trace["spans"]))
+
+    def get_recent(self, count=20):
+        """Získanie posledných stôp (najnovšia prvá)"""
+        with self._lock:
+            traces = list(self._traces.values())[-count:]
+            return [dict(trace, spans=list(trace["spans"])) for trace in reversed(traces)]
+
+    def get_histograms(self):
+        """Získanie histogramov oneskorenia pre každú fázu
+
+        Returns:
+            dict: Fáza -> duration (trvanie fázy) a since_origin (čas od hrany GPIO)
+        """
+        with self._lock:
+            stages = set(self._durations) | set(self._since_origin)
+            return {
+                stage: {
+                    "duration": self._durations[stage].to_dict() if stage in self._durations else None,
+                    "since_origin": self._since_origin[stage].to_dict() if stage in self._since_origin else None
+                }
+                for stage in sorted(stages)
+            }
+
+    def reset(self):
+        """Vymazanie všetkých stôp a histogramov"""
+        with self._lock:
+            self._traces.clear()
+            self._durations.clear()
+            self._since_origin.clear()
+
+    @staticmethod
+    def _histogram(histograms, stage):
+        """Histogram fázy, pri prvom použití sa vytvorí (volá sa pod zámkom)"""
+        histogram = histograms.get(stage)
+        if histogram is None:
+            histogram = histograms[stage] = LatencyHistogram()
+        return histogram
+
+
+class _Span:
+    """Úsek merajúci trvanie bloku with"""
+
+    __slots__ = ("tracer", "trace_id", "stage", "started")
+
+    def __init__(self, tracer, trace_id, stage):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.stage = stage
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.tracer.record(self.trace_id, self.stage, self.started)
+        return False
+
+
+# Globálna inštancia sledovania oneskorenia
+tracer = Tracer()
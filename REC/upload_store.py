@@ -0,0 +1,188 @@
+"""
+Modul pre úložisko nedokončených prenosov obrázkov.
+
+Obrázok sa v relácii môže posielať po častiach (upload_begin, upload_chunk,
+upload_commit). Prijaté časti sa pripájajú do súboru {upload_id}.part a
+metadáta prenosu sú v {upload_id}.json, takže po výpadku spojenia (alebo
+reštarte prijímača) odosielateľ pokračuje od posledného potvrdeného posunu.
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+# Povolený tvar identifikátora prenosu - použije sa ako názov súboru
+UPLOAD_ID_PATTERN = re.compile(r"[0-9A-Za-z_-]{8,64}")
+
+
+class UploadError(Exception):
+    """Chyba prenosu po častiach - offset je posun, od ktorého má odosielateľ pokračovať"""
+
+    def __init__(self, message, offset=None):
+        super(UploadError, self).__init__(message)
+        self.offset = offset
+
+
+class UploadStore:
+    """Úložisko čiastočne prijatých obrázkov"""
+
+    def __init__(self, directory, max_size, max_age=3600):
+        """Inicializácia úložiska
+
+        Args:
+            directory (str): Adresár pre nedokončené prenosy
+            max_size (int): Najväčšia povolená veľkosť obrázka v bajtoch
+            max_age (int): Po koľkých sekundách nečinnosti sa prenos zahodí
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._last_cleanup = 0
+
+    def begin(self, upload_id, header):
+        """Začatie alebo obnovenie prenosu
+
+        Args:
+            upload_id (str): Identifikátor prenosu od odosielateľa
+            header (dict): Hlavička upload_begin (size, crc32 a údaje obrázka)
+
+        Returns:
+            int: Počet už prijatých bajtov, od ktorých má odosielateľ pokračovať
+        """
+        self._cleanup_expired()
+        size = header.get("size")
+        if not isinstance(size, int) or size < 0 or size > self.max_size:
+            raise UploadError(f"Neplatná veľkosť prenosu: {size}")
+
+        with self._lock:
+            meta = self._load_meta(upload_id)
+            if meta and meta["size"] == size and meta["crc32"] == header.get("crc32"):
+                offset = os.path.getsize(self._part_path(upload_id))
+                print(f"DEBUG: Obnovený prenos {upload_id} od posunu {offset}/{size}")
+                return offset
+
+            os.makedirs(self.directory, exist_ok=True)
+            image_header = {key: value for key, value in header.items()
+                            if key not in ("upload_id", "size", "crc32", "seq")}
+            image_header["type"] = "image"
+            meta = {"size": size, "crc32": header.get("crc32"), "header": image_header}
+            with open(self._meta_path(upload_id), "w") as f:
+                json.dump(meta, f)
+            open(self._part_path(upload_id), "wb").close()
+            return 0
+
+    def append(self, upload_id, offset, data, crc32):
+        """Pripojenie časti prenosu
+
+        Returns:
+            int: Nový počet prijatých bajtov
+
+        Raises:
+            UploadError: Ak prenos neexistuje alebo časť nesedí (posun, kontrolný súčet)
+        """
+        with self._lock:
+            meta = self._load_meta(upload_id)
+            if meta is None:
+                raise UploadError(f"Neznámy prenos {upload_id}")
+
+            part_path = self._part_path(upload_id)
+            current = os.path.getsize(part_path)
+            if offset != current:
+                # Opakovaná alebo predbiehajúca časť - odosielateľ pokračuje od current
+                raise UploadError(f"Neočakávaný posun {offset}, očakávaný {current}", current)
+            if zlib.crc32(data) != crc32:
+                raise UploadError(f"Nesprávny kontrolný súčet časti na posune {offset}", current)
+            if current + len(data) > meta["size"]:
+                raise UploadError(f"Časť presahuje veľkosť prenosu {meta['size']}", current)
+
+            with open(part_path, "ab") as f:
+                f.write(data)
+            return current + len(data)
+
+    def complete(self, upload_id):
+        """Kontrola úplnosti prenosu
+
+        Returns:
+            tuple: (cesta k prijatému súboru, hlavička obrázka)
+
+        Raises:
+            UploadError: Ak prenos nie je úplný alebo nesedí kontrolný súčet
+        """
+        with self._lock:
+            meta = self._load_meta(upload_id)
+            if meta is None:
+                raise UploadError(f"Neznámy prenos {upload_id}")
+
+            part_path = self._part_path(upload_id)
+            received = os.path.getsize(part_path)
+            if received != meta["size"]:
+                raise UploadError(f"Prenos nie je úplný ({received}/{meta['size']})", received)
+
+            crc = 0
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(256 * 1024), b""):
+                    crc = zlib.crc32(block, crc)
+            if crc != meta["crc32"]:
+                # Poškodený súbor nemá zmysel dopĺňať - prenos začne odznova
+                self._remove(upload_id, keep_data=False)
+                raise UploadError(f"Nesprávny kontrolný súčet obrázka {upload_id}", 0)
+
+            os.chmod(part_path, 0o644)
+            return part_path, meta["header"]
+
+    def forget(self, upload_id, keep_data=True):
+        """Ukončenie prenosu - súbor s dátami už patrí spracovaniu, ak keep_data"""
+        with self._lock:
+            self._remove(upload_id, keep_data)
+
+    def _cleanup_expired(self):
+        """Zahodenie prenosov, ktoré odosielateľ dlho nedokončil"""
+        now = time.time()
+        if now - self._last_cleanup < 60 or not os.path.isdir(self.directory):
+            return
+        self._last_cleanup = now
+
+        with self._lock:
+            for name in os.listdir(self.directory):
+                upload_id, ext = os.path.splitext(name)
+                if ext != ".json":
+                    continue
+                try:
+                    if now - os.path.getmtime(self._part_path(upload_id)) > self.max_age:
+                        print(f"DEBUG: Zahodený nedokončený prenos {upload_id}")
+                        self._remove(upload_id, keep_data=False)
+                except OSError:
+                    self._remove(upload_id, keep_data=False)
+
+    def _load_meta(self, upload_id):
+        """Načítanie metadát prenosu, None ak neexistuje"""
+        if not isinstance(upload_id, str) or not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+            raise UploadError(f"Neplatný identifikátor prenosu: {upload_id!r}")
+        try:
+            with open(self._meta_path(upload_id), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._part_path(upload_id)):
+            return None
+        return meta
+
+    def _remove(self, upload_id, keep_data):
+        """Odstránenie súborov prenosu (volá sa pod zámkom)"""
+        paths = [self._meta_path(upload_id)]
+        if not keep_data:
+            paths.append(self._part_path(upload_id))
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.part")
@@ -9,6 +9,10 @@ from werkzeug.serving import make_server
 from config.settings import (get_setting, get_alerts, mark_alert_as_read, 
                            get_sensor_devices, get_sensor_status, toggle_system_state, 
                            validate_pin)
+from presence import presence_tracker
+from tracing import tracer, parse_trace_id
+from change_feed import change_feed
+from network import network_manager
 
 # Zakázať predvolené logovanie Flasku na zníženie spamu v konzole
 log = logging.getLogger('werkzeug')
@@ -104,22 +108,10 @@ class WebAppServer:
             system_active = get_setting("system_active", False)
             
             # Získanie informácií o zariadeniach
-            devices = get_sensor_devices()
-            active_devices = 0
-            now = datetime.now()
-            
-            for device_id, device_data in devices.items():
-                if 'last_seen' in device_data:
-                    try:
-                        last_seen = datetime.fromisoformat(device_data['last_seen'])
-                        # Add active flag to each device
-                        device_data['active'] = (now - last_seen).total_seconds() < 3600  # Aktívne v poslednej hodine
-                        if device_data['active']:
-                            active_devices += 1
-                    except (ValueError, TypeError):
-                        device_data['active'] = False
-                else:
-                    device_data['active'] = False
+            # Snímka zariadení je iba na čítanie - stav online sa pridá do kópií
+            devices = {device_id: dict(device_data, active=presence_tracker.is_online(device_id))
+                       for device_id, device_data in get_sensor_devices().items()}
+            active_devices = presence_tracker.active_count
             
             # Získanie informácií o upozorneniach
             alerts = get_alerts(5)  # Získanie 5 najnovších upozornení
@@ -218,17 +210,14 @@ class WebAppServer:
                     try:
                         last_seen = datetime.fromisoformat(last_seen)
                         last_seen_str = last_seen.strftime("%Y-%m-%d %H:%M:%S")
-                        # Výpočet, či je zariadenie aktívne (videné v poslednej hodine)
-                        active = (datetime.now() - last_seen).total_seconds() < 3600
                     except (ValueError, TypeError):
                         last_seen_str = 'Neznáme'
-                        active = False
                 else:
                     last_seen_str = 'Nikdy'
-                    active = False
+                active = presence_tracker.is_online(device_id)
                 
-                # Získanie stavu senzora pre toto zariadenie
-                device_status = statuses.get(device_id, {})
+                # Získanie stavu senzora pre toto zariadenie (kópia - formátovanie ju upraví)
+                device_status = statuses.get(device_id, {}).copy()
                 
                 # Formátovanie časových pečiatok v stave
                 for sensor_type, data in device_status.items():
@@ -343,16 +332,7 @@ class WebAppServer:
                 
             system_active = get_setting("system_active", False)
             devices = get_sensor_devices()
-            active_devices = 0
-            
-            for device_id, device_data in devices.items():
-                if 'last_seen' in device_data:
-                    try:
-                        last_seen = datetime.fromisoformat(device_data['last_seen'])
-                        if (datetime.now() - last_seen).total_seconds() < 3600:
-                            active_devices += 1
-                    except (ValueError, TypeError):
-                        pass
+            active_devices = presence_tracker.active_count
             
             alerts = get_alerts()
             unread_alerts = sum(1 for a in alerts if not a.get('read', False))
@@ -371,6 +351,67 @@ class WebAppServer:
                 'timestamp': time.time()
             })
         
+        @self.app.route('/api/ingest', methods=['GET'])
+        def api_ingest():
+            """API koncový bod pre štatistiky príjmu a obmedzenia zariadení"""
+            if not api_authenticate():
+                return jsonify({'error': 'Neautorizovaný'}), 401
+                
+            return jsonify({
+                'pipeline': network_manager.get_ingest_stats(),
+                'udp': network_manager.get_udp_stats(),
+                'limits': network_manager.get_rate_limit_stats(),
+                'timestamp': time.time()
+            })
+        
+        @self.app.route('/api/health', methods=['GET'])
+        def api_health():
+            """API koncový bod pre stav zdravia sieťových poslucháčov"""
+            if not api_authenticate():
+                return jsonify({'error': 'Neautorizovaný'}), 401
+                
+            health = network_manager.get_health()
+            health['timestamp'] = time.time()
+            # Monitorovanie rozpozná nezdravý príjem podľa stavového kódu
+            return jsonify(health), 200 if health['healthy'] else 503
+        
+        @self.app.route('/api/traces', methods=['GET'])
+        def api_traces():
+            """API koncový bod pre histogramy oneskorenia fáz a posledné stopy udalostí"""
+            if not api_authenticate():
+                return jsonify({'error': 'Neautorizovaný'}), 401
+            
+            # Jedna stopa podľa identifikátora (napr. z trace_id upozornenia)
+            if request.args.get('trace_id'):
+                trace = tracer.get_trace(parse_trace_id(request.args.get('trace_id')))
+                if trace is None:
+                    return jsonify({'error': 'Stopa nenájdená'}), 404
+                return jsonify(trace)
+            
+            limit = request.args.get('limit', 20, type=int)
+            return jsonify({
+                'enabled': tracer.enabled,
+                'stages': tracer.get_histograms(),
+                'recent': tracer.get_recent(limit),
+                'timestamp': time.time()
+            })
+        
+        @self.app.route('/api/changes', methods=['GET'])
+        def api_changes():
+            """API koncový bod pre čakanie na zmenu (long polling)
+            
+            Parametre: since (posledná známa verzia), paths (vzory ciest oddelené
+            čiarkou, napr. 'system_active,sensor_status.*') a timeout (max. 30 s).
+            """
+            if not api_authenticate():
+                return jsonify({'error': 'Neautorizovaný'}), 401
+            
+            since = request.args.get('since', 0, type=int)
+            timeout = min(max(request.args.get('timeout', 25.0, type=float), 0.0), 30.0)
+            paths = request.args.get('paths')
+            patterns = [path.strip() for path in paths.split(',') if path.strip()] if paths else None
+            return jsonify(change_feed.wait(since, patterns, timeout))
+        
         @self.app.route('/api/toggle', methods=['POST'])
         def api_toggle():
             """API koncový bod pre prepínanie stavu systému"""
@@ -453,17 +494,16 @@ class WebAppServer:
                 last_seen = device_data.get('last_seen', '')
                 if last_seen:
                     try:
-                        last_seen = datetime.fromisoformat(last_seen)
-                        device_data['last_seen'] = last_seen.isoformat()
+                        last_seen = datetime.fromisoformat(last_seen).isoformat()
                     except ValueError:
                         pass
                 
-                # Získanie stavu senzora pre toto zariadenie
-                device_status = statuses.get(device_id, {})
+                # Získanie stavu senzora pre toto zariadenie (kópia - formátovanie ju upraví)
+                device_status = statuses.get(device_id, {}).copy()
                 
                 # Formátovanie časových pečiatok v stave
                 for sensor, data in device_status.items():
-                    if isinstance(data.get('timestamp'), (int, float)):
+                    if isinstance(data, dict) and isinstance(data.get('timestamp'), (int, float)):
                         data['timestamp'] = datetime.fromtimestamp(
                             data['timestamp']).isoformat()
                 
@@ -471,7 +511,7 @@ class WebAppServer:
                     'id': device_id,
                     'name': device_data.get('name', 'Neznáme zariadenie'),
                     'ip': device_data.get('ip', 'Neznáma'),
-                    'last_seen': device_data.get('last_seen', ''),
+                    'last_seen': last_seen,
                     'status': device_status
                 })
             
@@ -625,6 +665,9 @@ class WebAppServer:
         # Resetovanie udalosti vypnutia
         self.shutdown_event.clear()
         
+        # Odber zmien pre stránky čakajúce na /api/changes
+        change_feed.start()
+        
         # Spustenie servera v démonovom vlákne
         self.server_thread = Thread(target=run_server)
         self.server_thread.daemon = True
@@ -640,6 +683,7 @@ class WebAppServer:
             
         # Signalizácia vypnutia a čakanie na zastavenie servera
         self.shutdown_event.set()
+        change_feed.stop()
         if self.server_thread:
             self.server_thread.join(timeout=2.0)
             
@@ -0,0 +1,164 @@
+"""
+Porovnanie ceny zápisu konfiguračných súborov.
+
+Meria zápis nastavení a denníka upozornení tromi spôsobmi:
+  legacy        - pôvodný zápis open('w') + json.dump priamo do cieľa
+                  (pri výpadku napájania môže zostať orezaný súbor)
+  legacy_fsync  - pôvodný zápis doplnený o fsync, aby bol aspoň trvalý
+  atomic        - atomic_write: dočasný súbor + fsync + os.replace + záloha
+
+Dočasný adresár sa predvolene vytvorí vedľa prijímača, teda na tom istom
+súborovom systéme ako config/ (na Raspberry Pi SD karta). Na tmpfs je
+fsync takmer zadarmo a výsledok neodráža skutočné zariadenie.
+
+Príklad:
+    python REC/write_benchmark.py --iterations 200 --alerts 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.atomic_file import atomic_write
+
+
+def parse_args(argv=None):
+    """Spracovanie argumentov príkazového riadka"""
+    parser = argparse.ArgumentParser(description="Porovnanie ceny zápisu konfiguračných súborov")
+    parser.add_argument("--iterations", type=int, default=200, help="Počet zápisov pre každý spôsob")
+    parser.add_argument("--alerts", type=int, default=1000, help="Počet upozornení v denníku")
+    parser.add_argument("--dir", default=None, help="Adresár pre testovacie súbory (predvolene vedľa prijímača)")
+    parser.add_argument("--json", action="store_true", help="Výsledok vypísať ako JSON")
+    return parser.parse_args(argv)
+
+
+def build_payloads(alert_count):
+    """Obsah súboru nastavení a denníka upozornení typickej veľkosti
+
+    Nastavenia sa čítajú z config/settings.json iba na čítanie - import
+    config.settings by otvoril a migroval skutočné súbory prijímača.
+    """
+    settings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "settings.json")
+    with open(settings_file, 'r') as f:
+        settings = json.load(f)
+    now = time.time()
+    alerts = [{
+        "id": int((now - index) * 1000),
+        "timestamp": now - index,
+        "read": index % 3 == 0,
+        "type": "Pohyb",
+        "message": f"Zaznamenaný pohyb na zariadení Senzor {index % 8}",
+        "device_id": f"device-{index % 8:04d}",
+        "device_name": f"Senzor {index % 8}",
+        "trace_id": f"{index:016x}"
+    } for index in range(alert_count)]
+    return {"settings": settings, "alerts": alerts}
+
+
+def write_legacy(path, data):
+    """Pôvodný zápis priamo do cieľového súboru"""
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def write_legacy_fsync(path, data):
+    """Pôvodný zápis s vynúteným zápisom na disk"""
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_atomic(path, data):
+    """Atomický zápis so zálohou (ako SettingsManager a AlertsLogManager)"""
+    atomic_write(path, json.dumps(data, indent=4))
+
+
+MODES = {
+    "legacy": write_legacy,
+    "legacy_fsync": write_legacy_fsync,
+    "atomic": write_atomic
+}
+
+
+def percentile(values, percent):
+    """Percentil zo zoznamu hodnôt (None pre prázdny zoznam)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(write, path, data, iterations):
+    """Opakovaný zápis a súhrn trvania v milisekundách"""
+    write(path, data)
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        write(path, data)
+        durations.append(time.perf_counter() - started)
+    return {
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3)
+    }
+
+
+def run_benchmark(args):
+    """Meranie všetkých spôsobov zápisu pre oba súbory"""
+    payloads = build_payloads(args.alerts)
+    base_dir = args.dir or os.path.dirname(os.path.abspath(__file__))
+    work_dir = tempfile.mkdtemp(prefix="write-bench-", dir=base_dir)
+    result = {"directory": work_dir, "iterations": args.iterations, "files": {}}
+    try:
+        for name, data in payloads.items():
+            size = len(json.dumps(data, indent=4))
+            modes = {}
+            for mode, write in MODES.items():
+                path = os.path.join(work_dir, f"{name}-{mode}.json")
+                modes[mode] = measure(write, path, data, args.iterations)
+            result["files"][name] = {
+                "size_bytes": size,
+                "modes": modes,
+                "atomic_vs_legacy": round(modes["atomic"]["mean_ms"] / max(modes["legacy"]["mean_ms"], 1e-6), 2),
+                "atomic_vs_legacy_fsync": round(modes["atomic"]["mean_ms"] / max(modes["legacy_fsync"]["mean_ms"], 1e-6), 2)
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def print_report(result):
+    """Výpis výsledkov porovnania"""
+    print("")
+    print("=== Porovnanie zápisu konfiguračných súborov ===")
+    print(f"Adresár:   {result['directory']}")
+    print(f"Zápisov:   {result['iterations']} pre každý spôsob")
+    for name, summary in result["files"].items():
+        print("")
+        print(f"{name} ({summary['size_bytes']} B)")
+        for mode, stats in summary["modes"].items():
+            print(f"  {mode:<13} priemer {stats['mean_ms']:>8.3f} ms   "
+                  f"p50 {stats['p50_ms']:>8.3f} ms   p99 {stats['p99_ms']:>8.3f} ms")
+        print(f"  atomic / legacy:       {summary['atomic_vs_legacy']}x")
+        print(f"  atomic / legacy_fsync: {summary['atomic_vs_legacy_fsync']}x")
+
+
+def main(argv=None):
+    """Vstupný bod príkazového riadka"""
+    args = parse_args(argv)
+    result = run_benchmark(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,14 @@ a odosiela upozornenia do komponenty prijímača.
 import os
 import time
 import socket
+import struct
 import json
 import threading
 import logging
 import uuid
+import zlib
+import select
+from collections import OrderedDict
 from datetime import datetime
 try:
     import RPi.GPIO as GPIO
@@ -47,10 +51,128 @@ CONFIG = {
     "capture_interval": 5,           # Minimálny počet sekúnd medzi zachyteniami
     "discovery_interval": 30,        # Sekundy medzi vysielaním objavovania
     "image_path": "captures",        # Priečinok na ukladanie zachytených obrázkov
+    "tcp_session": True,             # Posielanie obrázkov cez trvalú TCP reláciu
+    "tcp_timeout": 10,               # Časový limit TCP operácií v sekundách
+    "busy_retries": 3,               # Počet opakovaní, keď je prijímač preťažený
+    "chunked_upload": True,          # Posielanie obrázkov po častiach s pokračovaním po výpadku
+    "upload_chunk_size": 65536,      # Veľkosť jednej časti obrázka v bajtoch
+    "upload_retries": 5,             # Počet pokusov o obnovenie prerušeného prenosu
+    "binary_protocol": True,         # Binárne UDP správy senzorov, ak ich prijímač podporuje
+    "reliable_udp": True,            # Opakovanie nepotvrdených správ senzorov (prijímač s protokolom v2)
+    "udp_retransmit_timeout": 0.2,   # Prvá pauza pred opakovaním nepotvrdenej správy v sekundách
+    "udp_retransmit_retries": 6,     # Najväčší počet opakovaní jednej správy
+    "udp_retransmit_window": 32,     # Najväčší počet nepotvrdených správ
+    "udp_coalesce_window": 0.02,     # Ako dlho po odoslaní zbierať ďalšie zmeny senzorov do jedného datagramu (0 = nezlučovať)
+    "udp_max_datagram": 1472,        # Najväčší zlúčený datagram (MTU cesty bez hlavičiek IP a UDP)
     "device_id": "",                 # Unikátne ID zariadenia (bude vygenerované)
     "device_name": "Security Sensor" # Ľudsky čitateľný názov zariadenia
 }
 
+# Verzia protokolu TCP relácií
+SESSION_PROTOCOL_VERSION = 1
+
+# Binárny formát UDP správ senzorov (zhodný s REC/sensor_protocol.py)
+SENSOR_PROTOCOL_VERSION = 4
+SENSOR_MAGIC = b"SB"
+SENSOR_MULTI_MAGIC = b"SM"
+SENSOR_MSG_EVENT = 1
+SENSOR_MSG_ACK = 2
+SENSOR_FLAG_ACK = 0x80
+# magic, verzia, typ správy, handle, senzor, stav, poradové číslo, časová pečiatka
+SENSOR_EVENT = struct.Struct("!2sBBHBBId")
+# identifikátor stopy a čas hrany GPIO v ns - za udalosťou od verzie 4
+SENSOR_TRACE = struct.Struct("!QQ")
+# magic, verzia, typ správy, handle, počet potvrdených čísel; za ním čísla po 4 bajtoch
+SENSOR_ACK_HEADER = struct.Struct("!2sBBHB")
+# magic, verzia, počet udalostí; pred každou udalosťou 2 bajty jej dĺžky
+SENSOR_MULTI_HEADER = struct.Struct("!2sBB")
+# Najväčší prijímaný datagram (kratší buffer by dlhšie správy orezal)
+UDP_MAX_DATAGRAM = 65535
+SENSOR_TYPES = {"motion": 1, "door": 2, "window": 3}
+SENSOR_STATES = {"DETECTED": 1, "CLEAR": 2, "OPEN": 3, "CLOSED": 4}
+
+def _pack_sensor_event(handle, sensor_type, status, seq, timestamp, version=1, ack=False, trace=None):
+    """Zabalenie udalosti senzora do binárneho datagramu, None ak sa nedá zakódovať"""
+    sensor_code = SENSOR_TYPES.get(sensor_type)
+    state_code = SENSOR_STATES.get(status)
+    if sensor_code is None or state_code is None:
+        return None
+    msg_type = SENSOR_MSG_EVENT | SENSOR_FLAG_ACK if ack else SENSOR_MSG_EVENT
+    message = SENSOR_EVENT.pack(SENSOR_MAGIC, version, msg_type, handle,
+                                sensor_code, state_code, seq & 0xFFFFFFFF, timestamp)
+    if version >= 4:
+        message += SENSOR_TRACE.pack(*(trace or (0, 0)))
+    return message
+
+def _new_trace():
+    """Nová stopa udalosti - náhodný 64-bitový identifikátor a čas hrany GPIO v ns"""
+    return int.from_bytes(os.urandom(8), "big") or 1, time.time_ns()
+
+def _pack_multi(messages):
+    """Zlúčenie správ senzorov do čo najmenšieho počtu datagramov (samostatná správa bez rámca)"""
+    datagrams = []
+    group = []
+    size = SENSOR_MULTI_HEADER.size
+    for message in messages + [None]:
+        if group and (message is None or size + 2 + len(message) > CONFIG["udp_max_datagram"] or len(group) == 255):
+            if len(group) == 1:
+                datagrams.append(group[0])
+            else:
+                datagrams.append(SENSOR_MULTI_HEADER.pack(SENSOR_MULTI_MAGIC, SENSOR_PROTOCOL_VERSION, len(group)) +
+                                 b"".join(struct.pack("!H", len(m)) + m for m in group))
+            group = []
+            size = SENSOR_MULTI_HEADER.size
+        if message is not None:
+            group.append(message)
+            size += 2 + len(message)
+    return datagrams
+
+def _unpack_sensor_ack(data):
+    """Rozbalenie potvrdenia od prijímača, None ak datagram nie je potvrdenie"""
+    if len(data) < SENSOR_ACK_HEADER.size:
+        return None
+    magic, version, msg_type, handle, count = SENSOR_ACK_HEADER.unpack_from(data)
+    if magic != SENSOR_MAGIC or msg_type != SENSOR_MSG_ACK:
+        return None
+    if len(data) < SENSOR_ACK_HEADER.size + 4 * count:
+        return None
+    return list(struct.unpack_from(f"!{count}I", data, SENSOR_ACK_HEADER.size))
+
+class SessionNotSupportedError(Exception):
+    """Prijímač nepodporuje trvalé TCP relácie (starší prijímač)"""
+    pass
+
+class ReceiverBusyError(Exception):
+    """Prijímač je preťažený a správu treba zopakovať neskôr"""
+    def __init__(self, retry_after):
+        super(ReceiverBusyError, self).__init__(f"Prijímač je preťažený, opakovať o {retry_after}s")
+        self.retry_after = retry_after
+
+def _recv_exactly(sock, length):
+    """Prijatie presne zadaného počtu bajtov, None ak sa spojenie zatvorí skôr"""
+    received_data = bytearray()
+    while len(received_data) < length:
+        chunk = sock.recv(min(65536, length - len(received_data)))
+        if not chunk:
+            return None
+        received_data.extend(chunk)
+    return received_data
+
+def _send_frame(sock, data):
+    """Odoslanie JSON rámca (4 bajty dĺžky + JSON)"""
+    frame_data = json.dumps(data).encode()
+    sock.sendall(len(frame_data).to_bytes(4, byteorder='big') + frame_data)
+
+def _recv_frame(sock):
+    """Prijatie JSON rámca, None ak sa spojenie zatvorilo"""
+    length_data = _recv_exactly(sock, 4)
+    if not length_data:
+        return None
+    frame_data = _recv_exactly(sock, int.from_bytes(length_data, byteorder='big'))
+    if frame_data is None:
+        return None
+    return json.loads(frame_data.decode())
+
 class UDPListener(threading.Thread):
     """Trieda pre počúvanie UDP príkazov od prijímača"""
     def __init__(self):
@@ -71,7 +193,7 @@ class UDPListener(threading.Thread):
             
             while self.running:
                 try:
-                    data, address = self.socket.recvfrom(1024)
+                    data, address = self.socket.recvfrom(UDP_MAX_DATAGRAM)
                     data = data.decode('utf-8')
                     logger.debug(f"Prijatý UDP príkaz z {address}: {data}")
                     
@@ -167,6 +289,134 @@ class UDPListener(threading.Thread):
             pass
         logger.info("UDP poslucháč príkazov zastavený")
 
+class SensorChannel(threading.Thread):
+    """Trvalý UDP socket pre správy senzorov s opakovaním nepotvrdených správ
+
+    Správa sa odošle hneď (jeden datagram). Ak prijímač podporuje zlúčené
+    datagramy (multi), odoslaním sa otvorí krátke okno udp_coalesce_window -
+    zmeny senzorov, ktoré prídu počas neho, sa pošlú spolu v jednom
+    datagrame na jeho konci. Ak prijímač podporuje potvrdenia,
+    správa zostane v okne nepotvrdených správ a pri chýbajúcom potvrdení
+    sa opakuje s exponenciálne rastúcou pauzou.
+    """
+    def __init__(self):
+        super(SensorChannel, self).__init__()
+        self.daemon = True
+        self.running = False
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.pending = OrderedDict()
+        self.pending_lock = threading.Lock()
+        # Prijímač rozumie zlúčeným datagramom (protokol v3)
+        self.multi = False
+        self.outbox = []
+        self.outbox_timer = None
+    
+    def send(self, message, seq=None):
+        """Odoslanie správy, pri zadanom poradovom čísle s čakaním na potvrdenie"""
+        if seq is not None:
+            with self.pending_lock:
+                if len(self.pending) >= CONFIG["udp_retransmit_window"]:
+                    oldest, _ = self.pending.popitem(last=False)
+                    logger.warning(f"Okno nepotvrdených správ je plné, správa {oldest} sa už nebude opakovať")
+                self.pending[seq] = [message, 0, time.time() + CONFIG["udp_retransmit_timeout"]]
+        
+        if self.multi and CONFIG["udp_coalesce_window"] > 0:
+            with self.pending_lock:
+                if self.outbox_timer is not None:
+                    # Zmeny tesne po odoslanej (napr. dvere a pohyb) odídu spolu na konci okna
+                    self.outbox.append(message)
+                    return
+                # Prvá správa nečaká, iba otvorí okno zlučovania pre ďalšie
+                self.outbox_timer = threading.Timer(CONFIG["udp_coalesce_window"], self._flush_outbox)
+                self.outbox_timer.daemon = True
+                self.outbox_timer.start()
+        
+        self.socket.sendto(message, (CONFIG["receiver_ip"], CONFIG["udp_port"]))
+    
+    def _flush_outbox(self):
+        """Koniec okna zlučovania - odoslanie správ zozbieraných počas neho"""
+        with self.pending_lock:
+            messages = self.outbox
+            self.outbox = []
+            self.outbox_timer = None
+        if messages:
+            self._send_all(messages)
+    
+    def _send_all(self, messages):
+        """Odoslanie správ - pri podpore prijímača zlúčených do čo najmenšieho počtu datagramov"""
+        address = (CONFIG["receiver_ip"], CONFIG["udp_port"])
+        datagrams = _pack_multi(messages) if self.multi else messages
+        for datagram in datagrams:
+            try:
+                self.socket.sendto(datagram, address)
+            except OSError as e:
+                logger.error(f"Zlyhalo odoslanie správy senzora: {e}")
+    
+    def run(self):
+        """Príjem potvrdení a opakovanie nepotvrdených správ"""
+        self.running = True
+        while self.running:
+            try:
+                readable, _, _ = select.select([self.socket], [], [], self._next_timeout())
+                if readable:
+                    data, _ = self.socket.recvfrom(UDP_MAX_DATAGRAM)
+                    seqs = _unpack_sensor_ack(data)
+                    if seqs:
+                        with self.pending_lock:
+                            for seq in seqs:
+                                self.pending.pop(seq, None)
+                self._retransmit()
+            except Exception as e:
+                if self.running:
+                    logger.error(f"Chyba pri spracovaní potvrdení senzorov: {e}")
+                    time.sleep(1)
+    
+    def _next_timeout(self):
+        """Čas do najbližšieho opakovania
+
+        Bez nepotvrdených správ sa čaká najviac prvú pauzu pred opakovaním,
+        aby nová správa nečakala na zopakovanie dlhšie.
+        """
+        interval = CONFIG["udp_retransmit_timeout"]
+        with self.pending_lock:
+            if not self.pending:
+                return interval
+            deadline = min(entry[2] for entry in self.pending.values())
+        return min(interval, max(0.0, deadline - time.time()))
+    
+    def _retransmit(self):
+        """Opakovanie správ, ktorým vypršala pauza"""
+        now = time.time()
+        due = []
+        with self.pending_lock:
+            for seq, entry in list(self.pending.items()):
+                if entry[2] > now:
+                    continue
+                if entry[1] >= CONFIG["udp_retransmit_retries"]:
+                    del self.pending[seq]
+                    logger.error(f"Správa senzora {seq} nebola potvrdená ani po {entry[1]} opakovaniach")
+                    continue
+                entry[1] += 1
+                entry[2] = now + CONFIG["udp_retransmit_timeout"] * (2 ** entry[1])
+                due.append(entry[0])
+        
+        if due:
+            logger.debug(f"Opakujem {len(due)} nepotvrdených správ senzorov")
+            self._send_all(due)
+    
+    def stop(self):
+        """Zastavenie kanála (zozbierané správy sa ešte odošlú)"""
+        self.running = False
+        with self.pending_lock:
+            timer = self.outbox_timer
+        if timer:
+            timer.cancel()
+            self._flush_outbox()
+        try:
+            self.socket.close()
+        except:
+            pass
+
 class SecuritySender:
     def __init__(self):
         self.last_capture_time = 0
@@ -175,6 +425,21 @@ class SecuritySender:
         self.discovery_thread = None
         self.command_listener = None  # Pridanie novej premennej pre UDP poslucháč príkazov
         
+        # Trvalá TCP relácia s prijímačom pre prenos obrázkov
+        self.tcp_session = None
+        self.tcp_session_lock = threading.Lock()
+        self.tcp_session_supported = True
+        self.tcp_upload_supported = False
+        self.tcp_seq = 0
+        
+        # Binárny protokol senzorov dohodnutý s prijímačom (0 = textový formát)
+        self.protocol_version = 0
+        self.device_handle = None
+        # Poradové číslo udalostí senzorov - prijímač podľa neho zahodí duplikáty a oneskorené datagramy
+        self.sensor_seq = 0
+        self.sensor_seq_lock = threading.Lock()
+        self.sensor_channel = SensorChannel()
+        
         # Sledovacie premenné pre stavy senzorov na zabránenie opakovaných spustení
         self.motion_active = False
         self.motion_last_triggered = 0
@@ -268,6 +533,7 @@ class SecuritySender:
     
     def _on_motion_detected(self, channel):
         """Callback pre detekciu pohybu s funkciou tlmenia opakovaných spustení"""
+        trace = _new_trace()
         current_time = time.time()
         
         # Kontrola, či sme ešte v čase ochladzovania od predchádzajúceho spustenia
@@ -277,26 +543,28 @@ class SecuritySender:
             
         logger.info("Pohyb zaznamenaný!")
         self.motion_last_triggered = current_time
-        self._send_sensor_update("motion", "DETECTED")
-        self._capture_image("motion")
+        self._send_sensor_update("motion", "DETECTED", trace)
+        self._capture_image("motion", trace)
     
     def _on_door_change(self, channel):
         """Callback pre zmenu stavu dverového senzora"""
+        trace = _new_trace()
         state = "OPEN" if GPIO.input(CONFIG["door_pin"]) else "CLOSED"
         logger.info(f"Dvere {state}")
-        self._send_sensor_update("door", state)
+        self._send_sensor_update("door", state, trace)
         if state == "OPEN":
-            self._capture_image("door")
+            self._capture_image("door", trace)
     
     def _on_window_change(self, channel):
         """Callback pre zmenu stavu okenného senzora"""
+        trace = _new_trace()
         state = "OPEN" if GPIO.input(CONFIG["window_pin"]) else "CLOSED"
         logger.info(f"Okno {state}")
-        self._send_sensor_update("window", state)
+        self._send_sensor_update("window", state, trace)
         if state == "OPEN":
-            self._capture_image("window")
+            self._capture_image("window", trace)
     
-    def _capture_image(self, trigger_type):
+    def _capture_image(self, trigger_type, trace=None):
         """Zachytenie obrázka z kamery, ak je dostupná"""
         # Kontrola, či uplynul dostatočný čas od posledného zachytenia
         current_time = time.time()
@@ -321,7 +589,7 @@ class SecuritySender:
                 self.camera.capture(image_path)
                 logger.info(f"Obrázok zachytený: {image_path}")
                 # Odošli obrázok prijímaču
-                self._send_image(image_path, trigger_type)
+                self._send_image(image_path, trigger_type, trace)
             else:
                 logger.warning("Kamera nie je dostupná, preskakujem zachytenie")
         except Exception as e:
@@ -331,38 +599,152 @@ class SecuritySender:
             if RPI_AVAILABLE:
                 GPIO.output(CONFIG["led_pin"], GPIO.LOW)
     
-    def _send_sensor_update(self, sensor_type, status):
-        """Odoslanie aktualizácie senzora cez UDP"""
+    def _send_sensor_update(self, sensor_type, status, trace=None):
+        """Odoslanie aktualizácie senzora cez UDP
+        
+        Args:
+            trace (tuple, optional): Stopa udalosti z _new_trace (prijímač v4 meria oneskorenie)
+        """
         try:
-            # Vytvorenie UDP socketu
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Senzory hlásia z rôznych vlákien, číslo a čas sa priraďujú spolu
+            with self.sensor_seq_lock:
+                self.sensor_seq += 1
+                seq = self.sensor_seq
+                sent_at = time.time()
             
-            # Príprava správy - zahrnutie ID zariadenia a názvu
-            message = f"SENSOR:{CONFIG['device_id']}:{CONFIG['device_name']}:{sensor_type}:{status}"
+            # Binárna správa, ak ju prijímač podporuje a stav má binárny kód
+            message = None
+            reliable = CONFIG["reliable_udp"] and self.protocol_version >= 2
+            if self.protocol_version >= 1 and self.device_handle is not None:
+                message = _pack_sensor_event(self.device_handle, sensor_type, status, seq, sent_at,
+                                             version=self.protocol_version, ack=reliable, trace=trace)
             
-            # Odoslanie správy
-            sock.sendto(message.encode(), (CONFIG["receiver_ip"], CONFIG["udp_port"]))
-            logger.debug(f"Odoslaná UDP aktualizácia: {message}")
+            if message is None:
+                # Príprava textovej správy - zahrnutie ID zariadenia a názvu
+                message = f"SENSOR:{CONFIG['device_id']}:{CONFIG['device_name']}:{sensor_type}:{status}"
+                if self.protocol_version >= 1:
+                    # Registrovaný prijímač rozumie poradovému číslu a času odoslania
+                    message += f":seq={seq}:ts={sent_at:.3f}"
+                if self.protocol_version >= 4 and trace:
+                    message += f":tr={trace[0]:016x}@{trace[1]}"
+                message = message.encode()
+                # Textový formát sa nepotvrdzuje
+                reliable = False
+            
+            # Odoslanie správy - pri spoľahlivom režime sa do potvrdenia opakuje,
+            # prijímač v3 dostane súčasné zmeny zlúčené v jednom datagrame
+            self.sensor_channel.multi = self.protocol_version >= 3
+            self.sensor_channel.send(message, seq if reliable else None)
+            logger.debug(f"Odoslaná UDP aktualizácia: {sensor_type}:{status} ({len(message)} B)")
             
         except Exception as e:
             logger.error(f"Zlyhalo odoslanie aktualizácie senzora: {e}")
-        finally:
-            sock.close()
     
-    def _send_image(self, image_path, trigger_type):
-        """Odoslanie obrázka cez TCP"""
+    def _send_image(self, image_path, trigger_type, trace=None):
+        """Odoslanie obrázka cez TCP - cez trvalú reláciu, ak ju prijímač podporuje"""
         try:
-            # Vytvorenie TCP socketu
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((CONFIG["receiver_ip"], CONFIG["tcp_port"]))
-            
-            # Odoslanie hlavičky s informáciami o obrázku
+            # Hlavička s informáciami o obrázku
             header = {
                 "type": "image",
+                "device_id": CONFIG["device_id"],
                 "trigger": trigger_type,
                 "timestamp": datetime.now().isoformat(),
                 "filename": os.path.basename(image_path)
             }
+            if trace:
+                # Obrázok patrí do rovnakej stopy ako udalosť senzora, ktorá ho spustila
+                header["trace_id"] = f"{trace[0]:016x}"
+                header["trace_origin_ns"] = trace[1]
+            with open(image_path, "rb") as f:
+                image_data = f.read()
+        except Exception as e:
+            logger.error(f"Zlyhalo načítanie obrázka {image_path}: {e}")
+            return
+        
+        if CONFIG["tcp_session"] and self.tcp_session_supported:
+            try:
+                if CONFIG["chunked_upload"] and self._receiver_supports_uploads():
+                    self._send_image_chunked(header, image_data)
+                else:
+                    self._send_session_message_with_retry(header, image_data)
+                logger.info(f"Obrázok odoslaný cez reláciu: {image_path}")
+                return
+            except ReceiverBusyError as e:
+                logger.error(f"Obrázok {image_path} neodoslaný, prijímač je preťažený: {e}")
+                return
+            except SessionNotSupportedError:
+                logger.warning("Prijímač nepodporuje TCP relácie, používam jednorazové spojenia")
+                self.tcp_session_supported = False
+            except Exception as e:
+                logger.error(f"Zlyhalo odoslanie obrázka cez reláciu, skúšam jednorazové spojenie: {e}")
+        
+        self._send_image_oneshot(header, image_data, image_path)
+    
+    def _receiver_supports_uploads(self):
+        """Kontrola, či prijímač podporuje prenos po častiach (otvorí reláciu, ak treba)"""
+        with self.tcp_session_lock:
+            if self.tcp_session is None:
+                self.tcp_session = self._open_tcp_session()
+            return self.tcp_upload_supported
+    
+    def _send_image_chunked(self, header, image_data):
+        """Odoslanie obrázka po častiach s pokračovaním po prerušení spojenia
+        
+        Prijímač potvrdzuje každú časť posunom, po výpadku sa prenos s rovnakým
+        upload_id obnoví od posledného potvrdeného posunu.
+        """
+        upload_id = uuid.uuid4().hex
+        size = len(image_data)
+        begin_header = dict(header, type="upload_begin", upload_id=upload_id,
+                            size=size, crc32=zlib.crc32(image_data))
+        failures = 0
+        
+        while True:
+            try:
+                offset = self._send_session_message_with_retry(begin_header).get("offset", 0)
+                if offset:
+                    logger.info(f"Pokračujem v prenose {upload_id} od {offset}/{size} bajtov")
+                
+                while offset < size:
+                    chunk = image_data[offset:offset + CONFIG["upload_chunk_size"]]
+                    ack = self._send_session_message_with_retry({
+                        "type": "upload_chunk",
+                        "upload_id": upload_id,
+                        "offset": offset,
+                        "crc32": zlib.crc32(chunk)
+                    }, chunk)
+                    if "error" in ack:
+                        # Prijímač časť odmietol a určil posun, od ktorého pokračovať
+                        failures += 1
+                        if failures > CONFIG["upload_retries"]:
+                            raise RuntimeError(f"Prijímač opakovane odmietol časť: {ack['error']}")
+                        logger.warning(f"Časť prenosu {upload_id} odmietnutá: {ack['error']}")
+                    offset = ack.get("offset", offset + len(chunk))
+                
+                ack = self._send_session_message_with_retry({"type": "upload_commit", "upload_id": upload_id})
+                if "error" not in ack:
+                    return
+                failures += 1
+                if failures > CONFIG["upload_retries"]:
+                    raise RuntimeError(f"Prijímač odmietol dokončenie prenosu: {ack['error']}")
+                logger.warning(f"Dokončenie prenosu {upload_id} odmietnuté: {ack['error']}")
+            except (ConnectionError, OSError) as e:
+                failures += 1
+                if failures > CONFIG["upload_retries"]:
+                    raise
+                delay = min(2 ** failures, 30)
+                logger.warning(f"Prenos {upload_id} prerušený ({e}), pokračujem o {delay}s")
+                time.sleep(delay)
+    
+    def _send_image_oneshot(self, header, image_data, image_path):
+        """Odoslanie obrázka cez samostatné TCP spojenie (pôvodný protokol)"""
+        sock = None
+        try:
+            # Vytvorenie TCP socketu
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.connect((CONFIG["receiver_ip"], CONFIG["tcp_port"]))
+            
+            # Odoslanie hlavičky s informáciami o obrázku
             header_json = json.dumps(header).encode()
             header_length = len(header_json).to_bytes(4, byteorder='big')
             
@@ -370,17 +752,110 @@ class SecuritySender:
             sock.sendall(header_json)
             
             # Odoslanie dát obrázka
-            with open(image_path, "rb") as f:
-                image_data = f.read()
-                sock.sendall(len(image_data).to_bytes(4, byteorder='big'))
-                sock.sendall(image_data)
+            sock.sendall(len(image_data).to_bytes(4, byteorder='big'))
+            sock.sendall(image_data)
             
             logger.info(f"Obrázok odoslaný: {image_path}")
             
         except Exception as e:
             logger.error(f"Zlyhalo odoslanie obrázka: {e}")
         finally:
+            if sock:
+                sock.close()
+    
+    def _open_tcp_session(self):
+        """Otvorenie trvalej TCP relácie s prijímačom
+        
+        Raises:
+            SessionNotSupportedError: Ak prijímač reláciu nepotvrdí
+        """
+        sock = socket.create_connection((CONFIG["receiver_ip"], CONFIG["tcp_port"]),
+                                        timeout=CONFIG["tcp_timeout"])
+        try:
+            _send_frame(sock, {
+                "type": "session_start",
+                "version": SESSION_PROTOCOL_VERSION,
+                "device_id": CONFIG["device_id"],
+                "device_name": CONFIG["device_name"]
+            })
+            response = _recv_frame(sock)
+        except Exception:
+            sock.close()
+            raise
+        
+        if not response or response.get("type") != "session_ack":
             sock.close()
+            raise SessionNotSupportedError(f"Neočakávaná odpoveď prijímača: {response}")
+        
+        self.tcp_upload_supported = bool(response.get("uploads"))
+        logger.info(f"Otvorená TCP relácia s prijímačom {CONFIG['receiver_ip']}")
+        return sock
+    
+    def _close_tcp_session(self, graceful=False):
+        """Zatvorenie TCP relácie (volajúci drží tcp_session_lock)"""
+        if not self.tcp_session:
+            return
+        try:
+            if graceful:
+                self.tcp_seq += 1
+                _send_frame(self.tcp_session, {"type": "session_end", "seq": self.tcp_seq})
+                _recv_frame(self.tcp_session)
+        except Exception:
+            pass
+        finally:
+            try:
+                self.tcp_session.close()
+            except Exception:
+                pass
+            self.tcp_session = None
+    
+    def _send_session_message(self, header, payload=b""):
+        """Odoslanie jednej správy cez reláciu a čakanie na jej potvrdenie
+        
+        Ak sa relácia medzičasom prerušila (napr. vypršala na strane prijímača),
+        otvorí sa jedenkrát nová a správa sa odošle znova.
+        
+        Returns:
+            dict: Potvrdenie od prijímača
+        """
+        with self.tcp_session_lock:
+            for attempt in range(2):
+                if self.tcp_session is None:
+                    self.tcp_session = self._open_tcp_session()
+                
+                self.tcp_seq += 1
+                message_header = dict(header, seq=self.tcp_seq)
+                try:
+                    _send_frame(self.tcp_session, message_header)
+                    self.tcp_session.sendall(len(payload).to_bytes(4, byteorder='big'))
+                    self.tcp_session.sendall(payload)
+                    ack = _recv_frame(self.tcp_session)
+                except OSError as e:
+                    logger.debug(f"TCP relácia prerušená: {e}")
+                    ack = None
+                
+                if ack is None or ack.get("seq") != self.tcp_seq:
+                    self._close_tcp_session()
+                    if attempt == 0:
+                        continue
+                    raise ConnectionError("Prijímač nepotvrdil správu v relácii")
+                
+                if ack.get("status") == "busy":
+                    raise ReceiverBusyError(ack.get("retry_after", 1.0))
+                if ack.get("status") != "ok":
+                    raise RuntimeError(f"Prijímač odmietol správu: {ack}")
+                return ack
+    
+    def _send_session_message_with_retry(self, header, payload=b""):
+        """Odoslanie správy cez reláciu s opakovaním, kým je prijímač preťažený"""
+        for attempt in range(CONFIG["busy_retries"] + 1):
+            try:
+                return self._send_session_message(header, payload)
+            except ReceiverBusyError as e:
+                if attempt == CONFIG["busy_retries"]:
+                    raise
+                logger.warning(f"Prijímač je preťažený, opakujem o {e.retry_after}s")
+                time.sleep(e.retry_after)
     
     def _discovery_service(self):
         """Spustenie služby objavovania na vysielanie prítomnosti"""
@@ -397,7 +872,7 @@ class SecuritySender:
                 # Načúvanie na požiadavky objavovania
                 sock.settimeout(CONFIG["discovery_interval"])
                 try:
-                    data, addr = sock.recvfrom(1024)
+                    data, addr = sock.recvfrom(UDP_MAX_DATAGRAM)
                     data = data.decode()
                     
                     if data.startswith("DISCOVER:"):
@@ -410,12 +885,55 @@ class SecuritySender:
                 except Exception as e:
                     logger.error(f"Chyba načúvania objavovania: {e}")
                 
+                # Obnovenie registrácie - prijímač mohol medzitým stratiť stav
+                if CONFIG["binary_protocol"]:
+                    self._register_with_receiver()
+                
                 time.sleep(CONFIG["discovery_interval"])
         except Exception as e:
             logger.error(f"Chyba služby objavovania: {e}")
         finally:
             sock.close()
     
+    def _register_with_receiver(self):
+        """Registrácia u prijímača a dohodnutie binárneho protokolu senzorov
+
+        Starší prijímač na registráciu neodpovie a zostane textový formát.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.settimeout(2)
+        message = f"REGISTER:{SENSOR_PROTOCOL_VERSION}:{CONFIG['device_id']}:{CONFIG['device_name']}"
+        
+        try:
+            for attempt in range(3):
+                sock.sendto(message.encode(), (CONFIG["receiver_ip"], CONFIG["discovery_port"]))
+                try:
+                    data, addr = sock.recvfrom(UDP_MAX_DATAGRAM)
+                except socket.timeout:
+                    continue
+                
+                data = data.decode()
+                if not data.startswith("REGISTERED:"):
+                    continue
+                
+                parts = data.split(":")
+                version, handle = int(parts[1]), int(parts[2])
+                if (version, handle) != (self.protocol_version, self.device_handle):
+                    logger.info(f"Registrovaný u prijímača: protokol v{version}, identifikátor {handle}")
+                self.protocol_version = version
+                self.device_handle = handle
+                return True
+        except Exception as e:
+            logger.error(f"Chyba registrácie u prijímača: {e}")
+        finally:
+            sock.close()
+        
+        if self.protocol_version:
+            logger.warning("Prijímač neodpovedal na registráciu, prechádzam na textový formát")
+        self.protocol_version = 0
+        self.device_handle = None
+        return False
+    
     def discover_receiver(self):
         """Objavenie IP adresy prijímača pomocou vysielania"""
         logger.info("Objavovanie prijímača...")
@@ -439,7 +957,7 @@ class SecuritySender:
                 
                 # Čakanie na odpoveď
                 try:
-                    data, addr = sock.recvfrom(1024)
+                    data, addr = sock.recvfrom(UDP_MAX_DATAGRAM)
                     data = data.decode()
                     
                     if data.startswith("SECURITY_SYSTEM:ONLINE:"):
@@ -474,6 +992,13 @@ class SecuritySender:
         else:
             logger.info(f"Používam predvolenú IP prijímača: {CONFIG['receiver_ip']}")
         
+        # Dohodnutie binárneho formátu správ senzorov
+        if CONFIG["binary_protocol"]:
+            self._register_with_receiver()
+        
+        # Príjem potvrdení a opakovanie správ senzorov
+        self.sensor_channel.start()
+        
         # Spustenie poslucháča príkazov pre prijímanie konfiguračných príkazov
         self.command_listener = UDPListener()
         self.command_listener.start()
@@ -490,7 +1015,7 @@ class SecuritySender:
             def simulation():
                 while self.running:
                     logger.info("SIMULÁCIA: Pohyb detekovaný")
-                    self._send_sensor_update("motion", "DETECTED")
+                    self._send_sensor_update("motion", "DETECTED", _new_trace())
                     time.sleep(10)
             
             sim_thread = threading.Thread(target=simulation)
@@ -513,6 +1038,12 @@ class SecuritySender:
         if self.command_listener:
             self.command_listener.stop()
         
+        self.sensor_channel.stop()
+        
+        # Korektné ukončenie TCP relácie
+        with self.tcp_session_lock:
+            self._close_tcp_session(graceful=True)
+        
         if self.camera:
             self.camera.close()
         
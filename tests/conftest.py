@@ -0,0 +1,32 @@
+"""
+Spoločné nastavenie testov - prístup k modulom prijímača (REC) a odosielateľa (SEND).
+
+Moduly oboch strán sa importujú ako ploché moduly (rovnako ako pri spustení
+z ich adresára), preto sa ich adresáre pridajú do sys.path.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("SEND", "REC"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def sender(tmp_path_factory):
+    """Modul odosielateľa SEND.py
+
+    Import vytvára log security_sender.log v aktuálnom adresári,
+    preto prebehne v dočasnom adresári.
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("sender"))
+    try:
+        import SEND
+    finally:
+        os.chdir(cwd)
+    return SEND
@@ -0,0 +1,262 @@
+"""
+Testy binárneho protokolu senzorov.
+
+SEND.py kopíruje formát datagramov ručne (nezávisí od modulov prijímača),
+preto sa okrem kódovania a dekódovania na strane prijímača overuje aj to,
+že datagramy odosielateľa prijímač rozbalí a naopak.
+"""
+import pytest
+
+import sensor_protocol
+from sensor_protocol import SequenceTracker
+
+TRACE = (0x1234_5678_9ABC_DEF0, 1_700_000_000_123_456_789)
+
+
+def test_constants_match_sender(sender):
+    assert sender.SENSOR_PROTOCOL_VERSION == sensor_protocol.PROTOCOL_VERSION
+    assert sender.SENSOR_MAGIC == sensor_protocol.MAGIC
+    assert sender.SENSOR_MULTI_MAGIC == sensor_protocol.MULTI_MAGIC
+    assert sender.SENSOR_MSG_EVENT == sensor_protocol.MSG_SENSOR
+    assert sender.SENSOR_MSG_ACK == sensor_protocol.MSG_ACK
+    assert sender.SENSOR_FLAG_ACK == sensor_protocol.FLAG_ACK
+    assert sender.SENSOR_EVENT.format == sensor_protocol.SENSOR_EVENT.format
+    assert sender.SENSOR_TRACE.format == sensor_protocol.SENSOR_TRACE.format
+    assert sender.SENSOR_ACK_HEADER.format == sensor_protocol.ACK_HEADER.format
+    assert sender.SENSOR_MULTI_HEADER.format == sensor_protocol.MULTI_HEADER.format
+    assert sender.SENSOR_TYPES == sensor_protocol.SENSOR_TYPES
+    assert sender.SENSOR_STATES == sensor_protocol.SENSOR_STATES
+    assert sender.CONFIG["udp_max_datagram"] == sensor_protocol.MAX_MULTI_SIZE
+
+
+@pytest.mark.parametrize("ack", [False, True])
+def test_sensor_event_round_trip(ack):
+    data = sensor_protocol.pack_sensor_event(7, "door", "OPEN", 42, 1700000000.5, ack=ack, trace=TRACE)
+
+    assert sensor_protocol.is_binary_datagram(data)
+    assert sensor_protocol.unpack_sensor_event(data) == {
+        "handle": 7,
+        "sensor_type": "door",
+        "status": "OPEN",
+        "seq": 42,
+        "timestamp": 1700000000.5,
+        "ack": ack,
+        "trace_id": TRACE[0],
+        "origin_ns": TRACE[1]
+    }
+
+
+def test_sensor_event_without_trace_and_wrapped_seq():
+    data = sensor_protocol.pack_sensor_event(1, "motion", "DETECTED", 2 ** 32 + 5, 0.0)
+    event = sensor_protocol.unpack_sensor_event(data)
+
+    assert event["seq"] == 5
+    assert (event["trace_id"], event["origin_ns"]) == (0, 0)
+
+
+def test_sensor_event_unknown_type_is_not_packed():
+    assert sensor_protocol.pack_sensor_event(1, "smoke", "DETECTED", 1, 0.0) is None
+    assert sensor_protocol.pack_sensor_event(1, "motion", "BROKEN", 1, 0.0) is None
+
+
+@pytest.mark.parametrize("data", [b"SB", b"XX" + bytes(18), b""])
+def test_sensor_event_invalid_datagram(data):
+    with pytest.raises(ValueError):
+        sensor_protocol.unpack_sensor_event(data)
+
+
+def test_sensor_event_missing_trace():
+    data = sensor_protocol.pack_sensor_event(1, "motion", "DETECTED", 1, 0.0, trace=TRACE)
+
+    with pytest.raises(ValueError):
+        sensor_protocol.unpack_sensor_event(data[:-1])
+
+
+@pytest.mark.parametrize("ack", [False, True])
+def test_sender_event_matches_receiver(sender, ack):
+    args = (3, "window", "CLOSED", 99, 1700000001.25)
+    data = sender._pack_sensor_event(*args, version=sender.SENSOR_PROTOCOL_VERSION, ack=ack, trace=TRACE)
+
+    assert data == sensor_protocol.pack_sensor_event(*args, ack=ack, trace=TRACE)
+
+
+@pytest.mark.parametrize("version", [1, 2, 3, 4])
+def test_sender_event_older_versions(sender, version):
+    data = sender._pack_sensor_event(9, "motion", "CLEAR", 10, 5.0, version=version, ack=True, trace=TRACE)
+    event = sensor_protocol.unpack_sensor_event(data)
+
+    assert (event["handle"], event["sensor_type"], event["status"], event["seq"]) == (9, "motion", "CLEAR", 10)
+    # Príznak potvrdenia a stopa existujú až od verzie 2, resp. 4
+    assert event["ack"] == (version >= 2)
+    assert (event["trace_id"], event["origin_ns"]) == (TRACE if version >= 4 else (0, 0))
+
+
+def _events(count, status="DETECTED"):
+    return [sensor_protocol.pack_sensor_event(1, "motion", status, seq, float(seq)) for seq in range(count)]
+
+
+def test_multi_round_trip():
+    events = _events(5) + [b"SENSOR:dev:Dev:motion:DETECTED:seq=6"]
+    datagrams = sensor_protocol.pack_multi(events)
+
+    assert len(datagrams) == 1
+    assert sensor_protocol.is_multi_datagram(datagrams[0])
+    assert sensor_protocol.split_multi(datagrams[0]) == events
+
+
+def test_multi_single_event_is_not_framed():
+    events = _events(1)
+
+    assert sensor_protocol.pack_multi(events) == events
+    assert sensor_protocol.pack_multi([]) == []
+
+
+def test_multi_respects_max_size():
+    events = _events(200)
+    datagrams = sensor_protocol.pack_multi(events)
+
+    assert len(datagrams) > 1
+    assert all(len(datagram) <= sensor_protocol.MAX_MULTI_SIZE for datagram in datagrams)
+    assert [event for datagram in datagrams for event in sensor_protocol.split_multi(datagram)] == events
+
+
+def test_multi_at_most_255_events():
+    events = [b"x"] * 300
+    datagrams = sensor_protocol.pack_multi(events, max_size=sensor_protocol.MAX_DATAGRAM_SIZE)
+
+    assert [len(sensor_protocol.split_multi(datagram)) for datagram in datagrams] == [255, 45]
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 200])
+def test_sender_multi_matches_receiver(sender, count):
+    events = _events(count)
+    datagrams = sender._pack_multi(events)
+
+    assert datagrams == sensor_protocol.pack_multi(events)
+    unpacked = []
+    for datagram in datagrams:
+        unpacked.extend(sensor_protocol.split_multi(datagram) if sensor_protocol.is_multi_datagram(datagram)
+                        else [datagram])
+    assert unpacked == events
+
+
+def test_multi_truncated():
+    datagram = sensor_protocol.pack_multi(_events(3))[0]
+
+    with pytest.raises(ValueError):
+        sensor_protocol.split_multi(datagram[:-1])
+    with pytest.raises(ValueError):
+        sensor_protocol.split_multi(datagram[:3])
+
+
+def test_multi_old_version_rejected():
+    datagram = bytearray(sensor_protocol.pack_multi(_events(2))[0])
+    datagram[2] = 2
+
+    with pytest.raises(ValueError):
+        sensor_protocol.split_multi(bytes(datagram))
+
+
+def test_ack_round_trip(sender):
+    seqs = [1, 2, 3, 2 ** 32 - 1]
+    datagrams = sensor_protocol.pack_ack(12, seqs)
+
+    assert len(datagrams) == 1
+    assert sensor_protocol.unpack_ack(datagrams[0]) == (12, seqs)
+    assert sender._unpack_sensor_ack(datagrams[0]) == seqs
+
+
+def test_ack_split_into_datagrams(sender):
+    seqs = list(range(600))
+    datagrams = sensor_protocol.pack_ack(1, seqs)
+
+    assert len(datagrams) == 3
+    assert [seq for datagram in datagrams for seq in sensor_protocol.unpack_ack(datagram)[1]] == seqs
+    assert [seq for datagram in datagrams for seq in sender._unpack_sensor_ack(datagram)] == seqs
+
+
+def test_ack_invalid(sender):
+    event = sensor_protocol.pack_sensor_event(1, "motion", "DETECTED", 1, 0.0)
+    truncated = sensor_protocol.pack_ack(1, [1, 2])[0][:-1]
+
+    for data in (event, truncated):
+        with pytest.raises(ValueError):
+            sensor_protocol.unpack_ack(data)
+        assert sender._unpack_sensor_ack(data) is None
+
+
+def test_sequence_accepted_and_duplicate():
+    tracker = SequenceTracker()
+
+    assert tracker.check("dev", 1) == SequenceTracker.ACCEPTED
+    assert tracker.check("dev", 2) == SequenceTracker.ACCEPTED
+    assert tracker.check("dev", 2) == SequenceTracker.DUPLICATE
+    assert tracker.check("dev", 1) == SequenceTracker.DUPLICATE
+    # Iné zariadenie má vlastné poradie
+    assert tracker.check("other", 2) == SequenceTracker.ACCEPTED
+
+
+def test_sequence_out_of_order_within_window():
+    tracker = SequenceTracker()
+    tracker.check("dev", 100)
+
+    assert tracker.check("dev", 110) == SequenceTracker.ACCEPTED
+    assert tracker.check("dev", 105) == SequenceTracker.STALE
+    assert tracker.check("dev", 100) == SequenceTracker.DUPLICATE
+
+
+def test_sequence_stale_outside_window():
+    tracker = SequenceTracker()
+    tracker.check("dev", 100)
+    tracker.check("dev", 100 + SequenceTracker.WINDOW)
+
+    assert tracker.check("dev", 100) == SequenceTracker.STALE
+    assert tracker.check("dev", 99 + SequenceTracker.WINDOW) == SequenceTracker.STALE
+
+
+def test_sequence_wraparound():
+    tracker = SequenceTracker()
+    tracker.check("dev", 0xFFFFFFFE)
+
+    assert tracker.check("dev", 0xFFFFFFFF) == SequenceTracker.ACCEPTED
+    assert tracker.check("dev", 0) == SequenceTracker.ACCEPTED
+    assert tracker.check("dev", 0xFFFFFFFE) == SequenceTracker.DUPLICATE
+
+
+def test_sequence_restart_by_low_seq():
+    tracker = SequenceTracker()
+    tracker.check("dev", 1000)
+
+    assert tracker.check("dev", 1) == SequenceTracker.RESTARTED
+    assert tracker.check("dev", 2) == SequenceTracker.ACCEPTED
+    assert tracker.check("dev", 1) == SequenceTracker.DUPLICATE
+    assert tracker.get_stats()["restarts"] == 1
+
+
+def test_sequence_restart_by_newer_sent_at():
+    tracker = SequenceTracker()
+    tracker.check("dev", 50, sent_at=100.0)
+
+    # Blízko najvyššieho čísla, ale odoslané neskôr - odosielateľ začal odznova
+    assert tracker.check("dev", 40, sent_at=200.0) == SequenceTracker.RESTARTED
+    # Oneskorený datagram spred reštartu
+    assert tracker.check("dev", 30, sent_at=90.0) == SequenceTracker.STALE
+
+
+def test_sequence_late_datagram_is_not_restart():
+    tracker = SequenceTracker()
+    tracker.check("dev", 50, sent_at=100.0)
+    tracker.check("dev", 51, sent_at=101.0)
+
+    assert tracker.check("dev", 50, sent_at=100.0) == SequenceTracker.DUPLICATE
+    assert tracker.check("dev", 10, sent_at=50.0) == SequenceTracker.STALE
+
+
+def test_sequence_forget():
+    tracker = SequenceTracker()
+    tracker.check("dev", 5)
+    tracker.forget("dev")
+
+    assert tracker.check("dev", 5) == SequenceTracker.ACCEPTED
+    stats = tracker.get_stats()
+    assert (stats["accepted"], stats["duplicate"], stats["devices"]) == (2, 0, 1)